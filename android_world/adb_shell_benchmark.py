@@ -0,0 +1,100 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks per-call adb latency with and without a persistent shell session.
+
+Requires a running emulator. Example:
+
+```
+python -m android_world.adb_shell_benchmark --console_port=5554
+```
+"""
+
+from collections.abc import Callable, Sequence
+import time
+
+from absl import app
+from absl import flags
+from absl import logging
+from android_env import env_interface
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.utils import file_utils
+import numpy as np
+
+_CONSOLE_PORT = flags.DEFINE_integer(
+    'console_port', 5554, 'The console port of the running Android device.'
+)
+_GRPC_PORT = flags.DEFINE_integer(
+    'grpc_port', 8554, 'The gRPC port of the running Android device.'
+)
+_ADB_PATH = flags.DEFINE_string(
+    'adb_path', android_world_controller.DEFAULT_ADB_PATH, 'Path to adb.'
+)
+_NUM_CALLS = flags.DEFINE_integer(
+    'num_calls', 20, 'Number of calls to time per helper.'
+)
+
+_HELPERS: dict[str, Callable[[env_interface.AndroidEnvInterface], object]] = {
+    'get_logical_screen_size': adb_utils.get_logical_screen_size,
+    'get_orientation': adb_utils.get_orientation,
+    'check_airplane_mode': adb_utils.check_airplane_mode,
+    'check_directory_exists': lambda env: file_utils.check_directory_exists(
+        '/sdcard', env
+    ),
+}
+
+
+def _time_helpers(
+    env: env_interface.AndroidEnvInterface,
+) -> dict[str, np.ndarray]:
+  """Returns the latency in milliseconds of each call to each helper."""
+  latencies = {}
+  for name, helper in _HELPERS.items():
+    helper(env)  # Warm up, e.g. start the shell session.
+    times = []
+    for _ in range(_NUM_CALLS.value):
+      start = time.perf_counter()
+      helper(env)
+      times.append((time.perf_counter() - start) * 1000)
+    latencies[name] = np.array(times)
+  return latencies
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv
+  logging.set_verbosity(logging.WARNING)
+  controller = android_world_controller.get_controller(
+      _CONSOLE_PORT.value, _ADB_PATH.value, _GRPC_PORT.value
+  )
+  before = _time_helpers(controller)
+  controller.enable_shell_session()
+  after = _time_helpers(controller)
+  controller.close()
+
+  print(
+      f'{"helper":<24} | {"p50 ms":>7} {"p90 ms":>7} | {"session p50":>11}'
+      f' {"p90":>7} | {"speedup":>7}'
+  )
+  for name in _HELPERS:
+    b50, b90 = np.percentile(before[name], [50, 90])
+    a50, a90 = np.percentile(after[name], [50, 90])
+    print(
+        f'{name:<24} | {b50:7.1f} {b90:7.1f} | {a50:11.1f} {a90:7.1f} |'
+        f' {b50 / a50:6.1f}x'
+    )
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -21,6 +21,7 @@ import time
 from typing import Any
 
 from android_world.env import interface
+from android_world.utils import tracing
 
 
 @dataclasses.dataclass()
@@ -98,22 +99,37 @@ class EnvironmentInteractingAgent(abc.ABC):
     """Resets the agent."""
     self.env.reset(go_home=go_home)
 
-  def get_post_transition_state(self) -> interface.State:
-    """Convenience function to get the agent state after the transition."""
-    if self._transition_pause is None:
-      logging.info('Waiting for screen to stabilize before grabbing state...')
-      start = time.time()
-      state = self.env.get_state(wait_to_stabilize=True)
-      logging.info('Fetched after %.1f seconds.', time.time() - start)
-      return state
-    else:
-      time.sleep(self._transition_pause)
-      logging.info(
-          'Pausing {:2.1f} seconds before grabbing state.'.format(
-              self._transition_pause
-          )
-      )
-      return self.env.get_state(wait_to_stabilize=False)
+  def get_post_transition_state(
+      self, include_pixels: bool = True
+  ) -> interface.State:
+    """Convenience function to get the agent state after the transition.
+
+    Args:
+      include_pixels: Whether to capture a screenshot; see
+        `interface.AsyncEnv.get_state`.
+
+    Returns:
+      The state after the transition.
+    """
+    with tracing.span(tracing.GET_STATE):
+      if self._transition_pause is None:
+        logging.info('Waiting for screen to stabilize before grabbing state...')
+        start = time.time()
+        state = self.env.get_state(
+            wait_to_stabilize=True, include_pixels=include_pixels
+        )
+        logging.info('Fetched after %.1f seconds.', time.time() - start)
+        return state
+      else:
+        tracing.sleep(self._transition_pause)
+        logging.info(
+            'Pausing {:2.1f} seconds before grabbing state.'.format(
+                self._transition_pause
+            )
+        )
+        return self.env.get_state(
+            wait_to_stabilize=False, include_pixels=include_pixels
+        )
 
   @abc.abstractmethod
   def step(self, goal: str) -> AgentInteractionResult:
@@ -41,5 +41,7 @@ class HumanAgent(base_agent.EnvironmentInteractingAgent):
     result['pixels'] = state.pixels
     return base_agent.AgentInteractionResult(True, result)
 
-  def get_post_transition_state(self) -> interface.State:
-    return self.env.get_state()
+  def get_post_transition_state(
+      self, include_pixels: bool = True
+  ) -> interface.State:
+    return self.env.get_state(include_pixels=include_pixels)
@@ -20,6 +20,7 @@ import io
 import os
 import time
 from typing import Any, Optional
+from android_world.utils import tracing
 import google.generativeai as genai
 from google.generativeai import types
 from google.generativeai.types import answer_types
@@ -152,6 +153,7 @@ class GeminiGcpWrapper(LlmWrapper, MultimodalLlmWrapper):
       #  Assume safe if the response is None or doesn't have candidates.
       return True
 
+  @tracing.traced(tracing.LLM)
   def predict_mm(
       self,
       text_prompt: str,
@@ -283,6 +285,7 @@ class Gpt4Wrapper(LlmWrapper, MultimodalLlmWrapper):
   ) -> tuple[str, Optional[bool], Any]:
     return self.predict_mm(text_prompt, [])
 
+  @tracing.traced(tracing.LLM)
   def predict_mm(
       self, text_prompt: str, images: list[np.ndarray]
   ) -> tuple[str, Optional[bool], Any]:
@@ -342,3 +345,49 @@ class Gpt4Wrapper(LlmWrapper, MultimodalLlmWrapper):
         print('Error calling LLM, will retry soon...')
         print(e)
     return ERROR_CALLING_LLM, None, None
+
+
+class ScriptedLlmWrapper(LlmWrapper, MultimodalLlmWrapper):
+  """Returns canned responses in order, without calling a model.
+
+  Useful with `replay_env.ReplayAsyncEnv` to run agents deterministically and
+  offline, e.g. to benchmark their own overhead.
+  """
+
+  def __init__(
+      self,
+      responses: list[str],
+      model_name: str = 'scripted',
+      latency_sec: float = 0.0,
+  ):
+    """Initializes the wrapper.
+
+    Args:
+      responses: The responses, returned in order and repeated from the start
+        once exhausted.
+      model_name: The model name reported to agents.
+      latency_sec: Seconds to sleep per call, to simulate model latency.
+    """
+    if not responses:
+      raise ValueError('At least one response is required.')
+    self.responses = responses
+    self.model_name = model_name
+    self.latency_sec = latency_sec
+    self.prompts: list[str] = []
+
+  def predict(
+      self,
+      text_prompt: str,
+  ) -> tuple[str, Optional[bool], Any]:
+    return self.predict_mm(text_prompt, [])
+
+  @tracing.traced(tracing.LLM)
+  def predict_mm(
+      self, text_prompt: str, images: list[np.ndarray]
+  ) -> tuple[str, Optional[bool], Any]:
+    del images
+    response = self.responses[len(self.prompts) % len(self.responses)]
+    self.prompts.append(text_prompt)
+    if self.latency_sec:
+      time.sleep(self.latency_sec)
+    return response, True, response
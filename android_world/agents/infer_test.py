@@ -131,6 +131,14 @@ class InferTest(absltest.TestCase):
     gpt4v.predict_mm("fake prompt", [])
     self.mock_sleep.assert_called_once()
 
+  def test_scripted(self):
+    llm = infer.ScriptedLlmWrapper(["first", "second"])
+
+    outputs = [llm.predict(f"prompt {i}")[0] for i in range(3)]
+
+    self.assertEqual(outputs, ["first", "second", "first"])
+    self.assertEqual(llm.prompts, ["prompt 0", "prompt 1", "prompt 2"])
+
 
 if __name__ == "__main__":
   absltest.main()
@@ -14,7 +14,6 @@
 
 """A Multimodal Autonomous Agent for Android (M3A)."""
 
-import time
 from android_world.agents import agent_utils
 from android_world.agents import base_agent
 from android_world.agents import infer
@@ -22,6 +21,7 @@ from android_world.agents import m3a_utils
 from android_world.env import interface
 from android_world.env import json_action
 from android_world.env import representation_utils
+from android_world.utils import tracing
 
 PROMPT_PREFIX = (
     'You are an agent who can operate an Android phone on behalf of a user.'
@@ -516,7 +516,7 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
       print('Agent answered with: ' + converted_action.text)
 
     try:
-      self.env.execute_action(converted_action)
+      self.env.execute_action(converted_action, state)
     except Exception as e:  # pylint: disable=broad-exception-caught
       print('Failed to execute action.')
       print(str(e))
@@ -529,7 +529,7 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
           step_data,
       )
 
-    time.sleep(self.wait_after_action_seconds)
+    tracing.sleep(self.wait_after_action_seconds)
 
     state = self.env.get_state(wait_to_stabilize=False)
     logical_screen_size = self.env.logical_screen_size
@@ -97,9 +97,10 @@ class RandomAgent(base_agent.EnvironmentInteractingAgent):
 
   def step(self, goal: str) -> base_agent.AgentInteractionResult:
     """See base class."""
-    state = self.get_post_transition_state()
+    # Actions are random, so the screenshot is never needed.
+    state = self.get_post_transition_state(include_pixels=False)
     action = _generate_random_action(self.env.device_screen_size)
-    self.env.execute_action(action)
+    self.env.execute_action(action, state)
     if self._verbose:
       print(action)
     step_data = {
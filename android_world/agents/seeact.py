@@ -14,13 +14,14 @@
 
 """SeeAct agent for Android."""
 
-from typing import Any
+from typing import Any, Callable
 
 from android_world.agents import base_agent
 from android_world.agents import seeact_utils
 from android_world.env import actuation
 from android_world.env import interface
 from android_world.env import json_action
+from android_world.utils import tracing
 
 SEEACT_ONLINE_SYS_PROMPT = """Imagine that you are imitating humans operating an Android device for a task step by step. At each stage, you can see the Android screen like humans by a screenshot and know the previous actions before the current step decided by yourself through recorded history. You need to decide on the first following action to take. You can tap on an element, long-press an element, swipe, input text, open an app, or use the keyboard enter, home, or back key. (For your understanding, they are like `adb shell input tap`, `adb shell input swipe`, `adb shell input text`, `adb shell am start -n`, and `adb shell input keyevent`). One next step means one operation within these actions. Unlike humans, for typing (e.g., in text areas, text boxes), you should try directly typing the input or selecting the choice, bypassing the need for an initial click. You should not attempt to create accounts, log in or do the final submission. Terminate when you deem the task complete or if it requires potentially harmful actions."""
 
@@ -122,10 +123,34 @@ def generate_seeact_prompts(
 class SeeAct(base_agent.EnvironmentInteractingAgent):
   """SeeAct agent for Android."""
 
-  def __init__(self, env: interface.AsyncEnv, name: str = "SeeAct"):
+  def __init__(
+      self,
+      env: interface.AsyncEnv,
+      name: str = "SeeAct",
+      execute_request_fn: (
+          Callable[[list[dict[str, Any]]], dict[str, Any]] | None
+      ) = None,
+  ):
+    """Initializes the agent.
+
+    Args:
+      env: The environment.
+      name: The agent name.
+      execute_request_fn: Sends a messages payload to the model and returns the
+        OpenAI-style response. Defaults to `seeact_utils.execute_openai_request`.
+    """
     super().__init__(env, name)
     self._actions = []
     self.additional_guidelines = None
+    self._execute_request_fn = execute_request_fn
+
+  def _execute_request(
+      self, payload: list[dict[str, Any]]
+  ) -> dict[str, Any]:
+    with tracing.span(tracing.LLM):
+      if self._execute_request_fn is not None:
+        return self._execute_request_fn(payload)
+      return seeact_utils.execute_openai_request(payload)
 
   def reset(self, go_home: bool = False) -> None:
     super().reset(go_home)
@@ -172,7 +197,7 @@ class SeeAct(base_agent.EnvironmentInteractingAgent):
         sys_prompt, action_gen_prompt, state.pixels
     )
     result["action_gen_payload"] = payload
-    response = seeact_utils.execute_openai_request(payload)
+    response = self._execute_request(payload)
     action_gen_response = response["choices"][0]["message"]["content"]
     result["action_gen_response"] = action_gen_response
     if verbose:
@@ -192,7 +217,7 @@ class SeeAct(base_agent.EnvironmentInteractingAgent):
         action_ground_prompt,
     )
     result["action_ground_payload"] = payload
-    response = seeact_utils.execute_openai_request(payload)
+    response = self._execute_request(payload)
     action_ground_response = response["choices"][0]["message"]["content"]
     result["action_ground_response"] = action_ground_response
 
@@ -14,12 +14,12 @@
 
 """T3A: Text-only Autonomous Agent for Android."""
 
-import time
 from android_world.agents import agent_utils
 from android_world.agents import base_agent
 from android_world.agents import infer
 from android_world.agents import m3a_utils
 from android_world.env import adb_utils
+from android_world.env import conditions
 from android_world.env import interface
 from android_world.env import json_action
 from android_world.env import representation_utils
@@ -352,13 +352,18 @@ def _generate_ui_elements_description_list_full(
         ui_elements: list[representation_utils.UIElement],
         screen_width_height_px: tuple[int, int],
         goal: str,
-        model_name: str
+        model_name: str,
+        llm: infer.LlmWrapper | None = None,
 ) -> str:
     """Generate description for a list of UIElement using full information.
 
     Args:
       ui_elements: UI elements for the current screen.
       screen_width_height_px: Logical screen size.
+      goal: The current task goal.
+      model_name: Name of the Gemini model summarizing the screen, if `llm` is
+        not given.
+      llm: The LLM summarizing the screen.
 
     Returns:
       Information for each UIElement.
@@ -370,6 +375,7 @@ def _generate_ui_elements_description_list_full(
         screen_width_height_px,
         model_name,
         goal,
+        llm,
     )
 
 
@@ -454,6 +460,8 @@ class T3A(base_agent.EnvironmentInteractingAgent):
             env: interface.AsyncEnv,
             llm: infer.LlmWrapper,
             name: str = 'T3A',
+            include_screenshots: bool = True,
+            description_llm: infer.LlmWrapper | None = None,
     ):
         """Initializes a RandomAgent.
 
@@ -461,9 +469,16 @@ class T3A(base_agent.EnvironmentInteractingAgent):
           env: The environment.
           llm: The text only LLM.
           name: The agent name.
+          include_screenshots: Whether to capture screenshots. They are only
+            saved for result visualization, so turning this off fetches just
+            the UI tree each step, which is faster and lighter on memory.
+          description_llm: The LLM summarizing the UI elements on screen.
+            Defaults to Gemini, with the model name of `llm`.
         """
         super().__init__(env, name)
         self.llm = llm
+        self.description_llm = description_llm
+        self.include_screenshots = include_screenshots
         self.history = []
         self.additional_guidelines = None
 
@@ -491,7 +506,9 @@ class T3A(base_agent.EnvironmentInteractingAgent):
         }
         print('----------step ' + str(len(self.history) + 1))
 
-        state = self.get_post_transition_state()
+        state = self.get_post_transition_state(
+            include_pixels=self.include_screenshots
+        )
         logical_screen_size = self.env.logical_screen_size
 
         ui_elements = state.ui_elements
@@ -500,9 +517,11 @@ class T3A(base_agent.EnvironmentInteractingAgent):
             logical_screen_size,
             goal,
             model_name=self.llm.model_name,
+            llm=self.description_llm,
         )
         # Only save the screenshot for result visualization.
-        step_data['before_screenshot'] = state.pixels.copy()
+        if state.pixels is not None:
+            step_data['before_screenshot'] = state.pixels.copy()
         step_data['before_element_list'] = ui_elements
 
         memory_list = [
@@ -523,11 +542,9 @@ class T3A(base_agent.EnvironmentInteractingAgent):
         )
         step_data['action_selection_prompt'] = action_selection_prompt
 
-        start_time = time.time()
         action_output, is_safe, raw_response = self.llm.predict(
             action_selection_prompt,
         )
-        # print(f"Action selection took: {time.time() - start_time:.2f} seconds")
 
         if is_safe == False:  # pylint: disable=singleton-comparison
             #  is_safe could be None
@@ -585,13 +602,10 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
         )
         step_data['action_execution_prompt'] = action_execution_prompt
 
-        start_time = time.time()
         action_output, is_safe, raw_response = self.llm.predict(
             action_execution_prompt,
         )
 
-        # print(f'Action execution took: {time.time() - start_time:.2f} seconds')
-
         action_detail_reason, action_detail = m3a_utils.parse_reason_action_output(action_output)
         step_data['action_output'] = action_output
 
@@ -626,15 +640,15 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
                 )
                 self.history.append(step_data)
                 return base_agent.AgentInteractionResult(False, step_data)
-            else:
+            elif step_data['before_screenshot'] is not None:
                 # Add mark for the target ui element, just used for visualization.
                 m3a_utils.add_ui_element_mark(
                     step_data['before_screenshot'],
                     ui_elements[converted_action.index],
                     converted_action.index,
                     logical_screen_size,
-                    adb_utils.get_physical_frame_boundary(self.env.controller),
-                    adb_utils.get_orientation(self.env.controller),
+                    self.env.physical_frame_boundary,
+                    self.env.orientation,
                 )
 
         if converted_action.action_type == 'status':
@@ -651,7 +665,7 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
             print('Agent answered with: ' + converted_action.text)
 
         try:
-            self.env.execute_action(converted_action)
+            self.env.execute_action(converted_action, state)
         except Exception as e:  # pylint: disable=broad-exception-caught
             print(
                 'Some error happened executing the action ',
@@ -670,13 +684,29 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
             )
 
         if converted_action.action_type in ['open_app']:
-            print('Action is open_app; waiting 2s for UI to settle...')
-            time.sleep(2)
+            activity = adb_utils.get_adb_activity(converted_action.app_name)
+            if activity:
+                self.env.wait_until(
+                    conditions.activity_is(
+                        adb_utils.extract_package_name(activity),
+                        self.env.controller,
+                    ),
+                    timeout=2.0,
+                )
+            else:
+                self.env.wait_until(
+                    conditions.ui_changed(ui_elements, self.env.controller),
+                    timeout=2.0,
+                )
         elif converted_action.action_type in ['click']:
-            print('Action is click; waiting 3s for UI to settle...')
-            time.sleep(3)
+            self.env.wait_until(
+                conditions.ui_changed(ui_elements, self.env.controller),
+                timeout=3.0,
+            )
 
-        state = self.get_post_transition_state()
+        state = self.get_post_transition_state(
+            include_pixels=self.include_screenshots
+        )
         ui_elements = state.ui_elements
 
         after_element_list = _generate_ui_elements_description_list_full(
@@ -684,10 +714,12 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
             self.env.logical_screen_size,
             goal,
             model_name=self.llm.model_name,
+            llm=self.description_llm,
         )
 
         # Save screenshot only for result visualization.
-        step_data['after_screenshot'] = state.pixels.copy()
+        if state.pixels is not None:
+            step_data['after_screenshot'] = state.pixels.copy()
         step_data['after_element_list'] = ui_elements
 
         summary_prompt = _summarize_prompt(
@@ -697,11 +729,9 @@ Action: {{"action_type": "status", "goal_status": "infeasible"}}"""
             before_element_list,
             after_element_list,
         )
-        start_time = time.time()
         summary, is_safe, raw_response = self.llm.predict(
             summary_prompt,
         )
-        # print(f'Summarization took: {time.time() - start_time:.2f} seconds')
 
         import json
         json_part = '\n'.join(summary.splitlines()[1:])
@@ -15,17 +15,41 @@
 """Checkpointer class."""
 
 import abc
+import contextlib
+import dataclasses
 import datetime
 import gzip
+import hashlib
 import io
+import mmap
 import os
 import pickle
-from typing import Any
+import queue
+import struct
+import threading
+from typing import Any, BinaryIO, Callable, Iterator
+import uuid
 
 from absl import logging
+from android_world import constants
+import cv2
+import numpy as np
 
 INSTANCE_SEPARATOR = '_'
 
+# Suffix of the file holding a task group's full episodes as a gzipped pickle.
+_EPISODES_SUFFIX = '.pkl.gz'
+# Suffix of the file holding a task group's full episodes written with a codec.
+_CODEC_EPISODES_SUFFIX = '.awckpt'
+# Suffix of the sidecar file holding the same episodes without heavy payloads.
+_METADATA_SUFFIX = '.meta.pkl'
+# Episode fields that are too large to keep in the metadata sidecar.
+_HEAVY_FIELDS = frozenset([constants.EpisodeConstants.EPISODE_DATA])
+# Subdirectory of a run directory holding deduplicated images.
+_IMAGES_DIRECTORY = 'images'
+# Arrays with fewer elements than this are pickled inline.
+_MIN_IMAGE_SIZE = 64 * 64
+
 Episode = dict[str, Any]
 
 
@@ -59,15 +83,11 @@ def _gzip_pickle(data: Any) -> bytes:
   Returns:
       A bytes object containing the gzipped pickled data.
   """
-  pickled_data = io.BytesIO()
-  pickle.dump(data, pickled_data)
-
-  pickled_data.seek(0)  # Reset the stream position to the beginning
   compressed_data = io.BytesIO()
   with gzip.GzipFile(
       fileobj=compressed_data, mode='wb', compresslevel=5
   ) as f_out:
-    f_out.write(pickled_data.getvalue())
+    pickle.dump(data, f_out)
 
   return compressed_data.getvalue()
 
@@ -81,11 +101,282 @@ def _unzip_and_read_pickle(file_path: str) -> Any:
   Returns:
       The original Python object that was pickled and gzipped.
   """
+  with gzip.open(file_path, 'rb') as f_in:
+    return pickle.load(f_in)
+
+
+@contextlib.contextmanager
+def _open_atomically(file_path: str) -> Iterator[BinaryIO]:
+  """Opens a temporary file for writing and renames it onto `file_path`.
+
+  The rename only happens if the block completes, so readers never see a
+  partially written file.
+
+  Args:
+    file_path: The final path of the file.
+
+  Yields:
+    The temporary file, opened for binary writing.
+  """
+  # Unique per writer, as parallel runs may store the same file at once.
+  tmp_path = f'{file_path}.{uuid.uuid4().hex}.tmp'
+  try:
+    with open(tmp_path, 'xb') as f:
+      yield f
+    os.replace(tmp_path, file_path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+
+def _write_atomically(file_path: str, data: bytes) -> None:
+  """Writes data to a temporary file and renames it onto `file_path`."""
+  with _open_atomically(file_path) as f:
+    f.write(data)
+
+
+# Magic bytes starting every episode file written with a codec. Files written
+# without a codec are plain gzipped pickles and start with b'\x1f\x8b'.
+_CODEC_MAGIC = b'AWCKPT'
+_CODEC_FORMAT_VERSION = 1
+
+
+class Codec(abc.ABC):
+  """Serializes episodes to and from episode files.
+
+  Attributes:
+    name: Identifier of the codec, stored in the file header.
+  """
+
+  name: str
+
+  @abc.abstractmethod
+  def dump(self, data: Any, f: BinaryIO) -> None:
+    """Serializes data into a file positioned right after the header."""
+
+  @abc.abstractmethod
+  def load(self, f: BinaryIO) -> Any:
+    """Deserializes data from a file positioned right after the header."""
+
+
+class GzipCodec(Codec):
+  """Pickles with the highest protocol and streams into gzip."""
+
+  def __init__(self, compresslevel: int = 1):
+    if not 0 <= compresslevel <= 9:
+      raise ValueError(f'Invalid gzip compression level {compresslevel}.')
+    self.compresslevel = compresslevel
+    self.name = f'gzip-{compresslevel}'
+
+  def dump(self, data: Any, f: BinaryIO) -> None:
+    with gzip.GzipFile(
+        fileobj=f, mode='wb', compresslevel=self.compresslevel, mtime=0
+    ) as f_out:
+      pickle.dump(data, f_out, protocol=pickle.HIGHEST_PROTOCOL)
+
+  def load(self, f: BinaryIO) -> Any:
+    with gzip.GzipFile(fileobj=f, mode='rb') as f_in:
+      return pickle.load(f_in)
+
+
+class RawCodec(Codec):
+  """Uncompressed pickle whose large buffers can be memory mapped on load.
+
+  Uses pickle protocol 5 to write contiguous buffers, e.g. numpy arrays, out of
+  band and page aligned after the pickle stream. On load the file is memory
+  mapped copy-on-write and arrays are backed by the mapping, so they are only
+  read from disk when accessed.
+  """
+
+  name = 'raw'
+  _ALIGNMENT = mmap.ALLOCATIONGRANULARITY
+  _COUNTS = struct.Struct('<QQ')
+  _BUFFER = struct.Struct('<QQ')
+
+  def dump(self, data: Any, f: BinaryIO) -> None:
+    buffers = []
+    pickled = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    start = f.tell()
+    offset = (
+        start
+        + self._COUNTS.size
+        + self._BUFFER.size * len(raws)
+        + len(pickled)
+    )
+    table = []
+    for raw in raws:
+      offset = -(-offset // self._ALIGNMENT) * self._ALIGNMENT
+      table.append((offset, raw.nbytes))
+      offset += raw.nbytes
+    f.write(self._COUNTS.pack(len(raws), len(pickled)))
+    for entry in table:
+      f.write(self._BUFFER.pack(*entry))
+    f.write(pickled)
+    for raw, (offset, _) in zip(raws, table):
+      f.write(b'\0' * (offset - f.tell()))
+      f.write(raw)
+
+  def load(self, f: BinaryIO) -> Any:
+    num_buffers, pickle_size = self._COUNTS.unpack(f.read(self._COUNTS.size))
+    table = [
+        self._BUFFER.unpack(f.read(self._BUFFER.size))
+        for _ in range(num_buffers)
+    ]
+    pickle_start = f.tell()
+    mapped = memoryview(
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    )
+    return pickle.loads(
+        mapped[pickle_start : pickle_start + pickle_size],
+        buffers=[mapped[offset : offset + size] for offset, size in table],
+    )
+
+
+def get_codec(name: str) -> Codec:
+  """Returns the codec with the given name, e.g. 'gzip-1' or 'raw'."""
+  if name == RawCodec.name:
+    return RawCodec()
+  if name.startswith('gzip-'):
+    try:
+      return GzipCodec(int(name[len('gzip-') :]))
+    except ValueError:
+      pass
+  raise ValueError(f'Unknown checkpoint codec {name}.')
+
+
+def _write_episodes_file(file_path: str, data: Any, codec: Codec) -> None:
+  """Atomically writes data with a header identifying the codec."""
+  name = codec.name.encode('ascii')
+  with _open_atomically(file_path) as f:
+    f.write(_CODEC_MAGIC + bytes([_CODEC_FORMAT_VERSION, len(name)]) + name)
+    codec.dump(data, f)
+
+
+def _read_episodes_file(file_path: str) -> Any:
+  """Reads a file written by `_write_episodes_file` or a legacy gzip pickle."""
   with open(file_path, 'rb') as f:
-    compressed = f.read()
+    magic = f.read(len(_CODEC_MAGIC))
+    if magic != _CODEC_MAGIC:
+      f.seek(0)
+      with gzip.GzipFile(fileobj=f, mode='rb') as f_in:
+        return pickle.load(f_in)
+    version, name_size = f.read(2)
+    if version != _CODEC_FORMAT_VERSION:
+      raise ValueError(f'Unsupported checkpoint format version {version}.')
+    codec = get_codec(f.read(name_size).decode('ascii'))
+    return codec.load(f)
+
+
+def _task_group_id(filename: str) -> str | None:
+  """Returns the task group of an episodes file, or None for other files."""
+  for suffix in (_EPISODES_SUFFIX, _CODEC_EPISODES_SUFFIX):
+    if filename.endswith(suffix):
+      return filename[: -len(suffix)]
+  return None
+
+
+def _strip_heavy_fields(task_episodes: list[Episode]) -> list[Episode]:
+  """Returns copies of the episodes without their large fields."""
+  return [
+      {k: v for k, v in episode.items() if k not in _HEAVY_FIELDS}
+      for episode in task_episodes
+  ]
+
+
+@dataclasses.dataclass(frozen=True)
+class ImageRef:
+  """Reference to an image stored in a run directory's image store.
 
-  with gzip.open(io.BytesIO(compressed), 'rb') as f_in:
-    return pickle.load(f_in)
+  Attributes:
+    digest: Hex digest of the image's shape and pixel data.
+  """
+
+  digest: str
+
+
+def _is_image(value: Any) -> bool:
+  # Single-channel 3D arrays are kept inline since PNGs decode them as 2D.
+  return (
+      isinstance(value, np.ndarray)
+      and value.dtype == np.uint8
+      and value.size >= _MIN_IMAGE_SIZE
+      and (value.ndim == 2 or (value.ndim == 3 and value.shape[-1] in (3, 4)))
+  )
+
+
+def _replace_images(data: Any, replace_fn: Callable[[Any], Any]) -> Any:
+  """Returns a copy of nested dicts/lists/tuples with images replaced.
+
+  Args:
+    data: The data to traverse.
+    replace_fn: Called on every leaf; returns the value to use instead.
+  """
+  if isinstance(data, dict):
+    return {k: _replace_images(v, replace_fn) for k, v in data.items()}
+  if isinstance(data, list):
+    return [_replace_images(v, replace_fn) for v in data]
+  if isinstance(data, tuple) and not hasattr(data, '_fields'):
+    return tuple(_replace_images(v, replace_fn) for v in data)
+  return replace_fn(data)
+
+
+class _ImageStore:
+  """Content-addressed store of losslessly compressed images.
+
+  Each distinct image is written once as a PNG named after the digest of its
+  contents, so identical frames shared by consecutive steps or episodes are
+  only stored once.
+  """
+
+  def __init__(self, directory: str):
+    self._directory = directory
+
+  def _path(self, digest: str) -> str:
+    return os.path.join(self._directory, digest[:2], f'{digest}.png')
+
+  def put(self, image: np.ndarray) -> ImageRef:
+    """Stores an image if it is not stored yet and returns its reference."""
+    image = np.ascontiguousarray(image)
+    hasher = hashlib.sha256(repr(image.shape).encode())
+    hasher.update(image.data)
+    digest = hasher.hexdigest()
+    path = self._path(digest)
+    if not os.path.exists(path):
+      ok, encoded = cv2.imencode('.png', image)
+      if not ok:
+        raise ValueError(f'Unable to encode image of shape {image.shape}.')
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      _write_atomically(path, encoded.tobytes())
+    return ImageRef(digest)
+
+  def get(self, ref: ImageRef) -> np.ndarray:
+    """Loads a stored image."""
+    with open(self._path(ref.digest), 'rb') as f:
+      encoded = np.frombuffer(f.read(), dtype=np.uint8)
+    image = cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+    if image is None:
+      raise ValueError(f'Unable to decode image {ref.digest}.')
+    return image
+
+  def externalize(self, data: Any) -> Any:
+    """Returns a copy of the data with images replaced by references."""
+    return _replace_images(
+        data, lambda v: self.put(v) if _is_image(v) else v
+    )
+
+  def resolve(self, data: Any) -> Any:
+    """Returns a copy of the data with references replaced by images."""
+    cache = {}
+
+    def load(value: Any) -> Any:
+      if not isinstance(value, ImageRef):
+        return value
+      if value not in cache:
+        cache[value] = self.get(value)
+      return cache[value]
+
+    return _replace_images(data, load)
 
 
 class Checkpointer(abc.ABC):
@@ -109,58 +400,224 @@ class IncrementalCheckpointer(Checkpointer):
 
   Attributes:
       directory: The directory to store the task data.
+      deduplicate_images: Whether to move images (e.g. screenshots) out of the
+        episodes into a content-addressed store inside the directory. Episodes
+        then only hold `ImageRef`s, which are resolved again on load.
+      codec: The codec used to write episode files. If None, episodes are
+        written as plain gzipped pickles with the `.pkl.gz` suffix, readable
+        with `gzip.open` and `pickle.load`. Otherwise they are written with a
+        header naming the codec and the `.awckpt` suffix; e.g. `GzipCodec(1)`
+        saves about 1.5x faster than the default for a few percent larger
+        files, see checkpointer_benchmark.py. Files in either format can be
+        loaded.
   """
 
-  def __init__(self, directory: str) -> None:
+  def __init__(
+      self,
+      directory: str,
+      deduplicate_images: bool = False,
+      codec: Codec | None = None,
+  ) -> None:
     self.directory = directory
+    self.deduplicate_images = deduplicate_images
+    self.codec = codec
+    self._image_store = _ImageStore(
+        os.path.join(directory, _IMAGES_DIRECTORY)
+    )
     os.makedirs(directory, exist_ok=True)
 
   def save_episodes(self, task_episodes: list[Episode], task_name: str):
     """Saves a task group to disk.
 
+    Alongside the episodes, a small metadata sidecar is written containing
+    every field except the heavy ones (e.g. step data with screenshots), so
+    that `load(fields=...)` does not need to decompress the full episodes.
+
     Args:
         task_episodes: The task's episodes to save.
         task_name: The unique identifier for the task group.
     """
-    filename = os.path.join(self.directory, f'{task_name}.pkl.gz')
-    with open(filename, 'wb') as f:
-      compressed = _gzip_pickle(task_episodes)
-      f.write(compressed)
+    suffix, stale_suffix = _EPISODES_SUFFIX, _CODEC_EPISODES_SUFFIX
+    if self.codec is not None:
+      suffix, stale_suffix = stale_suffix, suffix
+    filename = os.path.join(self.directory, f'{task_name}{suffix}')
+    metadata_filename = self._metadata_path(task_name)
+    # Remove a stale sidecar first so it never describes other episodes than
+    # the ones on disk if writing is interrupted.
+    if os.path.exists(metadata_filename):
+      os.remove(metadata_filename)
+    payload = task_episodes
+    if self.deduplicate_images:
+      payload = self._image_store.externalize(task_episodes)
+    if self.codec is None:
+      _write_atomically(filename, _gzip_pickle(payload))
+    else:
+      _write_episodes_file(filename, payload, self.codec)
+    # Episodes previously saved in the other format are superseded.
+    stale_filename = os.path.join(self.directory, f'{task_name}{stale_suffix}')
+    if os.path.exists(stale_filename):
+      os.remove(stale_filename)
+    _write_atomically(
+        metadata_filename, pickle.dumps(_strip_heavy_fields(task_episodes))
+    )
     logging.info('Wrote task episodes for %s to %s', task_name, filename)
 
   def load(self, fields: list[str] | None = None) -> list[Episode]:
-    """Loads all task groups from disk."""
+    """Loads all task groups from disk.
+
+    Args:
+      fields: If provided, only these fields are returned for each episode. If
+        none of them are heavy fields, they are read from the metadata sidecars
+        when available, falling back to the full episodes otherwise.
+
+    Returns:
+      The episodes of all task groups.
+    """
     # Keep same order as runtime.
     directories = os.listdir(self.directory)
     directories.sort(key=sort_key)
+    use_metadata = fields is not None and not _HEAVY_FIELDS.intersection(fields)
 
     data = []
+    loaded_ids = set()
     for filename in directories:
-      if filename.endswith('.pkl.gz'):
-        try:
-          task_group_id = filename[:-7]  # Remove ".pkl.gz" extension
+      task_group_id = _task_group_id(filename)
+      if task_group_id is None or task_group_id in loaded_ids:
+        continue
+      loaded_ids.add(task_group_id)
+      try:
+        task_group = None
+        if use_metadata:
+          task_group = self._load_task_group_metadata(task_group_id)
+        if task_group is None:
           task_group = self._load_task_group(task_group_id)
-          if fields is not None:
-            task_group = [
-                {field: episode[field] for field in fields}
-                for episode in task_group
-            ]
-          data.extend(task_group)
-        except Exception as e:  # pylint: disable=broad-exception-caught
-          logging.info('Unable to load %s with exception: %s', filename, e)
+        if fields is not None:
+          task_group = [
+              {field: episode[field] for field in fields}
+              for episode in task_group
+          ]
+        data.extend(task_group)
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.info('Unable to load %s with exception: %s', filename, e)
     return data
 
+  def _metadata_path(self, task_group_id: str) -> str:
+    return os.path.join(self.directory, f'{task_group_id}{_METADATA_SUFFIX}')
+
+  def _load_task_group_metadata(
+      self, task_group_id: str
+  ) -> list[Episode] | None:
+    """Loads a task group's metadata sidecar, or None if there is none."""
+    try:
+      with open(self._metadata_path(task_group_id), 'rb') as f:
+        return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+      return None
+
   def _load_task_group(self, task_group_id: str) -> list[Episode]:
     """Loads a single task group from disk."""
-    filename = os.path.join(self.directory, f'{task_group_id}.pkl.gz')
+    filename = os.path.join(
+        self.directory, f'{task_group_id}{_CODEC_EPISODES_SUFFIX}'
+    )
+    if not os.path.exists(filename):
+      filename = os.path.join(
+          self.directory, f'{task_group_id}{_EPISODES_SUFFIX}'
+      )
     try:
-      return _unzip_and_read_pickle(filename)
+      task_group = _read_episodes_file(filename)
     except FileNotFoundError:
       logging.info(
           'File not readable: %s. It may not exist. Starting from empty state.',
           filename,
       )
       return []
+    if os.path.isdir(os.path.join(self.directory, _IMAGES_DIRECTORY)):
+      task_group = self._image_store.resolve(task_group)
+    return task_group
+
+
+class BackgroundCheckpointer(Checkpointer):
+  """Saves episodes on a background thread using another checkpointer.
+
+  `save_episodes` hands the episodes to a bounded queue and returns
+  immediately, so serializing and writing screenshot-heavy episodes overlaps
+  with running the next task. When the queue is full, `save_episodes` blocks
+  until the writer catches up. Episodes must not be mutated after they have
+  been handed over.
+
+  Pending episodes are flushed before `load` and on `close`. Errors raised by
+  the writer are re-raised on the next call to `save_episodes`, `flush` or
+  `close`. The wrapped checkpointer should write files atomically, as
+  `IncrementalCheckpointer` does, so that a resumed run only sees fully written
+  files.
+  """
+
+  def __init__(self, checkpointer: Checkpointer, max_pending: int = 2) -> None:
+    """Initializes the checkpointer and starts the writer thread.
+
+    Args:
+      checkpointer: The checkpointer used to write and load episodes.
+      max_pending: Maximum number of task groups waiting to be written.
+    """
+    self._checkpointer = checkpointer
+    self._queue = queue.Queue(maxsize=max_pending)
+    self._error: Exception | None = None
+    self._closed = False
+    self._thread = threading.Thread(
+        target=self._write_loop, name='checkpointer', daemon=True
+    )
+    self._thread.start()
+
+  def _write_loop(self) -> None:
+    while True:
+      item = self._queue.get()
+      try:
+        if item is None:
+          return
+        task_episodes, task_name = item
+        self._checkpointer.save_episodes(task_episodes, task_name)
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.exception('Unable to write task episodes for %s.', item[1])
+        self._error = e
+      finally:
+        self._queue.task_done()
+
+  def _raise_error(self) -> None:
+    if self._error is not None:
+      error, self._error = self._error, None
+      raise RuntimeError('Writing a checkpoint failed.') from error
+
+  def save_episodes(self, task_episodes: list[Episode], task_name: str):
+    """Queues a task group to be saved, blocking if the queue is full."""
+    if self._closed:
+      raise ValueError('Cannot save episodes after the checkpointer is closed.')
+    self._raise_error()
+    self._queue.put((task_episodes, task_name))
+
+  def flush(self) -> None:
+    """Blocks until all queued task groups have been written."""
+    self._queue.join()
+    self._raise_error()
+
+  def load(self, fields: list[str] | None = None) -> list[Episode]:
+    """Loads all episodes from disk, including pending ones."""
+    self.flush()
+    return self._checkpointer.load(fields=fields)
+
+  def close(self) -> None:
+    """Flushes pending task groups and stops the writer thread."""
+    if self._closed:
+      return
+    self._closed = True
+    self._queue.put(None)
+    self._thread.join()
+    self._raise_error()
+
+  def __enter__(self) -> 'BackgroundCheckpointer':
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.close()
 
 
 class NullCheckpointer(Checkpointer):
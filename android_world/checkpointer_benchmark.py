@@ -0,0 +1,185 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks checkpoint codecs on synthetic M3A and T3A episodes.
+
+Example:
+
+```
+python -m android_world.checkpointer_benchmark --codecs=gzip-1,gzip-5,raw
+```
+"""
+
+from collections.abc import Sequence
+import os
+import tempfile
+import time
+from typing import Any
+
+from absl import app
+from absl import flags
+from absl import logging
+from android_world import checkpointer as checkpointer_lib
+from android_world import constants
+import numpy as np
+
+_CODECS = flags.DEFINE_list(
+    'codecs',
+    ['gzip-1', 'gzip-5', 'gzip-9', 'raw'],
+    'Codecs to benchmark. See checkpointer.get_codec for valid names.',
+)
+_NUM_EPISODES = flags.DEFINE_integer(
+    'num_episodes', 4, 'Number of episodes per agent type.'
+)
+_NUM_STEPS = flags.DEFINE_integer('num_steps', 10, 'Number of steps each.')
+_DEDUPLICATE_IMAGES = flags.DEFINE_boolean(
+    'deduplicate_images',
+    False,
+    'Whether to also enable the deduplicated image store.',
+)
+
+_SCREEN_SHAPE = (2400, 1080, 3)
+
+
+def _synthetic_screenshot(rng: np.random.Generator) -> np.ndarray:
+  """Returns a screenshot-like image: flat panels with some detailed rows."""
+  image = np.empty(_SCREEN_SHAPE, dtype=np.uint8)
+  image[:] = rng.integers(200, 256, size=3, dtype=np.uint8)
+  for top in range(0, _SCREEN_SHAPE[0], 200):
+    image[top : top + 120, 40:-40] = rng.integers(0, 256, 3, dtype=np.uint8)
+    image[top + 40 : top + 80, 80:600] = rng.integers(
+        0, 256, size=(40, 520, 3), dtype=np.uint8
+    )
+  return image
+
+
+def _synthetic_ui_text(rng: np.random.Generator) -> str:
+  return '\n'.join(
+      f'UI element {i}: {{"text": "{rng.integers(1e6)}", "is_clickable": True}}'
+      for i in range(40)
+  )
+
+
+def _m3a_step(rng: np.random.Generator) -> dict[str, Any]:
+  raw = _synthetic_screenshot(rng)
+  return {
+      'raw_screenshot': raw,
+      'before_screenshot_with_som': _synthetic_screenshot(rng),
+      'before_ui_elements': [_synthetic_ui_text(rng)],
+      'after_screenshot_with_som': _synthetic_screenshot(rng),
+      'action_prompt': _synthetic_ui_text(rng),
+      'action_output': 'Reason: ... Action: {"action_type": "click"}',
+      'summary_prompt': _synthetic_ui_text(rng),
+      'summary': 'Clicked a button.',
+  }
+
+
+def _t3a_step(rng: np.random.Generator) -> dict[str, Any]:
+  return {
+      'before_screenshot': _synthetic_screenshot(rng),
+      'after_screenshot': _synthetic_screenshot(rng),
+      'before_element_list': _synthetic_ui_text(rng),
+      'after_element_list': _synthetic_ui_text(rng),
+      'action_selection_prompt': _synthetic_ui_text(rng),
+      'action_output': 'Reason: ... Action: {"action_type": "click"}',
+      'summary': 'Clicked a button.',
+  }
+
+
+def _synthetic_episode(step_fn, num_steps: int, seed: int) -> dict[str, Any]:
+  rng = np.random.default_rng(seed)
+  steps = [step_fn(rng) | {constants.STEP_NUMBER: i} for i in range(num_steps)]
+  return {
+      constants.EpisodeConstants.GOAL: 'Synthetic goal.',
+      constants.EpisodeConstants.TASK_TEMPLATE: step_fn.__name__,
+      constants.EpisodeConstants.EPISODE_DATA: {
+          k: [step[k] for step in steps] for k in steps[0]
+      },
+      constants.EpisodeConstants.IS_SUCCESSFUL: 1.0,
+      constants.EpisodeConstants.EPISODE_LENGTH: num_steps,
+  }
+
+
+def _directory_size(directory: str) -> int:
+  return sum(
+      os.path.getsize(os.path.join(root, name))
+      for root, _, names in os.walk(directory)
+      for name in names
+  )
+
+
+def _benchmark(
+    codec: checkpointer_lib.Codec, episodes: list[dict[str, Any]]
+) -> tuple[float, float, int]:
+  """Returns save seconds, load seconds and bytes written for a codec."""
+  with tempfile.TemporaryDirectory() as directory:
+    checkpointer = checkpointer_lib.IncrementalCheckpointer(
+        directory,
+        deduplicate_images=_DEDUPLICATE_IMAGES.value,
+        codec=codec,
+    )
+    start = time.perf_counter()
+    for i, episode in enumerate(episodes):
+      checkpointer.save_episodes([episode], f'task_{i}')
+    save_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = checkpointer.load()
+    # Touch every screenshot so lazily mapped codecs pay for reading them.
+    for episode in loaded:
+      for values in episode[constants.EpisodeConstants.EPISODE_DATA].values():
+        for value in values:
+          if isinstance(value, np.ndarray):
+            value.sum()
+    load_s = time.perf_counter() - start
+    return save_s, load_s, _directory_size(directory)
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv
+  logging.set_verbosity(logging.WARNING)
+  for step_fn in (_m3a_step, _t3a_step):
+    episodes = [
+        _synthetic_episode(step_fn, _NUM_STEPS.value, seed)
+        for seed in range(_NUM_EPISODES.value)
+    ]
+    raw_mb = (
+        sum(
+            value.nbytes
+            for episode in episodes
+            for values in episode[
+                constants.EpisodeConstants.EPISODE_DATA
+            ].values()
+            for value in values
+            if isinstance(value, np.ndarray)
+        )
+        / 1e6
+    )
+    agent = step_fn.__name__.strip('_').split('_')[0].upper()
+    print(f'\n{agent}: {len(episodes)} episodes, {raw_mb:.0f} MB of pixels')
+    print(
+        f'{"codec":>8} | {"save MB/s":>9} | {"load MB/s":>9} | {"size MB":>8}'
+    )
+    for name in _CODECS.value:
+      save_s, load_s, size = _benchmark(
+          checkpointer_lib.get_codec(name), episodes
+      )
+      print(
+          f'{name:>8} | {raw_mb / save_s:9.1f} | {raw_mb / load_s:9.1f} |'
+          f' {size / 1e6:8.1f}'
+      )
+
+
+if __name__ == '__main__':
+  app.run(main)
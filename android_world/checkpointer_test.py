@@ -12,10 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gzip
 import os
+import pickle
 import tempfile
+from unittest import mock
 from absl.testing import absltest
+from absl.testing import parameterized
 from android_world import checkpointer
+import numpy as np
 
 
 class CheckpointerTest(absltest.TestCase):
@@ -85,6 +90,274 @@ class CheckpointerTest(absltest.TestCase):
     expected_data = [{'key1': 'value1'}]
     self.assertEqual(expected_data, loaded_data)
 
+  @mock.patch.object(checkpointer, '_read_episodes_file')
+  def test_load_fields_reads_metadata_sidecar(self, mock_read) -> None:
+    """Tests that loading light fields does not read the full episodes."""
+    task_group = [{'key1': 'value1', 'episode_data': {'pixels': [0] * 100}}]
+    self.checkpointer.save_episodes(task_group, 'task_group')
+    self.assertTrue(
+        os.path.exists(
+            os.path.join(self.temp_dir.name, 'task_group.meta.pkl')
+        )
+    )
+
+    loaded_data = self.checkpointer.load(fields=['key1'])
+
+    self.assertEqual([{'key1': 'value1'}], loaded_data)
+    mock_read.assert_not_called()
+
+  def test_load_heavy_fields_reads_full_episodes(self) -> None:
+    """Tests that heavy fields are loaded from the full episodes."""
+    task_group = [{'key1': 'value1', 'episode_data': {'step_number': [0]}}]
+    self.checkpointer.save_episodes(task_group, 'task_group')
+    loaded_data = self.checkpointer.load(fields=['key1', 'episode_data'])
+    self.assertEqual(task_group, loaded_data)
+
+  def test_load_fields_without_sidecar(self) -> None:
+    """Tests that directories written before sidecars existed still load."""
+    task_group = [{'key1': 'value1', 'key2': 'value2'}]
+    self.checkpointer.save_episodes(task_group, 'task_group')
+    os.remove(os.path.join(self.temp_dir.name, 'task_group.meta.pkl'))
+    loaded_data = self.checkpointer.load(fields=['key1'])
+    self.assertEqual([{'key1': 'value1'}], loaded_data)
+
+  def test_overlapping_atomic_writes(self) -> None:
+    """Tests that concurrent writers to one file don't share a temp file."""
+    path = os.path.join(self.temp_dir.name, 'image.png')
+
+    with checkpointer._open_atomically(path) as first:
+      first.write(b'first')
+      with checkpointer._open_atomically(path) as second:
+        second.write(b'second')
+
+    with open(path, 'rb') as f:
+      self.assertEqual(f.read(), b'first')
+    self.assertEqual(os.listdir(self.temp_dir.name), ['image.png'])
+
+
+class DeduplicatedImagesCheckpointerTest(absltest.TestCase):
+
+  def setUp(self) -> None:
+    super().setUp()
+    self.temp_dir = tempfile.TemporaryDirectory()
+    self.checkpointer = checkpointer.IncrementalCheckpointer(
+        directory=self.temp_dir.name, deduplicate_images=True
+    )
+
+  def tearDown(self) -> None:
+    super().tearDown()
+    self.temp_dir.cleanup()
+
+  def _count_images(self) -> int:
+    return sum(
+        len(files)
+        for _, _, files in os.walk(os.path.join(self.temp_dir.name, 'images'))
+    )
+
+  def test_save_and_load_round_trips_images(self) -> None:
+    """Tests that images are restored losslessly on load."""
+    rng = np.random.default_rng(0)
+    before = rng.integers(0, 256, size=(100, 80, 3), dtype=np.uint8)
+    after = rng.integers(0, 256, size=(100, 80, 3), dtype=np.uint8)
+    task_group = [{
+        'goal': 'goal',
+        'episode_data': {
+            'before_screenshot': [before, after],
+            'after_screenshot': [after, before],
+            'step_number': [0, 1],
+        },
+    }]
+
+    self.checkpointer.save_episodes(task_group, 'task_group')
+    loaded_data = self.checkpointer.load()
+
+    loaded_episode_data = loaded_data[0]['episode_data']
+    np.testing.assert_array_equal(
+        loaded_episode_data['before_screenshot'][0], before
+    )
+    np.testing.assert_array_equal(
+        loaded_episode_data['after_screenshot'][0], after
+    )
+    self.assertEqual(loaded_episode_data['step_number'], [0, 1])
+    self.assertEqual(self._count_images(), 2)
+
+  def test_save_and_load_keeps_image_shapes(self) -> None:
+    """Tests that grayscale images keep their shape through the store."""
+    rng = np.random.default_rng(0)
+    images = [
+        rng.integers(0, 256, size=(100, 80), dtype=np.uint8),
+        rng.integers(0, 256, size=(100, 80, 1), dtype=np.uint8),
+        rng.integers(0, 256, size=(100, 80, 4), dtype=np.uint8),
+    ]
+
+    self.checkpointer.save_episodes(
+        [{'episode_data': {'raw_screenshot': images}}], 'task_group'
+    )
+    loaded_data = self.checkpointer.load()
+
+    loaded_images = loaded_data[0]['episode_data']['raw_screenshot']
+    for loaded, image in zip(loaded_images, images):
+      self.assertEqual(loaded.shape, image.shape)
+      np.testing.assert_array_equal(loaded, image)
+
+  def test_identical_images_are_stored_once(self) -> None:
+    """Tests that identical images across task groups are deduplicated."""
+    image = np.full((100, 100, 3), 7, dtype=np.uint8)
+    self.checkpointer.save_episodes(
+        [{'episode_data': {'raw_screenshot': [image, image.copy()]}}], 'a'
+    )
+    self.checkpointer.save_episodes(
+        [{'episode_data': {'raw_screenshot': [image.copy()]}}], 'b'
+    )
+    self.assertEqual(self._count_images(), 1)
+
+  def test_small_arrays_are_kept_inline(self) -> None:
+    """Tests that small arrays are not moved to the image store."""
+    small = np.zeros((3, 3, 3), dtype=np.uint8)
+    self.checkpointer.save_episodes(
+        [{'episode_data': {'raw_screenshot': [small]}}], 'a'
+    )
+    self.assertEqual(self._count_images(), 0)
+
+
+class BackgroundCheckpointerTest(absltest.TestCase):
+
+  def setUp(self) -> None:
+    super().setUp()
+    self.temp_dir = tempfile.TemporaryDirectory()
+    self.checkpointer = checkpointer.BackgroundCheckpointer(
+        checkpointer.IncrementalCheckpointer(directory=self.temp_dir.name)
+    )
+
+  def tearDown(self) -> None:
+    super().tearDown()
+    self.checkpointer.close()
+    self.temp_dir.cleanup()
+
+  def test_load_sees_pending_episodes(self) -> None:
+    """Tests that load flushes queued episodes first."""
+    task_groups = [([{'key': f'value{i}'}], f'task{i}') for i in range(5)]
+    for task_group, task_group_id in task_groups:
+      self.checkpointer.save_episodes(task_group, task_group_id)
+    loaded_data = self.checkpointer.load(fields=['key'])
+    self.assertCountEqual(
+        [{'key': f'value{i}'} for i in range(5)], loaded_data
+    )
+
+  def test_close_flushes_episodes(self) -> None:
+    """Tests that closing writes all queued episodes."""
+    self.checkpointer.save_episodes([{'key': 'value'}], 'task_group')
+    self.checkpointer.close()
+    loaded_data = checkpointer.IncrementalCheckpointer(
+        directory=self.temp_dir.name
+    ).load()
+    self.assertEqual([{'key': 'value'}], loaded_data)
+    with self.assertRaises(ValueError):
+      self.checkpointer.save_episodes([{'key': 'value'}], 'task_group')
+
+  def test_write_error_is_raised(self) -> None:
+    """Tests that errors from the writer thread surface to the caller."""
+    mock_checkpointer = mock.create_autospec(
+        checkpointer.Checkpointer, instance=True
+    )
+    mock_checkpointer.save_episodes.side_effect = OSError('Disk full')
+    background = checkpointer.BackgroundCheckpointer(mock_checkpointer)
+    background.save_episodes([{'key': 'value'}], 'task_group')
+    with self.assertRaises(RuntimeError):
+      background.flush()
+    background.close()
+
+  def test_no_partial_files_are_left(self) -> None:
+    """Tests that only fully written files end up in the directory."""
+    self.checkpointer.save_episodes([{'key': 'value'}], 'task_group')
+    self.checkpointer.flush()
+    self.assertCountEqual(
+        ['task_group.pkl.gz', 'task_group.meta.pkl'],
+        os.listdir(self.temp_dir.name),
+    )
+
+
+class CodecTest(parameterized.TestCase):
+
+  def setUp(self) -> None:
+    super().setUp()
+    self.temp_dir = tempfile.TemporaryDirectory()
+
+  def tearDown(self) -> None:
+    super().tearDown()
+    self.temp_dir.cleanup()
+
+  @parameterized.named_parameters(
+      dict(testcase_name='gzip_1', codec=checkpointer.GzipCodec(1)),
+      dict(testcase_name='gzip_9', codec=checkpointer.GzipCodec(9)),
+      dict(testcase_name='raw', codec=checkpointer.RawCodec()),
+  )
+  def test_save_and_load(self, codec: checkpointer.Codec) -> None:
+    """Tests that episodes round trip through each codec."""
+    screenshot = np.arange(200 * 100 * 3, dtype=np.uint8).reshape(200, 100, 3)
+    task_group = [{
+        'goal': 'goal',
+        'episode_data': {'raw_screenshot': [screenshot, screenshot[::2]]},
+    }]
+    writer = checkpointer.IncrementalCheckpointer(
+        self.temp_dir.name, codec=codec
+    )
+    writer.save_episodes(task_group, 'task_group')
+
+    loaded_data = checkpointer.IncrementalCheckpointer(
+        self.temp_dir.name
+    ).load()
+
+    self.assertCountEqual(
+        os.listdir(self.temp_dir.name),
+        ['task_group.awckpt', 'task_group.meta.pkl'],
+    )
+    self.assertEqual(loaded_data[0]['goal'], 'goal')
+    screenshots = loaded_data[0]['episode_data']['raw_screenshot']
+    np.testing.assert_array_equal(screenshots[0], screenshot)
+    np.testing.assert_array_equal(screenshots[1], screenshot[::2])
+
+  def test_default_writes_plain_gzip_pickle(self) -> None:
+    """Tests that without a codec files stay readable with gzip and pickle."""
+    checkpointer.IncrementalCheckpointer(self.temp_dir.name).save_episodes(
+        [{'key': 'value'}], 'task_group'
+    )
+    with gzip.open(
+        os.path.join(self.temp_dir.name, 'task_group.pkl.gz'), 'rb'
+    ) as f:
+      self.assertEqual([{'key': 'value'}], pickle.load(f))
+
+  def test_saving_in_other_format_replaces_file(self) -> None:
+    """Tests that a task group is only stored in the latest format."""
+    checkpointer.IncrementalCheckpointer(self.temp_dir.name).save_episodes(
+        [{'key': 'old'}], 'task_group'
+    )
+    writer = checkpointer.IncrementalCheckpointer(
+        self.temp_dir.name, codec=checkpointer.RawCodec()
+    )
+    writer.save_episodes([{'key': 'new'}], 'task_group')
+
+    self.assertCountEqual(
+        os.listdir(self.temp_dir.name),
+        ['task_group.awckpt', 'task_group.meta.pkl'],
+    )
+    self.assertEqual([{'key': 'new'}], writer.load())
+
+  def test_load_legacy_file(self) -> None:
+    """Tests that files written before codecs existed can still be loaded."""
+    with open(os.path.join(self.temp_dir.name, 'task_group.pkl.gz'), 'wb') as f:
+      f.write(checkpointer._gzip_pickle([{'key': 'value'}]))
+    loaded_data = checkpointer.IncrementalCheckpointer(
+        self.temp_dir.name
+    ).load()
+    self.assertEqual([{'key': 'value'}], loaded_data)
+
+  def test_get_codec(self) -> None:
+    self.assertEqual(checkpointer.get_codec('gzip-3').name, 'gzip-3')
+    self.assertEqual(checkpointer.get_codec('raw').name, 'raw')
+    with self.assertRaises(ValueError):
+      checkpointer.get_codec('gzip-fast')
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -17,6 +17,10 @@
 # The current step number in a given episode.
 STEP_NUMBER = 'step_number'
 
+# Seconds spent in each kind of operation during a step, e.g. LLM calls and adb
+# calls; see `tracing.breakdown`.
+STEP_TIMING = 'step_timing'
+
 
 class EpisodeConstants:
   """Episode-level constants when recording agents performing automation tasks.
@@ -21,8 +21,10 @@ from typing import Any
 from android_env import env_interface
 from android_world.env import adb_utils
 from android_world.env import android_world_controller
+from android_world.env import conditions
 from android_world.env import json_action
 from android_world.env import representation_utils
+from android_world.utils import tracing
 
 
 def execute_adb_action(
@@ -89,8 +91,8 @@ def execute_adb_action(
         click_action = copy.deepcopy(action)
         click_action.action_type = 'click'
         execute_adb_action(click_action, screen_elements, screen_size, env, get_state)
-        time.sleep(1.0)
-      adb_utils.type_text(text, env, timeout_sec=10)
+        conditions.wait_until(conditions.keyboard_shown(env), timeout=1.0)
+      adb_utils.type_text(text, env, timeout_sec=10, paste=True)
     else:
       logging.warning(
           'Input_text action indicated, but no text provided. No '
@@ -121,8 +123,7 @@ def execute_adb_action(
               hide_keyboard_action, screen_elements, screen_size, env, get_state
           )
 
-          # Wait for the keyboard to hide.
-          time.sleep(2.0)
+          conditions.wait_until(conditions.keyboard_hidden(env), timeout=2.0)
         else:
           logging.warning(
               'Fill_form action indicated, but no text, index or coordinates provided.'
@@ -218,7 +219,7 @@ def execute_adb_action(
       raise ValueError('No app name provided')
 
   elif action.action_type == 'wait':
-    time.sleep(1.0)
+    tracing.sleep(1.0)
 
   elif action.action_type == 'launch_adb_activity':
     if action.activity_nickname == 'app_drawer':
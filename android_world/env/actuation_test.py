@@ -21,6 +21,7 @@ from android_env import env_interface
 from android_world.env import actuation
 from android_world.env import adb_utils
 from android_world.env import android_world_controller
+from android_world.env import conditions
 from android_world.env import json_action
 from android_world.env import representation_utils
 
@@ -163,13 +164,15 @@ class ExecuteAdbActionTest(absltest.TestCase):
         mock.patch.object(
             adb_utils, 'press_enter_button'
         ) as mock_press_enter_button,
+        mock.patch.object(conditions, 'wait_until') as mock_wait_until,
     ):
       actuation.execute_adb_action(
           action, self.screen_elements, self.screen_size, self.mock_env
       )
       mock_tap_screen.assert_called_once_with(50, 50, self.mock_env)
+      mock_wait_until.assert_called_once_with(mock.ANY, timeout=1.0)
       mock_type_text.assert_called_once_with(
-          'test input', self.mock_env, timeout_sec=10
+          'test input', self.mock_env, timeout_sec=10, paste=True
       )
       mock_press_enter_button.assert_called_once_with(self.mock_env)
 
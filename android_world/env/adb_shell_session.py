@@ -0,0 +1,286 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A long-lived `adb shell` that commands are streamed through.
+
+Every generic adb request spawns a new adb client and device shell, which
+costs tens to hundreds of milliseconds. A session keeps one shell open and
+writes commands to its stdin, reading each response up to a sentinel line that
+carries the command's exit status.
+"""
+
+from collections.abc import Sequence
+import queue
+import re
+import shlex
+import subprocess
+import threading
+import time
+from typing import Optional
+import uuid
+
+from absl import logging
+from android_env.proto import adb_pb2
+
+# Used for requests that don't set a timeout.
+_DEFAULT_TIMEOUT_SEC = 120.0
+# How long a new shell has to answer before commands are sent to it.
+_START_TIMEOUT_SEC = 10.0
+
+
+class ShellSessionError(RuntimeError):
+  """Raised when a command could not be run through the session."""
+
+
+class CommandNotSentError(ShellSessionError):
+  """Raised when a command was never written to the shell.
+
+  Unlike other session errors, the command did not run, so it is safe to run it
+  some other way.
+  """
+
+
+class AdbShellSession:
+  """Runs shell commands through one persistent `adb shell` process.
+
+  The process is started lazily and restarted after a failure, e.g. a timeout
+  or the device disconnecting, or when it has ended, e.g. because `adb root`
+  restarted adbd. A new shell must answer a no-op before commands are sent to
+  it. After `max_restarts` consecutive failures the session disables itself and
+  every call raises `CommandNotSentError`, so callers can fall back to regular
+  adb requests.
+  """
+
+  def __init__(
+      self,
+      adb_command_prefix: Sequence[str],
+      max_restarts: int = 3,
+  ):
+    """Initializes the session.
+
+    Args:
+      adb_command_prefix: The adb client command up to the subcommand, e.g.
+        `['adb', '-P', '5037', '-s', 'emulator-5554']`.
+      max_restarts: Number of consecutive failures after which the session is
+        disabled.
+    """
+    self._command = list(adb_command_prefix) + ['shell']
+    self._max_restarts = max_restarts
+    self._lock = threading.Lock()
+    self._process: Optional[subprocess.Popen[bytes]] = None
+    self._output: queue.Queue[bytes] = queue.Queue()
+    self._failures = 0
+
+  @property
+  def enabled(self) -> bool:
+    return self._failures <= self._max_restarts
+
+  def _start(self) -> None:
+    logging.info('Starting adb shell session: %s', self._command)
+    self._process = subprocess.Popen(
+        self._command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=0,
+    )
+    # Each process gets its own queue so a dying reader can't leak output into
+    # its replacement.
+    self._output = queue.Queue()
+    threading.Thread(
+        target=self._read_output,
+        args=(self._process.stdout, self._output),
+        daemon=True,
+    ).start()
+
+  @staticmethod
+  def _read_output(stream, output: queue.Queue[bytes]) -> None:
+    """Forwards chunks of the shell's output, then an empty chunk on EOF."""
+    while chunk := stream.read(65536):
+      output.put(chunk)
+    output.put(b'')
+
+  def _has_ended(self) -> bool:
+    """Returns whether the shell has exited or closed its output."""
+    if self._process is None or self._process.poll() is not None:
+      return True
+    # The process may linger briefly after its connection to adbd is gone, but
+    # the reader has already seen the end of its output. Anything else left in
+    # the queue is stale output of a failed command.
+    while True:
+      try:
+        if not self._output.get_nowait():
+          return True
+      except queue.Empty:
+        return False
+
+  def _ensure_started(self) -> None:
+    """Starts a new shell if needed and waits for it to answer.
+
+    Raises:
+      OSError: If the shell could not be started or written to.
+      ShellSessionError: If the new shell did not answer.
+    """
+    if not self._has_ended():
+      return
+    if self._process is not None:
+      logging.info('adb shell session ended; restarting it.')
+      self._stop()
+    self._start()
+    marker = self._new_marker()
+    self._write(':', marker)
+    self._read(':', marker, _START_TIMEOUT_SEC)
+
+  @staticmethod
+  def _new_marker() -> bytes:
+    return f'__android_world_{uuid.uuid4().hex}__'.encode()
+
+  def _stop(self) -> None:
+    if self._process is None:
+      return
+    try:
+      self._process.kill()
+      self._process.wait(timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+      pass
+    self._process = None
+
+  def run(
+      self, command: str, timeout_sec: Optional[float] = None
+  ) -> tuple[int, bytes]:
+    """Runs a shell command on the device.
+
+    Args:
+      command: The command, interpreted by the device shell.
+      timeout_sec: Maximum time to wait for the command to finish.
+
+    Returns:
+      The exit status and the combined stdout and stderr of the command.
+
+    Raises:
+      CommandNotSentError: If the session is disabled, a new shell did not
+        answer or the command could not be written to the shell.
+      ShellSessionError: If the command was written but did not complete, so
+        it may have partly or fully run.
+      In both cases the shell is restarted on the next call.
+    """
+    with self._lock:
+      if not self.enabled:
+        raise CommandNotSentError('adb shell session is disabled.')
+      marker = self._new_marker()
+      try:
+        self._ensure_started()
+        self._write(command, marker)
+      except (OSError, ShellSessionError) as e:
+        self._fail(e)
+        raise CommandNotSentError(str(e)) from e
+      try:
+        result = self._read(
+            command, marker, timeout_sec or _DEFAULT_TIMEOUT_SEC
+        )
+      except ShellSessionError as e:
+        self._fail(e)
+        raise
+      self._failures = 0
+      return result
+
+  def _fail(self, error: Exception) -> None:
+    self._stop()
+    self._failures += 1
+    if not self.enabled:
+      logging.warning('Disabling adb shell session after error: %s', error)
+
+  def _write(self, command: str, marker: bytes) -> None:
+    """Writes the command, followed by a sentinel with its exit status."""
+    # The command is quoted and evaluated in a subshell, so unbalanced quotes or
+    # brackets are a syntax error of that subshell rather than leaving the
+    # session waiting for the rest of the command. Reading from /dev/null keeps
+    # the command from consuming the session's stdin. The sentinel starts with a
+    # newline so output without a trailing newline is still framed; it is
+    # stripped in `_read`.
+    self._process.stdin.write(
+        f'( eval {shlex.quote(command)}\n) </dev/null 2>&1; '.encode()
+        + b"printf '\\n%s %d\\n' "
+        + marker
+        + b' $?\n'
+    )
+    self._process.stdin.flush()
+
+  def _read(
+      self, command: str, marker: bytes, timeout_sec: float
+  ) -> tuple[int, bytes]:
+    """Reads the command's output up to the sentinel."""
+    sentinel = re.compile(b'\n' + re.escape(marker) + rb' (\d+)\n')
+    deadline = time.monotonic() + timeout_sec
+    output = b''
+    while (match := sentinel.search(output)) is None:
+      try:
+        chunk = self._output.get(timeout=max(0, deadline - time.monotonic()))
+      except queue.Empty as e:
+        raise ShellSessionError(
+            f'Timed out after {timeout_sec}s running {command!r}.'
+        ) from e
+      if not chunk:
+        raise ShellSessionError(f'adb shell exited while running {command!r}.')
+      output += chunk
+    return int(match.group(1)), output[: match.start()]
+
+  def execute_adb_call(
+      self, request: adb_pb2.AdbRequest
+  ) -> adb_pb2.AdbResponse:
+    """Runs a generic `shell` request, mirroring android_env's response.
+
+    Args:
+      request: A request with `generic.args` starting with "shell".
+
+    Returns:
+      The response. As in android_env, a non-zero exit status gives an
+      `ADB_ERROR` response with the output as its error message.
+
+    Raises:
+      CommandNotSentError: If the command was never sent to the device.
+      ShellSessionError: If the command was sent but did not complete.
+    """
+    args = list(request.generic.args)
+    # The adb client also joins the arguments with spaces.
+    exit_code, output = self.run(' '.join(args[1:]), request.timeout_sec)
+    if exit_code:
+      return adb_pb2.AdbResponse(
+          status=adb_pb2.AdbResponse.Status.ADB_ERROR,
+          error_message=output.decode('utf-8', errors='replace'),
+      )
+    return adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK,
+        generic=adb_pb2.AdbResponse.GenericResponse(output=output),
+    )
+
+  def close(self) -> None:
+    with self._lock:
+      if self._process is not None and self._process.poll() is None:
+        try:
+          self._process.stdin.write(b'exit\n')
+          self._process.stdin.flush()
+          self._process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+          pass
+      self._stop()
+
+
+def is_shell_request(request: adb_pb2.AdbRequest) -> bool:
+  """Returns whether the request is a generic `adb shell <command>` call."""
+  return (
+      request.WhichOneof('command') == 'generic'
+      and len(request.generic.args) > 1
+      and request.generic.args[0] == 'shell'
+  )
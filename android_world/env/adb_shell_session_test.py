@@ -0,0 +1,135 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from absl.testing import absltest
+from android_env.proto import adb_pb2
+from android_world.env import adb_shell_session
+
+# Stands in for `adb -s <device>`; the appended "shell" argument is ignored.
+_LOCAL_SHELL = ['sh', '-c', 'exec sh', 'sh']
+
+
+class AdbShellSessionTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.session = adb_shell_session.AdbShellSession(_LOCAL_SHELL)
+    self.addCleanup(self.session.close)
+
+  def test_run(self):
+    self.assertEqual(self.session.run('echo hello'), (0, b'hello\n'))
+    self.assertEqual(self.session.run('printf partial'), (0, b'partial'))
+    self.assertEqual(self.session.run('echo oops >&2; exit 2'), (2, b'oops\n'))
+
+  def test_reuses_process(self):
+    _, first = self.session.run('echo $$')
+    _, second = self.session.run('echo $$')
+    self.assertEqual(first, second)
+
+  def test_commands_do_not_read_session_input(self):
+    self.assertEqual(self.session.run('cat'), (0, b''))
+    self.assertEqual(self.session.run('echo still here'), (0, b'still here\n'))
+
+  def test_restarts_after_timeout(self):
+    with self.assertRaises(adb_shell_session.ShellSessionError) as cm:
+      self.session.run('sleep 5', timeout_sec=0.2)
+    # The command was sent, so it must not be retried elsewhere.
+    self.assertNotIsInstance(
+        cm.exception, adb_shell_session.CommandNotSentError
+    )
+    self.assertEqual(self.session.run('echo back'), (0, b'back\n'))
+
+  def test_restarts_after_shell_exits(self):
+    with self.assertRaises(adb_shell_session.ShellSessionError):
+      self.session.run('kill -9 $$')
+    self.assertEqual(self.session.run('echo back'), (0, b'back\n'))
+
+  def test_unbalanced_quotes_fail_fast(self):
+    exit_code, _ = self.session.run("echo 'oops", timeout_sec=5)
+    self.assertNotEqual(exit_code, 0)
+    self.assertEqual(self.session.run('echo "ok"'), (0, b'ok\n'))
+
+  def test_restarts_shell_whose_output_ended(self):
+    _, first = self.session.run('echo $$')
+    # As if adbd restarted, e.g. after `adb root`, before the process exited.
+    self.session._output.put(b'')
+
+    _, second = self.session.run('echo $$')
+
+    self.assertNotEqual(first, second)
+
+  def test_command_not_sent_if_new_shell_does_not_answer(self):
+    session = adb_shell_session.AdbShellSession(
+        ['sh', '-c', 'echo error: device offline', 'sh']
+    )
+    self.addCleanup(session.close)
+
+    with self.assertRaises(adb_shell_session.CommandNotSentError):
+      session.run('true')
+
+  def test_disables_after_repeated_failures(self):
+    session = adb_shell_session.AdbShellSession(
+        ['/nonexistent/adb'], max_restarts=1
+    )
+    for _ in range(2):
+      with self.assertRaises(adb_shell_session.CommandNotSentError):
+        session.run('true')
+    self.assertFalse(session.enabled)
+    with self.assertRaises(adb_shell_session.CommandNotSentError):
+      session.run('true')
+
+  def test_execute_adb_call(self):
+    response = self.session.execute_adb_call(
+        adb_pb2.AdbRequest(
+            generic=adb_pb2.AdbRequest.GenericRequest(
+                args=['shell', 'echo', 'a', 'b']
+            )
+        )
+    )
+    self.assertEqual(response.status, adb_pb2.AdbResponse.Status.OK)
+    self.assertEqual(response.generic.output, b'a b\n')
+
+    response = self.session.execute_adb_call(
+        adb_pb2.AdbRequest(
+            generic=adb_pb2.AdbRequest.GenericRequest(args=['shell', 'false'])
+        )
+    )
+    self.assertEqual(response.status, adb_pb2.AdbResponse.Status.ADB_ERROR)
+
+  def test_is_shell_request(self):
+    self.assertTrue(
+        adb_shell_session.is_shell_request(
+            adb_pb2.AdbRequest(
+                generic=adb_pb2.AdbRequest.GenericRequest(args=['shell', 'ls'])
+            )
+        )
+    )
+    self.assertFalse(
+        adb_shell_session.is_shell_request(
+            adb_pb2.AdbRequest(
+                generic=adb_pb2.AdbRequest.GenericRequest(
+                    args=['install', 'a.apk']
+                )
+            )
+        )
+    )
+    self.assertFalse(
+        adb_shell_session.is_shell_request(
+            adb_pb2.AdbRequest(tap=adb_pb2.AdbRequest.Tap(x=1, y=2))
+        )
+    )
+
+
+if __name__ == '__main__':
+  absltest.main()
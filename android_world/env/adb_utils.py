@@ -14,15 +14,21 @@
 
 """Utilties to interact with the environment using adb."""
 
+from collections.abc import Sequence
+import dataclasses
 import os
 import re
+import shlex
 import time
 from typing import Any, Callable, Collection, Iterable, Literal, Optional, TypeVar
 import unicodedata
+import uuid
+from xml.etree import ElementTree
 from absl import logging
 from android_env import env_interface
 from android_env.components import errors
 from android_env.proto import adb_pb2
+from android_world.env import representation_utils
 import immutabledict
 
 T = TypeVar('T')
@@ -423,6 +429,24 @@ def press_keyboard_generic(
   return response
 
 
+def is_keyboard_shown(
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = _DEFAULT_TIMEOUT_SECS,
+) -> bool:
+  """Returns whether the soft keyboard is currently shown.
+
+  Args:
+    env: The environment.
+    timeout_sec: A timeout to use for this operation.
+  """
+  response = issue_generic_request(
+      ['shell', 'dumpsys', 'input_method'], env, timeout_sec
+  )
+  return bool(
+      re.search(r'mInputShown=true', response.generic.output.decode('utf-8'))
+  )
+
+
 def _adb_text_format(text: str) -> str:
   """Prepares text for use with adb."""
   to_escape = [
@@ -462,10 +486,121 @@ def _split_words_and_newlines(text: str) -> Iterable[str]:
       yield '\n'
 
 
+# Text with at least this many words is pasted rather than typed. Typing
+# takes an adb call of a few hundred milliseconds per word, while pasting takes
+# two UI hierarchy dumps and two round trips through the clipper app, several
+# seconds in all.
+_PASTE_MIN_WORDS = 30
+
+
+def _focused_text(env: env_interface.AndroidEnvInterface) -> Optional[str]:
+  """Returns the text of the focused UI element, or None if there is none."""
+  try:
+    elements = representation_utils.xml_dump_to_ui_elements(
+        uiautomator_dump(env)
+    )
+  except ElementTree.ParseError as e:
+    logging.warning('Failed to parse UI hierarchy: %s', e)
+    return None
+  for element in elements:
+    if element.is_focused:
+      return element.text or ''
+  return None
+
+
+def _set_clipboard_batch(
+    text: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float],
+    save: bool = False,
+) -> tuple[bool, Optional[str]]:
+  """Sets the clipboard from the clipper app, then returns to the previous app.
+
+  Args:
+    text: The new clipboard contents.
+    env: The environment.
+    timeout_sec: A timeout for the adb call.
+    save: Whether to read the clipboard before setting it.
+
+  Returns:
+    Whether the clipboard was set, and its previous contents if `save` is set
+    and they could be read. An empty clipboard is read as ''.
+  """
+  commands = [f'am start -W -n {_PATTERN_TO_ACTIVITY["clipper"]}']
+  if save:
+    commands.append('am broadcast -a clipper.get')
+  commands += [
+      'am broadcast -a clipper.set -e text ' + shlex.quote(text),
+      'input keyevent KEYCODE_BACK',
+  ]
+  try:
+    results = issue_shell_batch(commands, env, timeout_sec)
+    previous = None
+    if save and results[0].ok and results[1].ok:
+      previous = extract_broadcast_data(results[1].output) or ''
+    launch, set_clipboard = results[0], results[-2]
+    if not launch.ok or not set_clipboard.ok:
+      return False, previous
+    return extract_broadcast_data(set_clipboard.output) is not None, previous
+  except (RuntimeError, ValueError) as e:
+    logging.warning('Failed to set clipboard: %s', e)
+    return False, None
+
+
+def _paste_text(
+    text: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = _DEFAULT_TIMEOUT_SECS,
+) -> bool:
+  """Pastes text into the focused field through the clipboard.
+
+  The clipboard can only be set by the app in the foreground, so the clipper
+  app is briefly opened to set it. Returning to the previous app restores the
+  focus to its text field, where the text is pasted. The clipboard is restored
+  afterwards, so tasks that check or seed it are not affected.
+
+  Args:
+    text: The text to paste; may contain Unicode and newlines.
+    env: The environment.
+    timeout_sec: A timeout for each adb call.
+
+  Returns:
+    Whether any text was pasted. If False, the focused field is unchanged and
+    the text can be typed instead. Fields that mask, truncate or reformat their
+    input may hold something other than the text even if True.
+  """
+  text_before = _focused_text(env)
+  is_set, previous = _set_clipboard_batch(text, env, timeout_sec, save=True)
+  try:
+    if not is_set:
+      return False
+    response = issue_generic_request(
+        ['shell', 'input', 'keyevent', 'KEYCODE_PASTE'], env, timeout_sec
+    )
+    if response.status != adb_pb2.AdbResponse.Status.OK:
+      return False
+    text_after = _focused_text(env)
+    if text_after is None:
+      logging.warning('Could not read the focused field to verify the paste.')
+      return True
+    # Fields may normalize whitespace, e.g. single-line fields drop newlines.
+    if ' '.join(text.split()) not in ' '.join(text_after.split()):
+      if text_after == text_before:
+        return False
+      logging.warning('The focused field changed the pasted text.')
+    return True
+  finally:
+    if is_set and previous is not None:
+      restored, _ = _set_clipboard_batch(previous, env, timeout_sec)
+      if not restored:
+        logging.warning('Failed to restore clipboard after pasting.')
+
+
 def type_text(
     text: str,
     env: env_interface.AndroidEnvInterface,
     timeout_sec: Optional[float] = _DEFAULT_TIMEOUT_SECS,
+    paste: bool = False,
 ) -> None:
   """Issues an AdbRequest to type the specified text string word-by-word.
 
@@ -474,12 +609,24 @@ def type_text(
   out and word-by-word fixes this, while allowing us to keep a lot timeout per
   word.
 
+  Since that takes an adb call per word and `input text` only supports ASCII,
+  with `paste` set long or non-ASCII text is pasted through the clipboard
+  instead, falling back to typing if the paste left the focused field
+  unchanged. Pasting briefly opens the clipper app, so it is off by default.
+
   Args:
     text: The text string to be typed.
     env: The environment.
     timeout_sec: A timeout to use for this operation. Note: For longer texts,
       this should be longer as it takes longer to type.
+    paste: Whether long or non-ASCII text may be pasted.
   """
+  if paste and (
+      not text.isascii() or len(text.split()) >= _PASTE_MIN_WORDS
+  ):
+    if _paste_text(text, env, timeout_sec):
+      return
+    logging.warning('Failed to paste text; typing it word-by-word instead.')
   words = _split_words_and_newlines(text)
   for word in words:
     if word == '\n':
@@ -540,6 +687,106 @@ def issue_generic_request(
   return response
 
 
+@dataclasses.dataclass(frozen=True)
+class ShellResult:
+  """Result of one command run by `issue_shell_batch`.
+
+  Attributes:
+    command: The shell command.
+    exit_code: The exit status of the command.
+    output: The combined stdout and stderr of the command.
+  """
+
+  command: str
+  exit_code: int
+  output: str
+
+  @property
+  def ok(self) -> bool:
+    return self.exit_code == 0
+
+
+def _build_shell_batch(
+    commands: Sequence[str], marker: str, stop_on_error: bool
+) -> str:
+  """Returns a script running each command and framing its output."""
+  lines = []
+  for i, command in enumerate(commands):
+    # Each command runs in a subshell so `cd` or `exit` can't affect the rest.
+    # The frame starts with a newline so output without one is still framed.
+    lines.append(
+        f"( {command}\n) 2>&1; rc=$?; printf '\\n{marker} {i} %d\\n' $rc"
+    )
+    if stop_on_error:
+      lines.append('[ $rc -eq 0 ] || exit 0')
+  return '\n'.join(lines)
+
+
+def issue_shell_batch(
+    commands: Sequence[str],
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = _DEFAULT_TIMEOUT_SECS,
+    stop_on_error: bool = False,
+) -> list[ShellResult]:
+  """Runs several shell commands with a single adb call.
+
+  Every adb call is a round trip to the device, so issuing setup and teardown
+  commands together is much faster than one `issue_generic_request` each.
+
+  Example:
+  ~~~~~~~
+
+  mkdir, touch = issue_shell_batch(
+      ['mkdir -p /sdcard/a', 'touch /sdcard/a/b.txt'], env
+  )
+
+  Args:
+    commands: Shell commands to run in order. Each is interpreted by the device
+      shell, so arguments must be quoted as needed, e.g. with `shlex.quote`.
+    env: The environment.
+    timeout_sec: A timeout for the whole batch.
+    stop_on_error: Whether to skip the remaining commands once one fails.
+
+  Returns:
+    A result for each command that ran, in order. If `stop_on_error` is set and
+    a command failed, it is the last result.
+
+  Raises:
+    RuntimeError: If the adb call fails or its output is incomplete.
+  """
+  if not commands:
+    return []
+  marker = f'__android_world_{uuid.uuid4().hex}__'
+  response = issue_generic_request(
+      ['shell', _build_shell_batch(commands, marker, stop_on_error)],
+      env,
+      timeout_sec,
+  )
+  check_ok(response, f'Failed to run shell batch: {commands}')
+
+  output = response.generic.output.decode('utf-8', errors='replace')
+  output = output.replace('\r\n', '\n')
+  results = []
+  start = 0
+  for match in re.finditer(rf'\n{marker} (\d+) (\d+)\n', output):
+    results.append(
+        ShellResult(
+            command=commands[int(match.group(1))],
+            exit_code=int(match.group(2)),
+            output=output[start : match.start()],
+        )
+    )
+    start = match.end()
+
+  stopped = stop_on_error and results and not results[-1].ok
+  if len(results) != len(commands) and not stopped:
+    raise RuntimeError(
+        f'Shell batch output is incomplete; got {len(results)} of'
+        f' {len(commands)} results: {output!r}'
+    )
+  return results
+
+
 def get_adb_activity(app_name: str) -> Optional[str]:
   """Get a mapping of regex patterns to ADB activities top Android apps."""
   for pattern, activity in _PATTERN_TO_ACTIVITY.items():
@@ -674,8 +921,12 @@ def close_recents(env: env_interface.AndroidEnvInterface):
   if response.status != adb_pb2.AdbResponse.Status.OK:
     return
   recents_ids = re.findall(r'id=(\d+)', response.generic.output.decode())
-  for recents_id in recents_ids:
-    issue_generic_request(['shell', 'am', 'stack', 'remove', recents_id], env)
+  try:
+    issue_shell_batch(
+        [f'am stack remove {recents_id}' for recents_id in recents_ids], env
+    )
+  except RuntimeError as e:
+    logging.error('Failed to close recent apps: %s', e)
 
 
 def close_app(
@@ -1134,17 +1385,17 @@ def change_orientation(
         f'Unknown orientation provided: {orientation} not in'
         f' {_ORIENTATIONS.keys()}'
     )
-  command = [
-      'shell',
-      'settings',
-      'put',
-      'system',
-  ]
-  # Turn off accelerometer.
-  issue_generic_request(command + ['accelerometer_rotation', '0'], env)
-  issue_generic_request(
-      command + ['user_rotation', _ORIENTATIONS[orientation]], env
-  )
+  try:
+    issue_shell_batch(
+        [
+            # Turn off accelerometer.
+            'settings put system accelerometer_rotation 0',
+            f'settings put system user_rotation {_ORIENTATIONS[orientation]}',
+        ],
+        env,
+    )
+  except RuntimeError as e:
+    logging.error('Failed to change orientation: %s', e)
 
 
 def set_clipboard_contents(
@@ -1559,11 +1810,14 @@ def get_logical_screen_size(
 
 def get_physical_frame_boundary(
     env: env_interface.AndroidEnvInterface,
+    orientation: int | None = None,
 ) -> tuple[int, int, int, int]:
   """Returns the physical frame boundary.
 
   Args:
     env: The AndroidEnv interface.
+    orientation: The current screen orientation, if already known. Otherwise it
+      is fetched from the device.
 
   Returns:
     First two integers are the coordinates for top left corner, last two are for
@@ -1584,7 +1838,8 @@ def get_physical_frame_boundary(
           and int(m[3]) == 0
       ):
         continue
-      orientation = get_orientation(env)
+      if orientation is None:
+        orientation = get_orientation(env)
       if orientation == 0 or orientation == 2:
         return (int(m[0]), int(m[1]), int(m[2]), int(m[3]))
       return (int(m[1]), int(m[0]), int(m[3]), int(m[2]))
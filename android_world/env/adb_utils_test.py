@@ -15,11 +15,16 @@
 """Tests for adb_utils."""
 
 from unittest import mock
+from xml.sax import saxutils
 
 from absl.testing import absltest
 from android_env import env_interface
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
+from android_world.utils import fake_adb_responses
+
+# Long enough to be pasted: 30 words, typed with 29 spaces.
+_LONG_TEXT = ' '.join(f'word{i}' for i in range(30))
 
 
 class AdbTestSetup(absltest.TestCase):
@@ -241,6 +246,216 @@ class AdbTypingTest(AdbTestSetup):
       mock_execute_adb_call.assert_has_calls(expected_calls)
       self.assertLen(expected_calls, mock_execute_adb_call.call_count)
 
+  def _set_up_paste(self, focused_text, clipboard='Copied', text_before=''):
+    """Mocks a paste that changes the focused field from `text_before`."""
+    mock_issue_shell_batch = mock.patch.object(
+        adb_utils, 'issue_shell_batch', autospec=True
+    ).start()
+    mock_issue_shell_batch.side_effect = [
+        [
+            adb_utils.ShellResult('start', 0, ''),
+            adb_utils.ShellResult(
+                'get', 0, f'Broadcast completed: result=-1, data="{clipboard}"'
+            ),
+            adb_utils.ShellResult(
+                'set', 0, 'Broadcast completed: result=-1, data="Copied"'
+            ),
+            adb_utils.ShellResult('back', 0, ''),
+        ],
+        [
+            adb_utils.ShellResult('start', 0, ''),
+            adb_utils.ShellResult(
+                'set', 0, 'Broadcast completed: result=-1, data="Copied"'
+            ),
+            adb_utils.ShellResult('back', 0, ''),
+        ],
+    ]
+    mock.patch.object(
+        adb_utils,
+        'uiautomator_dump',
+        side_effect=[
+            '<hierarchy><node text="Title" focused="false" /><node'
+            f' text={saxutils.quoteattr(text)} focused="true" />'
+            '</hierarchy>'
+            for text in (text_before, focused_text)
+        ],
+    ).start()
+    self.mock_issue_generic_request.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK
+    )
+    self.mock_env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK
+    )
+    return mock_issue_shell_batch
+
+  def test_pastes_long_text(self):
+    text = 'a fairly long note\n' + ' '.join(['word'] * 30)
+    mock_issue_shell_batch = self._set_up_paste(
+        'Draft: ' + text, clipboard='old clip', text_before='Draft: '
+    )
+
+    adb_utils.type_text(text, self.mock_env, paste=True)
+
+    paste_commands = mock_issue_shell_batch.call_args_list[0].args[0]
+    self.assertEqual(paste_commands[1], 'am broadcast -a clipper.get')
+    self.assertEqual(
+        paste_commands[2], f"am broadcast -a clipper.set -e text '{text}'"
+    )
+    self.mock_issue_generic_request.assert_called_once_with(
+        ['shell', 'input', 'keyevent', 'KEYCODE_PASTE'],
+        self.mock_env,
+        adb_utils._DEFAULT_TIMEOUT_SECS,
+    )
+    # The previous clipboard is restored.
+    restore_commands = mock_issue_shell_batch.call_args_list[1].args[0]
+    self.assertEqual(
+        restore_commands[1], "am broadcast -a clipper.set -e text 'old clip'"
+    )
+    self.mock_env.execute_adb_call.assert_not_called()
+
+  def test_pastes_unicode_text(self):
+    mock_issue_shell_batch = self._set_up_paste('Café ☕')
+
+    adb_utils.type_text('Café ☕', self.mock_env, paste=True)
+
+    self.assertIn(
+        "'Café ☕'", mock_issue_shell_batch.call_args_list[0].args[0][2]
+    )
+    self.mock_env.execute_adb_call.assert_not_called()
+
+  def test_types_short_text(self):
+    mock_issue_shell_batch = self._set_up_paste('')
+
+    adb_utils.type_text(
+        'one two three four five six seven eight', self.mock_env, paste=True
+    )
+
+    mock_issue_shell_batch.assert_not_called()
+    # Eight words and seven spaces.
+    self.assertEqual(self.mock_env.execute_adb_call.call_count, 15)
+
+  def test_falls_back_to_typing_if_clipboard_not_set(self):
+    mock_issue_shell_batch = self._set_up_paste('')
+    mock_issue_shell_batch.side_effect = [[
+        adb_utils.ShellResult('start', 0, ''),
+        adb_utils.ShellResult('get', 0, 'Broadcast completed: result=0'),
+        adb_utils.ShellResult('set', 0, 'Broadcast completed: result=0'),
+        adb_utils.ShellResult('back', 0, ''),
+    ]]
+
+    adb_utils.type_text(_LONG_TEXT, self.mock_env, paste=True)
+
+    self.mock_issue_generic_request.assert_not_called()
+    mock_issue_shell_batch.assert_called_once()
+    self.assertEqual(self.mock_env.execute_adb_call.call_count, 59)
+
+  def test_falls_back_to_typing_if_field_unchanged(self):
+    mock_issue_shell_batch = self._set_up_paste('Draft', text_before='Draft')
+
+    adb_utils.type_text(_LONG_TEXT, self.mock_env, paste=True)
+
+    # The clipboard is restored before typing.
+    self.assertEqual(mock_issue_shell_batch.call_count, 2)
+    self.assertEqual(self.mock_env.execute_adb_call.call_count, 59)
+
+  def test_does_not_retype_partially_pasted_text(self):
+    # E.g. a field with a maximum length.
+    self._set_up_paste(_LONG_TEXT[:20])
+
+    adb_utils.type_text(_LONG_TEXT, self.mock_env, paste=True)
+
+    self.mock_env.execute_adb_call.assert_not_called()
+
+  def test_does_not_paste_by_default(self):
+    mock_issue_shell_batch = self._set_up_paste('')
+
+    adb_utils.type_text(_LONG_TEXT, self.mock_env)
+
+    mock_issue_shell_batch.assert_not_called()
+    self.assertEqual(self.mock_env.execute_adb_call.call_count, 59)
+
+
+class ShellBatchToleranceTest(AdbTestSetup):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_issue_generic_request.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.ADB_ERROR
+    )
+
+  def test_change_orientation_ignores_failure(self):
+    adb_utils.change_orientation('landscape', self.mock_env)
+    self.mock_issue_generic_request.assert_called_once()
+
+  def test_close_recents_ignores_failure(self):
+    self.mock_issue_generic_request.side_effect = [
+        adb_pb2.AdbResponse(
+            status=adb_pb2.AdbResponse.Status.OK,
+            generic=adb_pb2.AdbResponse.GenericResponse(
+                output=b'Recent #0: Task{id=12}'
+            ),
+        ),
+        adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.ADB_ERROR),
+    ]
+    adb_utils.close_recents(self.mock_env)
+    self.assertEqual(self.mock_issue_generic_request.call_count, 2)
+
+
+class ShellBatchTest(AdbTestSetup):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_issue_generic_request.side_effect = (
+        fake_adb_responses.run_generic_request_locally
+    )
+
+  def test_runs_commands_in_one_request(self):
+    results = adb_utils.issue_shell_batch(
+        ['echo hello', 'printf "no newline"', 'echo oops >&2; exit 3', 'true'],
+        self.mock_env,
+    )
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertEqual(
+        [(r.exit_code, r.output) for r in results],
+        [(0, 'hello\n'), (0, 'no newline'), (3, 'oops\n'), (0, '')],
+    )
+    self.assertEqual(results[0].command, 'echo hello')
+    self.assertFalse(results[2].ok)
+
+  def test_commands_are_isolated(self):
+    results = adb_utils.issue_shell_batch(
+        ['cd /; exit 1', 'pwd'], self.mock_env
+    )
+    self.assertLen(results, 2)
+
+  def test_stop_on_error(self):
+    results = adb_utils.issue_shell_batch(
+        ['true', 'false', 'echo skipped'], self.mock_env, stop_on_error=True
+    )
+    self.assertEqual([r.exit_code for r in results], [0, 1])
+
+  def test_empty_batch(self):
+    self.assertEmpty(adb_utils.issue_shell_batch([], self.mock_env))
+    self.mock_issue_generic_request.assert_not_called()
+
+  def test_incomplete_output_raises(self):
+    self.mock_issue_generic_request.side_effect = None
+    self.mock_issue_generic_request.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK,
+        generic=adb_pb2.AdbResponse.GenericResponse(output=b'truncated'),
+    )
+    with self.assertRaises(RuntimeError):
+      adb_utils.issue_shell_batch(['true'], self.mock_env)
+
+  def test_failed_request_raises(self):
+    self.mock_issue_generic_request.side_effect = None
+    self.mock_issue_generic_request.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.ADB_ERROR
+    )
+    with self.assertRaises(RuntimeError):
+      adb_utils.issue_shell_batch(['true'], self.mock_env)
+
 
 class TestExtractBroadcastData(absltest.TestCase):
 
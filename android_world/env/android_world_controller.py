@@ -25,12 +25,15 @@ from absl import logging
 from android_env import env_interface
 from android_env import loader
 from android_env.components import config_classes
+from android_env.proto import adb_pb2
 from android_env.proto.a11y import android_accessibility_forest_pb2
 from android_env.wrappers import a11y_grpc_wrapper
 from android_env.wrappers import base_wrapper
+from android_world.env import adb_shell_session
 from android_world.env import adb_utils
 from android_world.env import representation_utils
 from android_world.utils import file_utils
+from android_world.utils import tracing
 import dm_env
 
 
@@ -171,6 +174,7 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     else:
       self._env = env
     self._a11y_method = a11y_method
+    self._shell_session: Optional[adb_shell_session.AdbShellSession] = None
 
   @property
   def device_screen_size(self) -> tuple[int, int]:
@@ -190,6 +194,56 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
   def env(self) -> env_interface.AndroidEnvInterface:
     return self._env
 
+  def enable_shell_session(self) -> None:
+    """Streams generic shell requests through a persistent `adb shell`.
+
+    This saves spawning an adb client and device shell per request. Requests
+    that could not be sent through the session, e.g. because it keeps failing,
+    fall back to regular adb calls. Requests that were sent but did not
+    complete fail instead, since running them again may repeat side effects.
+    """
+    if self._shell_session is not None:
+      return
+    # pylint: disable=protected-access
+    # pytype: disable=attribute-error
+    simulator = self._original_env._coordinator._simulator
+    # pylint: enable=protected-access
+    # pytype: enable=attribute-error
+    self._shell_session = adb_shell_session.AdbShellSession(
+        simulator.create_adb_controller().command_prefix()
+    )
+
+  def execute_adb_call(
+      self, adb_call: adb_pb2.AdbRequest
+  ) -> adb_pb2.AdbResponse:
+    span_args = (
+        {'command': adb_call.WhichOneof('command')}
+        if tracing.is_active()
+        else {}
+    )
+    with tracing.span(tracing.ADB, **span_args):
+      if (
+          self._shell_session is not None
+          and self._shell_session.enabled
+          and adb_shell_session.is_shell_request(adb_call)
+      ):
+        try:
+          return self._shell_session.execute_adb_call(adb_call)
+        except adb_shell_session.CommandNotSentError as e:
+          logging.warning('Falling back to a regular adb call: %s', e)
+        except adb_shell_session.ShellSessionError as e:
+          logging.error('adb shell session request failed: %s', e)
+          return adb_pb2.AdbResponse(
+              status=adb_pb2.AdbResponse.Status.ADB_ERROR,
+              error_message=str(e),
+          )
+      return self._env.execute_adb_call(adb_call)
+
+  def close(self) -> None:
+    if self._shell_session is not None:
+      self._shell_session.close()
+    super().close()
+
   def refresh_env(self):
     # pylint: disable=protected-access
     # pytype: disable=attribute-error
@@ -233,8 +287,18 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
           adb_utils.uiautomator_dump(self._env)
       )
 
-  def _process_timestep(self, timestep: dm_env.TimeStep) -> dm_env.TimeStep:
-    """Adds a11y tree info to the observation."""
+  def get_ui_observation(
+      self,
+  ) -> tuple[
+      Optional[android_accessibility_forest_pb2.AndroidAccessibilityForest],
+      list[representation_utils.UIElement],
+  ]:
+    """Returns the a11y forest and UI elements without capturing the screen.
+
+    Returns:
+      The forest, or None if the a11y forwarder app is not used, and the UI
+      elements derived from it.
+    """
     if self._a11y_method == A11yMethod.A11Y_FORWARDER_APP:
       forest = self.get_a11y_forest()
       ui_elements = representation_utils.forest_to_ui_elements(
@@ -244,12 +308,20 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     else:
       forest = None
       ui_elements = self.get_ui_elements()
+    return forest, ui_elements
+
+  def _process_timestep(self, timestep: dm_env.TimeStep) -> dm_env.TimeStep:
+    """Adds a11y tree info to the observation."""
+    forest, ui_elements = self.get_ui_observation()
     timestep.observation[OBSERVATION_KEY_FOREST] = forest
     timestep.observation[OBSERVATION_KEY_UI_ELEMENTS] = ui_elements
     return timestep
 
   def pull_file(
-      self, remote_db_file_path: str, timeout_sec: Optional[float] = None
+      self,
+      remote_db_file_path: str,
+      timeout_sec: Optional[float] = None,
+      sqlite_files_only: bool = False,
   ) -> contextlib._GeneratorContextManager[str]:
     """Pulls a file from the device to a temporary directory.
 
@@ -257,10 +329,16 @@ class AndroidWorldController(base_wrapper.BaseWrapper):
     Args:
       remote_db_file_path: The path to the file on the device.
       timeout_sec: Timeout in seconds for the adb calls.
+      sqlite_files_only: Whether to pull only the file and its SQLite -wal and
+        -shm files, with a single adb call, instead of its whole directory.
 
     Returns:
       The path to the temporary directory containing the file.
     """
+    if sqlite_files_only:
+      return file_utils.tmp_sqlite_from_device(
+          remote_db_file_path, self.env, timeout_sec
+      )
     remote_db_directory = os.path.dirname(remote_db_file_path)
     return file_utils.tmp_directory_from_device(
         remote_db_directory, self.env, timeout_sec
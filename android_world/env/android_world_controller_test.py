@@ -18,13 +18,16 @@ from unittest import mock
 
 from absl.testing import absltest
 from android_env import env_interface
+from android_env.proto import adb_pb2
 from android_env.wrappers import a11y_grpc_wrapper
+from android_world.env import adb_shell_session
 from android_world.env import adb_utils
 from android_world.env import android_world_controller
 from android_world.env import representation_utils
 from android_world.utils import fake_adb_responses
 from android_world.utils import file_test_utils
 from android_world.utils import file_utils
+from android_world.utils import tracing
 import dm_env
 
 
@@ -130,6 +133,26 @@ class AndroidWorldControllerTest(absltest.TestCase):
         exclude_invisible_elements=True,
     )
 
+  @mock.patch.object(adb_utils, 'uiautomator_dump')
+  @mock.patch.object(representation_utils, 'xml_dump_to_ui_elements')
+  def test_get_ui_observation_with_uiautomator(
+      self, mock_xml_dump_to_ui_elements, mock_uiautomator_dump
+  ):
+    mock_base_env = mock.Mock(spec=env_interface.AndroidEnvInterface)
+    env = android_world_controller.AndroidWorldController(
+        mock_base_env,
+        a11y_method=android_world_controller.A11yMethod.UIAUTOMATOR,
+    )
+
+    forest, ui_elements = env.get_ui_observation()
+
+    self.assertIsNone(forest)
+    self.assertEqual(
+        ui_elements, mock_xml_dump_to_ui_elements.return_value
+    )
+    mock_uiautomator_dump.assert_called_once_with(mock_base_env)
+    mock_base_env.step.assert_not_called()
+
   @mock.patch.object(adb_utils, 'check_airplane_mode')
   @mock.patch.object(android_world_controller, 'get_controller')
   @mock.patch.object(android_world_controller, '_has_wrapper')
@@ -191,5 +214,93 @@ class AndroidWorldControllerTest(absltest.TestCase):
     self.assertEqual(open(remote_file_path, 'r').read(), new_file_contents)
 
 
+class ShellSessionTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_base_env = mock.MagicMock()
+    self.controller = android_world_controller.AndroidWorldController(
+        self.mock_base_env,
+        a11y_method=android_world_controller.A11yMethod.UIAUTOMATOR,
+    )
+    self.mock_session = mock.create_autospec(
+        adb_shell_session.AdbShellSession, instance=True, enabled=True
+    )
+    self.controller._shell_session = self.mock_session
+    self.shell_request = adb_pb2.AdbRequest(
+        generic=adb_pb2.AdbRequest.GenericRequest(args=['shell', 'ls'])
+    )
+
+  def test_shell_requests_use_session(self):
+    response = self.controller.execute_adb_call(self.shell_request)
+
+    self.assertEqual(
+        response, self.mock_session.execute_adb_call.return_value
+    )
+    self.mock_base_env.execute_adb_call.assert_not_called()
+
+  def test_other_requests_skip_session(self):
+    request = adb_pb2.AdbRequest(tap=adb_pb2.AdbRequest.Tap(x=1, y=2))
+
+    response = self.controller.execute_adb_call(request)
+
+    self.assertEqual(response, self.mock_base_env.execute_adb_call.return_value)
+    self.mock_session.execute_adb_call.assert_not_called()
+
+  def test_falls_back_if_command_not_sent(self):
+    self.mock_session.execute_adb_call.side_effect = (
+        adb_shell_session.CommandNotSentError('broken')
+    )
+
+    response = self.controller.execute_adb_call(self.shell_request)
+
+    self.assertEqual(response, self.mock_base_env.execute_adb_call.return_value)
+    self.mock_base_env.execute_adb_call.assert_called_once_with(
+        self.shell_request
+    )
+
+  def test_does_not_rerun_sent_command(self):
+    self.mock_session.execute_adb_call.side_effect = (
+        adb_shell_session.ShellSessionError('timed out')
+    )
+
+    response = self.controller.execute_adb_call(self.shell_request)
+
+    self.assertEqual(response.status, adb_pb2.AdbResponse.Status.ADB_ERROR)
+    self.assertEqual(response.error_message, 'timed out')
+    self.mock_base_env.execute_adb_call.assert_not_called()
+
+  def test_close_closes_session(self):
+    self.controller.close()
+    self.mock_session.close.assert_called_once()
+
+
+class ExecuteAdbCallTracingTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.controller = android_world_controller.AndroidWorldController(
+        mock.MagicMock(),
+        a11y_method=android_world_controller.A11yMethod.UIAUTOMATOR,
+    )
+
+  def test_records_command_when_tracing(self):
+    tracer = tracing.Tracer()
+    with tracer.activate():
+      self.controller.execute_adb_call(
+          adb_pb2.AdbRequest(tap=adb_pb2.AdbRequest.Tap(x=1, y=2))
+      )
+
+    self.assertEqual([s.name for s in tracer.spans], [tracing.ADB])
+    self.assertEqual(tracer.spans[0].args, {'command': 'tap'})
+
+  def test_skips_command_lookup_when_not_tracing(self):
+    request = mock.MagicMock()
+
+    self.controller.execute_adb_call(request)
+
+    request.WhichOneof.assert_not_called()
+
+
 if __name__ == '__main__':
   absltest.main()
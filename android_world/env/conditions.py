@@ -0,0 +1,151 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Waits for device conditions instead of sleeping for fixed periods.
+
+Predicates are built by the functions below and polled with `wait_until`, which
+returns as soon as the predicate holds, e.g.
+
+```
+launched = conditions.wait_until(
+    conditions.activity_is('com.android.settings', env), timeout=5.0
+)
+```
+"""
+
+from collections.abc import Callable, Sequence
+import time
+
+from absl import logging
+from android_env import env_interface
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.env import representation_utils
+from android_world.env import ui_stability
+from android_world.utils import tracing
+
+Predicate = Callable[[], bool]
+
+
+def wait_until(
+    predicate: Predicate,
+    timeout: float,
+    poll_schedule: Sequence[float] = ui_stability.DEFAULT_POLL_SCHEDULE,
+) -> bool:
+  """Polls the predicate until it holds or the timeout is reached.
+
+  Args:
+    predicate: The condition to wait for.
+    timeout: Maximum time in seconds to wait.
+    poll_schedule: Seconds to sleep between consecutive checks. The i-th entry
+      is used after the i-th check and the last one is repeated.
+
+  Returns:
+    Whether the predicate held before the timeout.
+  """
+  if not poll_schedule:
+    raise ValueError('Poll schedule must not be empty.')
+  deadline = time.time() + timeout
+  num_checks = 0
+  while True:
+    if predicate():
+      return True
+    num_checks += 1
+    now = time.time()
+    if now >= deadline:
+      logging.info('Condition not met within %.1f seconds.', timeout)
+      return False
+    delay = poll_schedule[min(num_checks, len(poll_schedule)) - 1]
+    tracing.sleep(min(delay, deadline - now))
+
+
+def activity_is(
+    activity: str, env: env_interface.AndroidEnvInterface
+) -> Predicate:
+  """Holds when the foreground activity is `activity`.
+
+  Args:
+    activity: A full activity name, e.g. "com.android.settings/.Settings", or a
+      package name, which matches any of its activities.
+    env: The environment.
+
+  Returns:
+    The predicate.
+  """
+
+  package, _, name = activity.partition('/')
+
+  def predicate() -> bool:
+    current = adb_utils.get_current_activity(env)[0]
+    if not current:
+      return False
+    current_package, _, current_name = current.partition('/')
+    if current_package != package:
+      return False
+    if not name:
+      return True
+    # Activity names may be given relative to the package, e.g. ".Settings".
+    expand = lambda n: package + n if n.startswith('.') else n
+    return expand(current_name) == expand(name)
+
+  return predicate
+
+
+def ui_changed(
+    ui_elements: Sequence[representation_utils.UIElement],
+    env: android_world_controller.AndroidWorldController,
+) -> Predicate:
+  """Holds once the UI elements on screen differ from `ui_elements`."""
+  before = ui_stability.ui_fingerprint(ui_elements)
+  return lambda: ui_stability.ui_fingerprint(env.get_ui_elements()) != before
+
+
+def element_with_text_present(
+    text: str,
+    env: android_world_controller.AndroidWorldController,
+    case_sensitive: bool = False,
+) -> Predicate:
+  """Holds when an element's text or content description equals `text`."""
+
+  def normalize(value: str | None) -> str | None:
+    if value is None or case_sensitive:
+      return value
+    return value.lower()
+
+  target = normalize(text)
+
+  def predicate() -> bool:
+    return any(
+        target in (normalize(e.text), normalize(e.content_description))
+        for e in env.get_ui_elements()
+    )
+
+  return predicate
+
+
+def keyboard_shown(env: env_interface.AndroidEnvInterface) -> Predicate:
+  """Holds while the soft keyboard is shown."""
+  return lambda: adb_utils.is_keyboard_shown(env)
+
+
+def keyboard_hidden(env: env_interface.AndroidEnvInterface) -> Predicate:
+  """Holds while the soft keyboard is hidden."""
+  return lambda: not adb_utils.is_keyboard_shown(env)
+
+
+def call_state_is(
+    state: str, env: env_interface.AndroidEnvInterface
+) -> Predicate:
+  """Holds when the phone's call state, e.g. "RINGING", is `state`."""
+  return lambda: adb_utils.get_call_state(env) == state
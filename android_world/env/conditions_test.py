@@ -0,0 +1,122 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_env.proto import adb_pb2
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.env import conditions
+from android_world.env import representation_utils
+
+
+@mock.patch('time.sleep', return_value=None)
+class WaitUntilTest(absltest.TestCase):
+
+  def test_returns_immediately_if_condition_holds(self, mock_sleep):
+    self.assertTrue(conditions.wait_until(lambda: True, timeout=5.0))
+    mock_sleep.assert_not_called()
+
+  def test_polls_on_schedule(self, mock_sleep):
+    predicate = mock.MagicMock(side_effect=[False, False, False, True])
+
+    self.assertTrue(
+        conditions.wait_until(predicate, timeout=5.0, poll_schedule=(0.1, 0.3))
+    )
+    self.assertEqual(
+        [c.args[0] for c in mock_sleep.call_args_list], [0.1, 0.3, 0.3]
+    )
+
+  def test_times_out(self, mock_sleep):
+    with mock.patch('time.time', side_effect=[0, 0, 0.6, 1.2]):
+      self.assertFalse(
+          conditions.wait_until(
+              lambda: False, timeout=1.0, poll_schedule=(0.6,)
+          )
+      )
+    self.assertEqual(
+        [c.args[0] for c in mock_sleep.call_args_list], [0.6, 0.4]
+    )
+
+
+class PredicatesTest(parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.env = mock.create_autospec(
+        android_world_controller.AndroidWorldController, instance=True
+    )
+
+  @parameterized.named_parameters(
+      ('package', 'com.android.settings', True),
+      ('full_name', 'com.android.settings/com.android.settings.Settings', True),
+      ('relative_name', 'com.android.settings/.Settings', True),
+      ('other_activity', 'com.android.settings/.SubSettings', False),
+      ('other_package', 'com.android.chrome', False),
+  )
+  @mock.patch.object(adb_utils, 'get_current_activity')
+  def test_activity_is(self, activity, expected, mock_get_current_activity):
+    mock_get_current_activity.return_value = (
+        'com.android.settings/com.android.settings.Settings',
+        None,
+    )
+    self.assertEqual(conditions.activity_is(activity, self.env)(), expected)
+
+  def test_ui_changed(self):
+    before = [representation_utils.UIElement(text='a')]
+    predicate = conditions.ui_changed(before, self.env)
+
+    self.env.get_ui_elements.return_value = [
+        representation_utils.UIElement(text='a')
+    ]
+    self.assertFalse(predicate())
+    self.env.get_ui_elements.return_value = [
+        representation_utils.UIElement(text='b')
+    ]
+    self.assertTrue(predicate())
+
+  def test_element_with_text_present(self):
+    self.env.get_ui_elements.return_value = [
+        representation_utils.UIElement(text='Cancel'),
+        representation_utils.UIElement(content_description='Save'),
+    ]
+    self.assertTrue(conditions.element_with_text_present('SAVE', self.env)())
+    self.assertFalse(
+        conditions.element_with_text_present(
+            'SAVE', self.env, case_sensitive=True
+        )()
+    )
+    self.assertFalse(conditions.element_with_text_present('OK', self.env)())
+
+  @mock.patch.object(adb_utils, 'issue_generic_request')
+  def test_keyboard(self, mock_issue_generic_request):
+    mock_issue_generic_request.return_value = adb_pb2.AdbResponse(
+        generic=adb_pb2.AdbResponse.GenericResponse(
+            output=b'  mShowRequested=true mShowExplicitlyRequested=false\n'
+            b'  mInputShown=true\n'
+        )
+    )
+    self.assertTrue(conditions.keyboard_shown(self.env)())
+    self.assertFalse(conditions.keyboard_hidden(self.env)())
+
+  @mock.patch.object(adb_utils, 'get_call_state', return_value='RINGING')
+  def test_call_state_is(self, unused_mock_get_call_state):
+    self.assertTrue(conditions.call_state_is('RINGING', self.env)())
+    self.assertFalse(conditions.call_state_is('IDLE', self.env)())
+
+
+if __name__ == '__main__':
+  absltest.main()
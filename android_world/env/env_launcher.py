@@ -28,12 +28,17 @@ _ANDROID_WORLD_API_LEVEL = 33
 
 
 def _get_env(
-    console_port: int, adb_path: str, grpc_port: int
+    console_port: int,
+    adb_path: str,
+    grpc_port: int,
+    adb_shell_session: bool = False,
 ) -> interface.AsyncEnv:
   """Creates an AsyncEnv by connecting to an existing Android environment."""
   controller = android_world_controller.get_controller(
       console_port, adb_path, grpc_port
   )
+  if adb_shell_session:
+    controller.enable_shell_session()
   return interface.AsyncAndroidEnv(controller)
 
 
@@ -93,6 +98,7 @@ def load_and_setup_env(
     freeze_datetime: bool = True,
     adb_path: str = android_world_controller.DEFAULT_ADB_PATH,
     grpc_port: int = 8554,
+    adb_shell_session: bool = False,
 ) -> interface.AsyncEnv:
   """Create environment with `get_env()` and perform env setup and validation.
 
@@ -112,10 +118,12 @@ def load_and_setup_env(
       2023, to ensure consistent benchmarking.
     adb_path: The location of the adb binary.
     grpc_port: The port for gRPC communication with the emulator.
+    adb_shell_session: Whether to run adb shell commands through a persistent
+      shell session instead of a new adb process each.
 
   Returns:
     An interactable Android environment.
   """
-  env = _get_env(console_port, adb_path, grpc_port)
+  env = _get_env(console_port, adb_path, grpc_port, adb_shell_session)
   setup_env(env, emulator_setup, freeze_datetime)
   return env
@@ -15,20 +15,30 @@
 """Environment interface for real-time interaction Android."""
 
 import abc
+from collections.abc import Sequence
 import dataclasses
+import functools
 import time
-from typing import Any, Optional, Self
+from typing import Any, Callable, Optional, Self
 
 from absl import logging
 from android_env.components import action_type
+from android_env.proto.a11y import android_accessibility_forest_pb2
 from android_world.env import actuation
 from android_world.env import adb_utils
 from android_world.env import android_world_controller
+from android_world.env import conditions
 from android_world.env import json_action
 from android_world.env import representation_utils
+from android_world.env import ui_stability
+from android_world.utils import tracing
 import dm_env
 import numpy as np
 
+# With the adaptive poll schedule, the UI must also stay the same for this long
+# to be stable, as its first quick polls may all precede a transition.
+_MIN_STABLE_SECS = 0.5
+
 
 def _get_no_op_action() -> dict[str, Any]:
   """Creates a no-op action; used to retrieve screen & UI tree."""
@@ -43,14 +53,15 @@ class State:
   """State of the Android environment.
 
   Attributes:
-    pixels: RGB array of current screen.
+    pixels: RGB array of current screen, or None if the state was fetched
+      without pixels.
     forest: Raw UI forest; see android_world_controller.py for more info.
     ui_elements: Processed children and stateful UI elements extracted from
       forest.
     auxiliaries: Additional information about the state.
   """
 
-  pixels: np.ndarray
+  pixels: np.ndarray | None
   forest: Any
   ui_elements: list[representation_utils.UIElement]
   auxiliaries: dict[str, Any] | None = None
@@ -93,7 +104,9 @@ class AsyncEnv(abc.ABC):
     """
 
   @abc.abstractmethod
-  def get_state(self, wait_to_stabilize: bool = False) -> State:
+  def get_state(
+      self, wait_to_stabilize: bool = False, include_pixels: bool = True
+  ) -> State:
     """Gets the state of the environment; i.e., screenshot & UI tree.
 
     In practice this will usually be called after executing an action. Logic
@@ -103,6 +116,9 @@ class AsyncEnv(abc.ABC):
     Args:
       wait_to_stabilize: Whether to wait for the screen to stabilize before
         returning state.
+      include_pixels: Whether to capture a screenshot. Agents that only read
+        the UI tree can set this to False to skip transferring the framebuffer,
+        in which case `pixels` is None.
 
     Returns:
       Observation containing RGB array of screen, the accessibility forest,
@@ -114,6 +130,35 @@ class AsyncEnv(abc.ABC):
   def display_message(self, message: str, header: str = '') -> None:
     """Displays a message on the screen."""
 
+  def wait_until(
+      self,
+      predicate: conditions.Predicate,
+      timeout: float = 5.0,
+      poll_schedule: Sequence[float] | None = None,
+  ) -> bool:
+    """Waits until a device condition holds, e.g. an app is in the foreground.
+
+    Use this instead of sleeping for a fixed period after an action; see
+    `conditions` for predicates.
+
+    Args:
+      predicate: The condition to wait for.
+      timeout: Maximum time in seconds to wait.
+      poll_schedule: Seconds to sleep between checks. Defaults to the
+        environment's schedule.
+
+    Returns:
+      Whether the condition held before the timeout.
+    """
+    return conditions.wait_until(
+        predicate,
+        timeout,
+        poll_schedule or ui_stability.DEFAULT_POLL_SCHEDULE,
+    )
+
+  def invalidate_geometry_cache(self) -> None:
+    """Forgets cached screen geometry, e.g. after changing screen size."""
+
   @abc.abstractmethod
   def ask_question(
       self, question: str, timeout_seconds: float = -1.0
@@ -135,8 +180,19 @@ class AsyncEnv(abc.ABC):
     """
 
   @abc.abstractmethod
-  def execute_action(self, action: json_action.JSONAction) -> None:
-    """Executes action on the environment."""
+  def execute_action(
+      self,
+      action: json_action.JSONAction,
+      state: State | None = None,
+  ) -> None:
+    """Executes action on the environment.
+
+    Args:
+      action: The action to execute.
+      state: The state the action was chosen from, e.g. the agent's last
+        observation. If provided, the environment may reuse it instead of
+        fetching the state again, as long as the UI has not changed since.
+    """
 
   @property
   @abc.abstractmethod
@@ -216,10 +272,38 @@ class AsyncAndroidEnv(AsyncEnv):
   interaction_cache = ''
 
   def __init__(
-      self, controller: android_world_controller.AndroidWorldController
+      self,
+      controller: android_world_controller.AndroidWorldController,
+      geometry_cache_ttl_sec: float | None = None,
+      poll_schedule: Sequence[float] = ui_stability.DEFAULT_POLL_SCHEDULE,
+      stabilize_on_pixels: bool = False,
   ):
+    """Initializes the environment.
+
+    Args:
+      controller: The controller for the device.
+      geometry_cache_ttl_sec: Screen geometry, i.e. logical screen size,
+        orientation and physical frame boundary, is cached until an observed
+        state shows the screen changed shape, e.g. after a rotation or a display
+        size change, the environment is reset or `invalidate_geometry_cache` is
+        called. If set, cached values also expire after this many seconds.
+      poll_schedule: Seconds to sleep between polls when waiting for the UI to
+        stabilize; starts short and backs off, repeating the last entry.
+      stabilize_on_pixels: Whether a downsampled screenshot must also be
+        unchanged for the UI to be considered stable. Catches changes that are
+        invisible in the UI tree, e.g. in web views, but never settles on
+        screens with animations.
+    """
     self._controller = controller
-    self._prior_state = None
+    self._poll_schedule = poll_schedule
+    self._stabilize_on_pixels = stabilize_on_pixels
+    self._stabilization_stats = ui_stability.StabilizationStats()
+    self._geometry_cache_ttl_sec = geometry_cache_ttl_sec
+    # Maps geometry name to (fetch time, value).
+    self._geometry_cache: dict[str, tuple[float, Any]] = {}
+    # Last screen shape seen in each part of an observation; see
+    # `_observe_screen_shape`.
+    self._screen_shapes: dict[str, tuple[int, int]] = {}
     # Variable used to temporarily save interactions between agent and user.
     # Like when agent use answer action to answer user questions, we
     # use this to save the agent response. Or later on when agent has the
@@ -234,67 +318,124 @@ class AsyncAndroidEnv(AsyncEnv):
     if go_home:
       adb_utils.press_home_button(self.controller)
     self.interaction_cache = ''
+    self.invalidate_geometry_cache()
 
     return _process_timestep(self.controller.reset())
 
-  def _get_state(self):
-    return _process_timestep(self.controller.step(_get_no_op_action()))
+  def _get_state(self, include_pixels: bool = True) -> State:
+    if not include_pixels:
+      forest, ui_elements = self.controller.get_ui_observation()
+      state = State(
+          pixels=None, forest=forest, ui_elements=ui_elements, auxiliaries={}
+      )
+    else:
+      state = _process_timestep(self.controller.step(_get_no_op_action()))
+    self._observe_screen_shape(state)
+    return state
+
+  def _observe_screen_shape(self, state: State) -> None:
+    """Invalidates cached geometry if the state shows a new screen shape.
+
+    Rotating the device or changing the display size changes the size of the
+    screenshot and the extent of the accessibility windows. Each is compared to
+    the last one seen, so states with and without pixels can be mixed.
+
+    Args:
+      state: A freshly observed state.
+    """
+    shapes = {}
+    if isinstance(state.pixels, np.ndarray):
+      shapes['pixels'] = tuple(state.pixels.shape[:2])
+    if (
+        isinstance(
+            state.forest,
+            android_accessibility_forest_pb2.AndroidAccessibilityForest,
+        )
+        and state.forest.windows
+    ):
+      shapes['windows'] = (
+          max(w.bounds_in_screen.right for w in state.forest.windows),
+          max(w.bounds_in_screen.bottom for w in state.forest.windows),
+      )
+    for name, shape in shapes.items():
+      previous = self._screen_shapes.get(name)
+      if previous is not None and previous != shape:
+        logging.info('Screen shape changed from %s to %s.', previous, shape)
+        self.invalidate_geometry_cache()
+      self._screen_shapes[name] = shape
 
   def _get_stable_state(
       self,
       stability_threshold: int = 3,
-      sleep_duration: float = 0.5,
+      sleep_duration: float | None = None,
       timeout: float = 6.0,
+      include_pixels: bool = True,
   ) -> State:
-    """Checks if the UI elements remain stable over a number of checks and returns the state.
+    """Polls the state until consecutive UI fingerprints match and returns it.
 
     Args:
         stability_threshold: Number of consecutive checks where UI elements must
           remain the same to consider UI stable.
-        sleep_duration: Minimum time in seconds between each check.
+        sleep_duration: If set, a fixed time in seconds to sleep between each
+          check instead of the environment's adaptive poll schedule. The
+          adaptive schedule polls quickly at first, so it also requires the UI
+          to stay the same for `_MIN_STABLE_SECS`.
         timeout: Maximum time in seconds to wait for UI to become stable before
           giving up.
+        include_pixels: Whether to capture screenshots while polling.
 
     Returns:
         The current state of the UI if stability is achieved within the timeout.
     """
-    if not self._prior_state:
-      self._prior_state = self._get_state()
-    if stability_threshold <= 0:
-      raise ValueError('Stability threshold must be a positive integer.')
-
-    stable_checks = 1
-    start_time = time.time()
-    deadline = start_time + timeout
-
-    while stable_checks < stability_threshold and time.time() < deadline:
-      iteration_start_time = time.time()
-      current_state = self._get_state()
-
-      if self._prior_state.ui_elements == current_state.ui_elements:
-        stable_checks += 1
-        if stable_checks == stability_threshold:
-          break  # Exit early if stability is achieved.
-      else:
-        stable_checks = 1  # Reset if any change is detected
-        self._prior_state = current_state
-
-      elapsed_time = time.time() - iteration_start_time
-      remaining_sleep = sleep_duration - elapsed_time
-      if remaining_sleep > 0:
-        sleep_time = min(remaining_sleep, deadline - time.time())
-        if sleep_time > 0:
-          time.sleep(sleep_time)
-      # If remaining_sleep <= 0, proceed immediately to the next iteration
-
-    return current_state  # pylint: disable=undefined-variable
-
-  def get_state(self, wait_to_stabilize: bool = False) -> State:
+    detector = ui_stability.StabilityDetector(
+        stability_threshold=stability_threshold,
+        poll_schedule=(
+            self._poll_schedule if sleep_duration is None else (sleep_duration,)
+        ),
+        timeout=timeout,
+        fingerprint_fn=self._fingerprint,
+        min_stable_sec=_MIN_STABLE_SECS if sleep_duration is None else 0.0,
+    )
+    result = detector.wait(
+        functools.partial(self._get_state, include_pixels=include_pixels)
+    )
+    self._stabilization_stats.record(
+        ui_stability.foreground_package(result.state.ui_elements), result
+    )
+    return result.state
+
+  def _fingerprint(self, state: State) -> bytes:
+    return ui_stability.ui_fingerprint(
+        state.ui_elements, state.pixels if self._stabilize_on_pixels else None
+    )
+
+  def wait_until(
+      self,
+      predicate: conditions.Predicate,
+      timeout: float = 5.0,
+      poll_schedule: Sequence[float] | None = None,
+  ) -> bool:
+    return super().wait_until(
+        predicate, timeout, poll_schedule or self._poll_schedule
+    )
+
+  @property
+  def stabilization_stats(self) -> ui_stability.StabilizationStats:
+    """Latency statistics of `get_state(wait_to_stabilize=True)` per app."""
+    return self._stabilization_stats
+
+  def get_state(
+      self, wait_to_stabilize: bool = False, include_pixels: bool = True
+  ) -> State:
     if wait_to_stabilize:
-      return self._get_stable_state()
-    return self._get_state()
+      return self._get_stable_state(include_pixels=include_pixels)
+    return self._get_state(include_pixels=include_pixels)
 
-  def execute_action(self, action: json_action.JSONAction) -> None:
+  def execute_action(
+      self,
+      action: json_action.JSONAction,
+      state: State | None = None,
+  ) -> None:
     if action.action_type == json_action.ANSWER:
       self.interaction_cache = action.text
       if action.text:
@@ -303,15 +444,61 @@ class AsyncAndroidEnv(AsyncEnv):
     if action.action_type == json_action.STATUS:
       # Do nothing if it is a termination action.
       return
-    state = self.get_state(wait_to_stabilize=False)
-    actuation.execute_adb_action(
-        action,
-        state.ui_elements,
-        self.logical_screen_size,
-        self.controller,
-        self.get_state,
+    if state is None:
+      # Actuation only needs the UI elements, so skip the screenshots.
+      state = self.get_state(wait_to_stabilize=False, include_pixels=False)
+      get_state = functools.partial(self.get_state, include_pixels=False)
+    else:
+      get_state = functools.partial(self._get_state_if_changed, state)
+    with tracing.span(tracing.EXECUTE_ACTION, action_type=action.action_type):
+      actuation.execute_adb_action(
+          action,
+          state.ui_elements,
+          self.logical_screen_size,
+          self.controller,
+          get_state,
+      )
+
+  def _get_state_if_changed(
+      self, observed: State, wait_to_stabilize: bool = False
+  ) -> State:
+    """Returns `observed` if the UI elements on screen still match it.
+
+    Only the UI elements are fetched to check for changes, which is much cheaper
+    than a full state with a screenshot. If they differ, a new state is fetched,
+    still without pixels since actuation only reads the UI elements.
+
+    Args:
+      observed: A previously observed state.
+      wait_to_stabilize: Whether to wait for the UI to stabilize if a new state
+        has to be fetched.
+
+    Returns:
+      The observed state if still current, otherwise a freshly fetched one.
+    """
+    if self.controller.get_ui_elements() == observed.ui_elements:
+      return observed
+    return self.get_state(
+        wait_to_stabilize=wait_to_stabilize, include_pixels=False
     )
 
+  def invalidate_geometry_cache(self) -> None:
+    self._geometry_cache.clear()
+
+  def _get_geometry(self, name: str, fetch_fn: Callable[[], Any]) -> Any:
+    """Returns a cached geometry value, fetching it if missing or expired."""
+    now = time.time()
+    if name in self._geometry_cache:
+      fetch_time, value = self._geometry_cache[name]
+      if (
+          self._geometry_cache_ttl_sec is None
+          or now - fetch_time < self._geometry_cache_ttl_sec
+      ):
+        return value
+    value = fetch_fn()
+    self._geometry_cache[name] = (now, value)
+    return value
+
   def hide_automation_ui(self) -> None:
     """Hides the coordinates on screen."""
     adb_utils.issue_generic_request(
@@ -345,7 +532,10 @@ class AsyncAndroidEnv(AsyncEnv):
 
   @property
   def logical_screen_size(self) -> tuple[int, int]:
-    return adb_utils.get_logical_screen_size(self.controller)
+    return self._get_geometry(
+        'logical_screen_size',
+        lambda: adb_utils.get_logical_screen_size(self.controller),
+    )
 
   def close(self) -> None:
     try:
@@ -355,8 +545,15 @@ class AsyncAndroidEnv(AsyncEnv):
 
   @property
   def orientation(self) -> int:
-    return adb_utils.get_orientation(self.controller)
+    return self._get_geometry(
+        'orientation', lambda: adb_utils.get_orientation(self.controller)
+    )
 
   @property
   def physical_frame_boundary(self) -> tuple[int, int, int, int]:
-    return adb_utils.get_physical_frame_boundary(self.controller)
+    return self._get_geometry(
+        'physical_frame_boundary',
+        lambda: adb_utils.get_physical_frame_boundary(
+            self.controller, self.orientation
+        ),
+    )
@@ -15,7 +15,11 @@
 from unittest import mock
 
 from absl.testing import absltest
+from android_env.proto.a11y import android_accessibility_forest_pb2
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
 from android_world.env import interface
+from android_world.env import json_action
 from android_world.env import representation_utils
 import numpy as np
 
@@ -86,6 +90,264 @@ class InterfaceTest(absltest.TestCase):
         states[5],
     )
 
+  @mock.patch("time.sleep", return_value=None)
+  def test_stable_state_records_stats(self, unused_mocked_time_sleep):
+    env = interface.AsyncAndroidEnv(mock.MagicMock())
+    ui_elements = [representation_utils.UIElement(package_name="com.app")]
+    env._get_state = mock.MagicMock(
+        return_value=interface.State(
+            ui_elements=ui_elements, pixels=np.empty([1, 2, 3]), forest=None
+        )
+    )
+
+    env.get_state(wait_to_stabilize=True)
+
+    self.assertEqual(env._get_state.call_count, 4)
+    self.assertEqual(env.stabilization_stats.summary()["com.app"]["count"], 1)
+
+  @mock.patch("time.sleep", return_value=None)
+  def test_stabilize_on_pixels(self, unused_mocked_time_sleep):
+    env = interface.AsyncAndroidEnv(
+        mock.MagicMock(), stabilize_on_pixels=True
+    )
+    ui_elements = [representation_utils.UIElement(text="Static")]
+    states = [
+        interface.State(
+            ui_elements=ui_elements,
+            pixels=np.full([32, 32, 3], value, np.uint8),
+            forest=None,
+        )
+        for value in (0, 1, 1, 1, 1)
+    ]
+    env._get_state = mock.MagicMock(side_effect=states)
+
+    self.assertIs(env.get_state(wait_to_stabilize=True), states[-1])
+
+  def test_get_state_without_pixels(self):
+    controller = mock.MagicMock()
+    ui_elements = [representation_utils.UIElement(text="Button")]
+    controller.get_ui_observation.return_value = ("forest", ui_elements)
+    env = interface.AsyncAndroidEnv(controller)
+
+    state = env.get_state(include_pixels=False)
+
+    self.assertIsNone(state.pixels)
+    self.assertEqual(state.forest, "forest")
+    self.assertEqual(state.ui_elements, ui_elements)
+    controller.step.assert_not_called()
+
+  @mock.patch("time.sleep", return_value=None)
+  def test_stable_state_without_pixels(self, unused_mocked_time_sleep):
+    controller = mock.MagicMock()
+    controller.get_ui_observation.return_value = (None, [])
+    env = interface.AsyncAndroidEnv(controller)
+
+    state = env.get_state(wait_to_stabilize=True, include_pixels=False)
+
+    self.assertIsNone(state.pixels)
+    self.assertEqual(controller.get_ui_observation.call_count, 4)
+    controller.step.assert_not_called()
+
+  @mock.patch("time.sleep", return_value=None)
+  def test_stable_state_requires_minimum_window(self, mock_sleep):
+    env = interface.AsyncAndroidEnv(
+        mock.MagicMock(), poll_schedule=(0.05, 0.1, 0.2)
+    )
+    env._get_state = mock.MagicMock(
+        return_value=interface.State(
+            ui_elements=[], pixels=np.empty([1, 2, 3]), forest=None
+        )
+    )
+
+    env.get_state(wait_to_stabilize=True)
+
+    # Three matching polls take 0.15 s, so the rest of the window is waited.
+    sleeps = [c.args[0] for c in mock_sleep.call_args_list]
+    self.assertEqual(sleeps[:2], [0.05, 0.1])
+    self.assertAlmostEqual(sum(sleeps), interface._MIN_STABLE_SECS)
+
+  @mock.patch("time.sleep", return_value=None)
+  def test_wait_until_uses_poll_schedule(self, mock_sleep):
+    env = interface.AsyncAndroidEnv(mock.MagicMock(), poll_schedule=(0.2,))
+    predicate = mock.MagicMock(side_effect=[False, False, True])
+
+    self.assertTrue(env.wait_until(predicate))
+    self.assertEqual(
+        [c.args[0] for c in mock_sleep.call_args_list], [0.2, 0.2]
+    )
+
+
+class GeometryCacheTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_get_logical_screen_size = mock.patch.object(
+        adb_utils, "get_logical_screen_size", return_value=(1080, 2400)
+    ).start()
+    self.mock_get_orientation = mock.patch.object(
+        adb_utils, "get_orientation", return_value=0
+    ).start()
+    self.mock_get_physical_frame_boundary = mock.patch.object(
+        adb_utils,
+        "get_physical_frame_boundary",
+        return_value=(0, 0, 1080, 2400),
+    ).start()
+
+  def tearDown(self):
+    super().tearDown()
+    mock.patch.stopall()
+
+  def test_geometry_is_cached(self):
+    env = interface.AsyncAndroidEnv(mock.MagicMock())
+
+    for _ in range(3):
+      self.assertEqual(env.logical_screen_size, (1080, 2400))
+      self.assertEqual(env.orientation, 0)
+      self.assertEqual(env.physical_frame_boundary, (0, 0, 1080, 2400))
+
+    self.mock_get_logical_screen_size.assert_called_once()
+    self.mock_get_orientation.assert_called_once()
+    self.mock_get_physical_frame_boundary.assert_called_once_with(
+        env.controller, 0
+    )
+
+  def test_invalidate_geometry_cache(self):
+    env = interface.AsyncAndroidEnv(mock.MagicMock())
+    _ = env.orientation
+    env.invalidate_geometry_cache()
+    _ = env.orientation
+    self.assertEqual(self.mock_get_orientation.call_count, 2)
+
+  @mock.patch.object(interface.actuation, "execute_adb_action")
+  def test_execute_action_keeps_cache(self, unused_mock_execute):
+    env = interface.AsyncAndroidEnv(mock.MagicMock())
+    env._get_state = mock.MagicMock()
+    _ = env.orientation
+    env.execute_action(
+        json_action.JSONAction(action_type=json_action.NAVIGATE_HOME)
+    )
+    _ = env.orientation
+    self.assertEqual(self.mock_get_orientation.call_count, 1)
+
+  def _observe_pixels(self, env, height, width):
+    env.controller.step.return_value = mock.MagicMock(
+        observation={
+            "pixels": np.zeros((height, width, 3), dtype=np.uint8),
+            android_world_controller.OBSERVATION_KEY_FOREST: None,
+            android_world_controller.OBSERVATION_KEY_UI_ELEMENTS: [],
+        }
+    )
+    env.get_state()
+
+  def _observe_windows(self, env, right, bottom):
+    forest = android_accessibility_forest_pb2.AndroidAccessibilityForest()
+    for window_bottom in (100, bottom):
+      window = forest.windows.add()
+      window.bounds_in_screen.right = right
+      window.bounds_in_screen.bottom = window_bottom
+    env.controller.get_ui_observation.return_value = (forest, [])
+    env.get_state(include_pixels=False)
+
+  def test_rotated_screenshot_invalidates_cache(self):
+    env = interface.AsyncAndroidEnv(mock.MagicMock())
+    self._observe_pixels(env, 2400, 1080)
+    _ = env.orientation
+    self._observe_pixels(env, 2400, 1080)
+    # States without pixels don't affect the screenshot shape.
+    self._observe_windows(env, 1080, 2400)
+    _ = env.orientation
+    self.assertEqual(self.mock_get_orientation.call_count, 1)
+
+    self._observe_pixels(env, 1080, 2400)
+    _ = env.orientation
+    self.assertEqual(self.mock_get_orientation.call_count, 2)
+
+  def test_resized_windows_invalidate_cache(self):
+    env = interface.AsyncAndroidEnv(mock.MagicMock())
+    self._observe_windows(env, 1080, 2400)
+    _ = env.logical_screen_size
+    self._observe_windows(env, 1080, 2400)
+    _ = env.logical_screen_size
+    self.mock_get_logical_screen_size.assert_called_once()
+
+    self._observe_windows(env, 720, 1280)
+    _ = env.logical_screen_size
+    self.assertEqual(self.mock_get_logical_screen_size.call_count, 2)
+
+  @mock.patch("time.time")
+  def test_geometry_cache_ttl(self, mock_time):
+    env = interface.AsyncAndroidEnv(
+        mock.MagicMock(), geometry_cache_ttl_sec=10.0
+    )
+    mock_time.return_value = 100.0
+    _ = env.orientation
+    mock_time.return_value = 105.0
+    _ = env.orientation
+    self.assertEqual(self.mock_get_orientation.call_count, 1)
+    mock_time.return_value = 111.0
+    _ = env.orientation
+    self.assertEqual(self.mock_get_orientation.call_count, 2)
+
+
+class ExecuteActionWithObservedStateTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.mock_execute = mock.patch.object(
+        interface.actuation, "execute_adb_action"
+    ).start()
+    mock.patch.object(
+        adb_utils, "get_logical_screen_size", return_value=(1080, 2400)
+    ).start()
+    self.env = interface.AsyncAndroidEnv(mock.MagicMock())
+    self.env._get_state = mock.MagicMock()
+    self.observed = interface.State(
+        pixels=np.empty([1, 2, 3]),
+        forest=None,
+        ui_elements=[representation_utils.UIElement(text="Button")],
+    )
+    self.click = json_action.JSONAction(action_type=json_action.CLICK, index=0)
+
+  def tearDown(self):
+    super().tearDown()
+    mock.patch.stopall()
+
+  def test_without_state_fetches_state(self):
+    self.env.execute_action(self.click)
+
+    self.env._get_state.assert_called_once()
+    self.assertEqual(
+        self.mock_execute.call_args.args[1],
+        self.env._get_state.return_value.ui_elements,
+    )
+
+  def test_uses_observed_state(self):
+    self.env.execute_action(self.click, self.observed)
+
+    self.env._get_state.assert_not_called()
+    self.assertEqual(
+        self.mock_execute.call_args.args[1], self.observed.ui_elements
+    )
+
+  def test_refetch_reuses_observed_state_if_unchanged(self):
+    self.env.controller.get_ui_elements.return_value = [
+        representation_utils.UIElement(text="Button")
+    ]
+    self.env.execute_action(self.click, self.observed)
+    get_state = self.mock_execute.call_args.args[4]
+
+    self.assertIs(get_state(wait_to_stabilize=True), self.observed)
+    self.env._get_state.assert_not_called()
+
+  def test_refetch_fetches_state_if_changed(self):
+    self.env.controller.get_ui_elements.return_value = [
+        representation_utils.UIElement(text="Other")
+    ]
+    self.env.execute_action(self.click, self.observed)
+    get_state = self.mock_execute.call_args.args[4]
+
+    self.assertIs(get_state(), self.env._get_state.return_value)
+
 
 if __name__ == "__main__":
   absltest.main()
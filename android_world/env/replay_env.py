@@ -0,0 +1,314 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An environment that replays recorded states instead of driving a device.
+
+Agents can be run against states recorded in checkpointed episodes, e.g. to
+benchmark their own overhead (prompt construction, UI descriptions, parsing)
+deterministically and without an emulator:
+
+```
+episode = checkpointer.load()[0]
+env = replay_env.ReplayAsyncEnv.from_episode(episode)
+agent = t3a.T3A(env, infer.ScriptedLlmWrapper([...]))
+agent.step(episode['goal'])
+```
+
+Actions are accepted and logged; the next recorded state is served on the
+following observation.
+"""
+
+from collections.abc import Sequence
+import dataclasses
+from typing import Any, Literal
+
+from absl import logging
+from android_env.proto import adb_pb2
+from android_world import constants
+from android_world.env import android_world_controller
+from android_world.env import conditions
+from android_world.env import interface
+from android_world.env import json_action
+from android_world.env import representation_utils
+from android_world.env import ui_stability
+import numpy as np
+
+# Pairs of (UI elements, screenshot) step data keys recorded by the agents.
+_STATE_KEYS = (
+    ('before_ui_elements', 'raw_screenshot'),  # M3A.
+    ('before_element_list', 'before_screenshot'),  # T3A.
+    ('ui_elements', 'screenshot'),
+)
+# Generic adb arguments that act on the device, rather than query it.
+_ACTION_SHELL_COMMANDS = ('input', 'am')
+_ACTION_REQUESTS = ('tap', 'press_button', 'input_text', 'start_activity')
+
+
+def states_from_step_data(
+    step_data: dict[str, list[Any]],
+) -> list[interface.State]:
+  """Extracts the observed states from an episode's step data.
+
+  Args:
+    step_data: The step data of an episode, as returned by
+      `episode_runner.run_episode`, mapping keys to a list of per-step values.
+
+  Returns:
+    The state observed before each step, followed by the state after the last
+    step if it was recorded.
+
+  Raises:
+    ValueError: If the step data doesn't contain recorded UI elements.
+  """
+  for elements_key, pixels_key in _STATE_KEYS:
+    if elements_key in step_data:
+      break
+  else:
+    raise ValueError(
+        'Step data has no recorded UI elements; expected one of'
+        f' {[k for k, _ in _STATE_KEYS]}.'
+    )
+  num_steps = len(step_data[elements_key])
+  all_pixels = step_data.get(pixels_key, [None] * num_steps)
+  states = [
+      interface.State(pixels=pixels, forest=None, ui_elements=ui_elements)
+      for ui_elements, pixels in zip(step_data[elements_key], all_pixels)
+      if ui_elements is not None
+  ]
+  after_elements = step_data.get('after_element_list')
+  if after_elements and after_elements[-1] is not None:
+    after_pixels = step_data.get('after_screenshot', [None])[-1]
+    states.append(
+        interface.State(
+            pixels=after_pixels, forest=None, ui_elements=after_elements[-1]
+        )
+    )
+  return states
+
+
+class _ReplayController:
+  """Stands in for the device controller of a `ReplayAsyncEnv`.
+
+  Agents that actuate through the controller directly, e.g. SeeAct, issue adb
+  requests; they succeed without output and actions advance the replay.
+  """
+
+  def __init__(self, env: 'ReplayAsyncEnv'):
+    self._env = env
+
+  def execute_adb_call(
+      self, request: adb_pb2.AdbRequest
+  ) -> adb_pb2.AdbResponse:
+    command = request.WhichOneof('command')
+    args = list(request.generic.args) if command == 'generic' else []
+    shell_command = args[1] if len(args) > 1 and args[0] == 'shell' else None
+    if command in _ACTION_REQUESTS or shell_command in _ACTION_SHELL_COMMANDS:
+      self._env.record_action(request)
+    return adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.OK)
+
+  def get_ui_elements(self) -> list[representation_utils.UIElement]:
+    return self._env.current_state.ui_elements
+
+  def get_ui_observation(
+      self,
+  ) -> tuple[None, list[representation_utils.UIElement]]:
+    return None, self.get_ui_elements()
+
+  @property
+  def device_screen_size(self) -> tuple[int, int]:
+    return self._env.device_screen_size
+
+  def close(self) -> None:
+    pass
+
+
+class ReplayAsyncEnv(interface.AsyncEnv):
+  """Serves recorded states and logs actions, without a device."""
+
+  interaction_cache = ''
+
+  def __init__(
+      self,
+      states: Sequence[interface.State],
+      key: Literal['step', 'fingerprint'] = 'step',
+      screen_size: tuple[int, int] | None = None,
+      orientation: int = 0,
+  ):
+    """Initializes the environment.
+
+    Args:
+      states: The recorded states, in the order they were observed.
+      key: How the state following an action is chosen. "step" serves the
+        states in order. "fingerprint" serves the state recorded after the last
+        one with the same UI fingerprint as the current state, so replay follows
+        the recording when an agent revisits a screen; if the current screen
+        was never left in the recording, the next state in order is served.
+      screen_size: The (width, height) of the screen. Defaults to the size of
+        the first recorded screenshot.
+      orientation: The screen orientation reported to agents.
+    """
+    if not states:
+      raise ValueError('At least one state is required.')
+    if key not in ('step', 'fingerprint'):
+      raise ValueError(f'Unknown replay key: {key}')
+    self._states = list(states)
+    self._key = key
+    if screen_size is None:
+      pixels = next((s.pixels for s in states if s.pixels is not None), None)
+      if pixels is None:
+        raise ValueError('screen_size is required if no state has pixels.')
+      screen_size = (pixels.shape[1], pixels.shape[0])
+    self._screen_size = screen_size
+    self._orientation = orientation
+    width, height = screen_size
+    self._blank_pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    # Maps a UI fingerprint to the index of the state recorded after it.
+    self._transitions = {
+        ui_stability.ui_fingerprint(s.ui_elements): i + 1
+        for i, s in enumerate(self._states[:-1])
+    }
+    self._controller = _ReplayController(self)
+    self._index = 0
+    self._pending_action = False
+    self.actions: list[Any] = []
+    self.interaction_cache = ''
+
+  @classmethod
+  def from_episode(
+      cls, episode: dict[str, Any], **kwargs
+  ) -> 'ReplayAsyncEnv':
+    """Creates an environment replaying a checkpointed episode.
+
+    Args:
+      episode: An episode as saved by the checkpointer.
+      **kwargs: Passed to the constructor.
+
+    Returns:
+      The environment.
+    """
+    return cls(
+        states_from_step_data(
+            episode[constants.EpisodeConstants.EPISODE_DATA]
+        ),
+        **kwargs,
+    )
+
+  @property
+  def controller(self) -> android_world_controller.AndroidWorldController:
+    return self._controller  # pytype: disable=bad-return-type
+
+  @property
+  def current_state(self) -> interface.State:
+    return self._states[self._index]
+
+  @property
+  def step_index(self) -> int:
+    """Index of the state currently served."""
+    return self._index
+
+  def record_action(self, action: Any) -> None:
+    """Logs an action; the next observation advances the replay."""
+    logging.info('Replay step %d: %s', self._index, action)
+    self.actions.append(action)
+    self._pending_action = True
+
+  def _advance(self) -> None:
+    self._pending_action = False
+    if self._key == 'fingerprint':
+      next_index = self._transitions.get(
+          ui_stability.ui_fingerprint(self.current_state.ui_elements),
+          self._index + 1,
+      )
+    else:
+      next_index = self._index + 1
+    if next_index >= len(self._states):
+      logging.warning('Replay exhausted; serving the last state again.')
+      next_index = len(self._states) - 1
+    self._index = next_index
+
+  def reset(self, go_home: bool = False) -> interface.State:
+    del go_home
+    self._index = 0
+    self._pending_action = False
+    self.actions.clear()
+    self.interaction_cache = ''
+    return self.current_state
+
+  def get_state(
+      self, wait_to_stabilize: bool = False, include_pixels: bool = True
+  ) -> interface.State:
+    del wait_to_stabilize
+    if self._pending_action:
+      self._advance()
+    state = self.current_state
+    if not include_pixels:
+      state = dataclasses.replace(state, pixels=None)
+    elif state.pixels is None:
+      # E.g. T3A can record episodes without screenshots.
+      state = dataclasses.replace(state, pixels=self._blank_pixels)
+    return state
+
+  def execute_action(
+      self,
+      action: json_action.JSONAction,
+      state: interface.State | None = None,
+  ) -> None:
+    del state
+    if action.action_type == json_action.ANSWER:
+      self.interaction_cache = action.text
+    if action.action_type in (json_action.ANSWER, json_action.STATUS):
+      self.actions.append(action)
+      return
+    self.record_action(action)
+
+  def wait_until(
+      self,
+      predicate: conditions.Predicate,
+      timeout: float = 5.0,
+      poll_schedule: Sequence[float] | None = None,
+  ) -> bool:
+    # Recorded states are already settled.
+    del predicate, timeout, poll_schedule
+    return True
+
+  def ask_question(
+      self, question: str, timeout_seconds: float = -1.0
+  ) -> str | None:
+    raise NotImplementedError('ask_question is not implemented.')
+
+  @property
+  def foreground_activity_name(self) -> str:
+    return ui_stability.foreground_package(self.current_state.ui_elements)
+
+  @property
+  def device_screen_size(self) -> tuple[int, int]:
+    return self._screen_size
+
+  @property
+  def logical_screen_size(self) -> tuple[int, int]:
+    return self._screen_size
+
+  def close(self) -> None:
+    pass
+
+  def hide_automation_ui(self) -> None:
+    pass
+
+  @property
+  def orientation(self) -> int:
+    return self._orientation
+
+  @property
+  def physical_frame_boundary(self) -> tuple[int, int, int, int]:
+    return (0, 0, *self._screen_size)
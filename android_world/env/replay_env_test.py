@@ -0,0 +1,214 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_world import constants
+from android_world.agents import infer
+from android_world.agents import m3a
+from android_world.agents import seeact
+from android_world.agents import t3a
+from android_world.env import adb_utils
+from android_world.env import interface
+from android_world.env import json_action
+from android_world.env import replay_env
+from android_world.env import representation_utils
+import numpy as np
+
+
+def _elements(text: str) -> list[representation_utils.UIElement]:
+  return [
+      representation_utils.UIElement(
+          text=text,
+          class_name='android.widget.Button',
+          bbox_pixels=representation_utils.BoundingBox(10, 50, 20, 40),
+          is_clickable=True,
+          is_visible=True,
+          package_name='com.app',
+      )
+  ]
+
+
+def _state(text: str) -> interface.State:
+  return interface.State(
+      pixels=np.zeros((100, 60, 3), dtype=np.uint8),
+      forest=None,
+      ui_elements=_elements(text),
+  )
+
+
+class StatesFromStepDataTest(absltest.TestCase):
+
+  def test_m3a_step_data(self):
+    pixels = np.zeros((100, 60, 3), dtype=np.uint8)
+    step_data = {
+        'before_ui_elements': [_elements('a'), _elements('b')],
+        'raw_screenshot': [pixels, pixels],
+    }
+
+    states = replay_env.states_from_step_data(step_data)
+
+    self.assertEqual(
+        [s.ui_elements[0].text for s in states], ['a', 'b']
+    )
+    self.assertIs(states[0].pixels, pixels)
+
+  def test_t3a_step_data_includes_final_state(self):
+    step_data = {
+        'before_element_list': [_elements('a'), _elements('b')],
+        'after_element_list': [_elements('b'), _elements('c')],
+    }
+
+    states = replay_env.states_from_step_data(step_data)
+
+    self.assertEqual(
+        [s.ui_elements[0].text for s in states], ['a', 'b', 'c']
+    )
+    self.assertIsNone(states[0].pixels)
+
+  def test_no_ui_elements_raises(self):
+    with self.assertRaises(ValueError):
+      replay_env.states_from_step_data({'summary': ['done']})
+
+
+class ReplayAsyncEnvTest(absltest.TestCase):
+
+  def test_actions_advance_on_next_observation(self):
+    env = replay_env.ReplayAsyncEnv([_state('a'), _state('b')])
+    self.assertEqual(env.get_state().ui_elements[0].text, 'a')
+
+    env.execute_action(json_action.JSONAction(action_type=json_action.WAIT))
+    self.assertEqual(env.step_index, 0)
+    self.assertEqual(env.get_state().ui_elements[0].text, 'b')
+    # Observing again without acting serves the same state.
+    self.assertEqual(env.get_state().ui_elements[0].text, 'b')
+    self.assertLen(env.actions, 1)
+
+  def test_exhausted_replay_serves_last_state(self):
+    env = replay_env.ReplayAsyncEnv([_state('a'), _state('b')])
+
+    for _ in range(3):
+      env.execute_action(json_action.JSONAction(action_type=json_action.WAIT))
+      state = env.get_state()
+
+    self.assertEqual(state.ui_elements[0].text, 'b')
+
+  def test_fingerprint_key_follows_recording(self):
+    env = replay_env.ReplayAsyncEnv(
+        [_state('a'), _state('b'), _state('a'), _state('c')],
+        key='fingerprint',
+    )
+
+    env.execute_action(json_action.JSONAction(action_type=json_action.WAIT))
+    self.assertEqual(env.get_state().ui_elements[0].text, 'c')
+
+  def test_answer_is_cached_without_advancing(self):
+    env = replay_env.ReplayAsyncEnv([_state('a'), _state('b')])
+
+    env.execute_action(
+        json_action.JSONAction(action_type=json_action.ANSWER, text='42')
+    )
+
+    self.assertEqual(env.interaction_cache, '42')
+    self.assertEqual(env.get_state().ui_elements[0].text, 'a')
+
+  def test_reset(self):
+    env = replay_env.ReplayAsyncEnv([_state('a'), _state('b')])
+    env.execute_action(json_action.JSONAction(action_type=json_action.WAIT))
+    env.get_state()
+
+    state = env.reset()
+
+    self.assertEqual(state.ui_elements[0].text, 'a')
+    self.assertEmpty(env.actions)
+
+  def test_pixels(self):
+    states = [
+        interface.State(pixels=None, forest=None, ui_elements=_elements('a'))
+    ]
+    env = replay_env.ReplayAsyncEnv(states, screen_size=(60, 100))
+
+    self.assertEqual(env.get_state().pixels.shape, (100, 60, 3))
+    self.assertIsNone(env.get_state(include_pixels=False).pixels)
+
+  def test_screen_size_from_pixels(self):
+    env = replay_env.ReplayAsyncEnv([_state('a')])
+    self.assertEqual(env.device_screen_size, (60, 100))
+    self.assertEqual(env.physical_frame_boundary, (0, 0, 60, 100))
+    self.assertEqual(env.foreground_activity_name, 'com.app')
+
+  def test_controller_actions_advance(self):
+    env = replay_env.ReplayAsyncEnv([_state('a'), _state('b')])
+
+    adb_utils.tap_screen(10, 20, env.controller)
+    adb_utils.get_current_activity(env.controller)
+
+    self.assertLen(env.actions, 1)
+    self.assertEqual(env.get_state().ui_elements[0].text, 'b')
+    self.assertEqual(env.controller.get_ui_elements()[0].text, 'b')
+
+
+class ReplayAgentsTest(parameterized.TestCase):
+
+  def _episode(self) -> dict[str, object]:
+    return {
+        constants.EpisodeConstants.GOAL: 'Press the button.',
+        constants.EpisodeConstants.EPISODE_DATA: {
+            'before_ui_elements': [_elements('a'), _elements('b')],
+            'raw_screenshot': [_state('a').pixels, _state('b').pixels],
+        },
+    }
+
+  @parameterized.parameters('m3a', 't3a', 'seeact')
+  def test_agent_steps(self, name):
+    env = replay_env.ReplayAsyncEnv.from_episode(self._episode())
+    wait = 'Reason: Test.\nAction: {"action_type": "wait"}'
+    if name == 'm3a':
+      agent = m3a.M3A(
+          env,
+          infer.ScriptedLlmWrapper([wait, 'Waited.']),
+          wait_after_action_seconds=0.0,
+      )
+    elif name == 't3a':
+      agent = t3a.T3A(
+          env,
+          infer.ScriptedLlmWrapper([
+              'Reason: Test.\nAction: wait',
+              wait,
+              'Summary:\n{"summary": "Waited.", "new_knowledge": "None"}',
+          ]),
+          description_llm=infer.ScriptedLlmWrapper(['A button.']),
+      )
+    else:
+      llm = infer.ScriptedLlmWrapper([
+          'Go back.',
+          'ELEMENT: None\nACTION: NAVIGATE BACK\nVALUE: None',
+      ])
+      agent = seeact.SeeAct(
+          env,
+          execute_request_fn=lambda payload: {
+              'choices': [{'message': {'content': llm.predict('')[0]}}]
+          },
+      )
+    agent.transition_pause = None
+
+    response = agent.step('Press the button.')
+
+    self.assertFalse(response.done)
+    self.assertLen(env.actions, 1)
+    self.assertEqual(env.get_state().ui_elements[0].text, 'b')
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,245 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Detects when the screen has stopped changing.
+
+The UI is considered stable once consecutive observations have the same
+fingerprint: a hash of the UI elements and, optionally, of a downsampled
+screenshot. Observations are polled on an adaptive schedule, probing quickly at
+first so static screens return right away, then backing off so long animations
+don't flood the device with requests.
+"""
+
+import collections
+from collections.abc import Callable, Sequence
+import dataclasses
+import hashlib
+import threading
+import time
+from typing import Any, Optional, TypeVar
+
+from android_world.env import representation_utils
+from android_world.utils import tracing
+import numpy as np
+
+# Seconds between consecutive polls; the last entry is repeated.
+DEFAULT_POLL_SCHEDULE = (0.05, 0.1, 0.2, 0.3, 0.5)
+
+# Row and column stride used to downsample screenshots before hashing.
+_PIXEL_STRIDE = 16
+
+_T = TypeVar('_T')
+
+
+def ui_fingerprint(
+    ui_elements: Sequence[representation_utils.UIElement],
+    pixels: Optional[np.ndarray] = None,
+) -> bytes:
+  """Returns a digest identifying the UI elements and, optionally, pixels.
+
+  Args:
+    ui_elements: The UI elements on screen.
+    pixels: If provided, a downsampled copy of the screenshot is also hashed.
+
+  Returns:
+    A 16 byte digest; equal UI elements and pixels give equal digests.
+  """
+  digest = hashlib.blake2b(digest_size=16)
+  # UIElement is a dataclass of primitives, so its repr is canonical.
+  digest.update(repr(list(ui_elements)).encode())
+  if pixels is not None:
+    digest.update(
+        np.ascontiguousarray(pixels[::_PIXEL_STRIDE, ::_PIXEL_STRIDE]).data
+    )
+  return digest.digest()
+
+
+def foreground_package(
+    ui_elements: Sequence[representation_utils.UIElement],
+) -> str:
+  """Returns the most common package among the UI elements, or 'unknown'."""
+  counts = collections.Counter(
+      e.package_name for e in ui_elements if e.package_name
+  )
+  if not counts:
+    return 'unknown'
+  return counts.most_common(1)[0][0]
+
+
+@dataclasses.dataclass
+class StabilizationResult:
+  """Outcome of waiting for the UI to stabilize.
+
+  Attributes:
+    state: The last observed state.
+    stable: Whether the UI stabilized before the timeout.
+    num_polls: Number of observations fetched.
+    latency_sec: Time spent waiting.
+  """
+
+  state: Any
+  stable: bool
+  num_polls: int
+  latency_sec: float
+
+
+class StabilizationStats:
+  """Thread-safe latency statistics of stabilizations, grouped by app."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._results: dict[str, list[StabilizationResult]] = (
+        collections.defaultdict(list)
+    )
+
+  def record(self, key: str, result: StabilizationResult) -> None:
+    with self._lock:
+      self._results[key].append(
+          dataclasses.replace(result, state=None)  # Don't hold on to pixels.
+      )
+
+  def reset(self) -> None:
+    with self._lock:
+      self._results.clear()
+
+  def summary(self) -> dict[str, dict[str, float]]:
+    """Returns latency statistics for each app.
+
+    Returns:
+      A mapping from package name to the number of stabilizations, the fraction
+      that timed out, the mean number of polls and latency percentiles in
+      seconds.
+    """
+    with self._lock:
+      results = {k: list(v) for k, v in self._results.items()}
+    summary = {}
+    for key, values in sorted(results.items()):
+      latencies = np.array([r.latency_sec for r in values])
+      summary[key] = {
+          'count': len(values),
+          'timeout_rate': float(np.mean([not r.stable for r in values])),
+          'mean_polls': float(np.mean([r.num_polls for r in values])),
+          'mean_sec': float(latencies.mean()),
+          'p50_sec': float(np.percentile(latencies, 50)),
+          'p90_sec': float(np.percentile(latencies, 90)),
+          'max_sec': float(latencies.max()),
+      }
+    return summary
+
+  def format_summary(self) -> str:
+    """Returns the summary as a human-readable table."""
+    lines = [
+        f'{"package":<45} {"count":>6} {"timeouts":>8} {"polls":>6}'
+        f' {"p50 s":>6} {"p90 s":>6} {"max s":>6}'
+    ]
+    for key, s in self.summary().items():
+      lines.append(
+          f'{key:<45} {s["count"]:>6} {s["timeout_rate"]:>8.0%}'
+          f' {s["mean_polls"]:>6.1f} {s["p50_sec"]:>6.2f}'
+          f' {s["p90_sec"]:>6.2f} {s["max_sec"]:>6.2f}'
+      )
+    return '\n'.join(lines)
+
+
+class StabilityDetector:
+  """Polls observations until consecutive fingerprints match."""
+
+  def __init__(
+      self,
+      stability_threshold: int = 3,
+      poll_schedule: Sequence[float] = DEFAULT_POLL_SCHEDULE,
+      timeout: float = 6.0,
+      fingerprint_fn: Optional[Callable[[Any], bytes]] = None,
+      min_stable_sec: float = 0.0,
+  ):
+    """Initializes the detector.
+
+    Args:
+      stability_threshold: Number of consecutive observations with the same
+        fingerprint required to consider the UI stable.
+      poll_schedule: Seconds to sleep between consecutive polls. The i-th entry
+        is used after the i-th poll and the last one is repeated.
+      timeout: Maximum time in seconds to wait for the UI to become stable.
+      fingerprint_fn: Maps an observation to its fingerprint. Defaults to the
+        fingerprint of its UI elements.
+      min_stable_sec: Minimum time in seconds, counted in sleeps between polls,
+        that the fingerprint must stay the same. Polls that come quickly after
+        an action may otherwise all precede the transition it starts.
+    """
+    if stability_threshold <= 0:
+      raise ValueError('Stability threshold must be a positive integer.')
+    if not poll_schedule:
+      raise ValueError('Poll schedule must not be empty.')
+    self._stability_threshold = stability_threshold
+    self._poll_schedule = tuple(poll_schedule)
+    self._timeout = timeout
+    self._min_stable_sec = min_stable_sec
+    self._fingerprint_fn = fingerprint_fn or (
+        lambda state: ui_fingerprint(state.ui_elements)
+    )
+
+  def wait(self, get_state_fn: Callable[[], _T]) -> StabilizationResult:
+    """Fetches states until the UI is stable or the timeout is reached.
+
+    Args:
+      get_state_fn: Fetches the current observation.
+
+    Returns:
+      The result, holding the last observed state.
+    """
+    start_time = time.time()
+    deadline = start_time + self._timeout
+    state = get_state_fn()
+    num_polls = 1
+    prior_fingerprint = self._fingerprint_fn(state)
+    stable_checks = 1
+    stable_sec = 0.0
+
+    while not self._is_stable(stable_checks, stable_sec):
+      now = time.time()
+      if now >= deadline:
+        break
+      if stable_checks >= self._stability_threshold:
+        # Enough matching polls; wait out the rest of the minimum window.
+        sleep_time = self._min_stable_sec - stable_sec
+      else:
+        sleep_time = self._poll_schedule[
+            min(num_polls, len(self._poll_schedule)) - 1
+        ]
+      sleep_time = min(sleep_time, deadline - now)
+      if sleep_time > 0:
+        tracing.sleep(sleep_time)
+      state = get_state_fn()
+      num_polls += 1
+      fingerprint = self._fingerprint_fn(state)
+      if fingerprint == prior_fingerprint:
+        stable_checks += 1
+        stable_sec += max(sleep_time, 0.0)
+      else:
+        stable_checks = 1
+        stable_sec = 0.0
+        prior_fingerprint = fingerprint
+
+    return StabilizationResult(
+        state=state,
+        stable=self._is_stable(stable_checks, stable_sec),
+        num_polls=num_polls,
+        latency_sec=time.time() - start_time,
+    )
+
+  def _is_stable(self, stable_checks: int, stable_sec: float) -> bool:
+    return (
+        stable_checks >= self._stability_threshold
+        and stable_sec >= self._min_stable_sec
+    )
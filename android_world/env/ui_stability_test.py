@@ -0,0 +1,151 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.env import interface
+from android_world.env import representation_utils
+from android_world.env import ui_stability
+import numpy as np
+
+
+def _state(text: str, pixels: np.ndarray | None = None) -> interface.State:
+  return interface.State(
+      pixels=np.zeros((64, 64, 3), np.uint8) if pixels is None else pixels,
+      forest=None,
+      ui_elements=[
+          representation_utils.UIElement(text=text, package_name='com.app')
+      ],
+  )
+
+
+class FingerprintTest(absltest.TestCase):
+
+  def test_equal_elements_have_equal_fingerprints(self):
+    self.assertEqual(
+        ui_stability.ui_fingerprint(_state('a').ui_elements),
+        ui_stability.ui_fingerprint(_state('a').ui_elements),
+    )
+    self.assertNotEqual(
+        ui_stability.ui_fingerprint(_state('a').ui_elements),
+        ui_stability.ui_fingerprint(_state('b').ui_elements),
+    )
+
+  def test_pixels_are_included(self):
+    ui_elements = _state('a').ui_elements
+    black = np.zeros((64, 64, 3), np.uint8)
+    white = np.full((64, 64, 3), 255, np.uint8)
+    self.assertNotEqual(
+        ui_stability.ui_fingerprint(ui_elements, black),
+        ui_stability.ui_fingerprint(ui_elements, white),
+    )
+    self.assertEqual(
+        ui_stability.ui_fingerprint(ui_elements, black),
+        ui_stability.ui_fingerprint(ui_elements, black.copy()),
+    )
+
+  def test_foreground_package(self):
+    ui_elements = [
+        representation_utils.UIElement(package_name='com.android.systemui'),
+        representation_utils.UIElement(package_name='com.app'),
+        representation_utils.UIElement(package_name='com.app'),
+        representation_utils.UIElement(),
+    ]
+    self.assertEqual(ui_stability.foreground_package(ui_elements), 'com.app')
+    self.assertEqual(ui_stability.foreground_package([]), 'unknown')
+
+
+@mock.patch('time.sleep', return_value=None)
+class StabilityDetectorTest(absltest.TestCase):
+
+  def test_static_screen_returns_after_two_polls(self, mock_sleep):
+    get_state = mock.MagicMock(side_effect=[_state('a'), _state('a')])
+    result = ui_stability.StabilityDetector(
+        stability_threshold=2, poll_schedule=(0.05, 0.5)
+    ).wait(get_state)
+
+    self.assertTrue(result.stable)
+    self.assertEqual(result.num_polls, 2)
+    mock_sleep.assert_called_once_with(0.05)
+
+  def test_backs_off_while_changing(self, mock_sleep):
+    states = [_state(t) for t in 'abcdd']
+    result = ui_stability.StabilityDetector(
+        stability_threshold=2, poll_schedule=(0.05, 0.2)
+    ).wait(mock.MagicMock(side_effect=states))
+
+    self.assertTrue(result.stable)
+    self.assertIs(result.state, states[-1])
+    self.assertEqual(result.num_polls, 5)
+    self.assertEqual(
+        [c.args[0] for c in mock_sleep.call_args_list], [0.05, 0.2, 0.2, 0.2]
+    )
+
+  def test_waits_for_minimum_stable_window(self, mock_sleep):
+    states = [_state(t) for t in 'abbb']
+    result = ui_stability.StabilityDetector(
+        stability_threshold=2, poll_schedule=(0.05,), min_stable_sec=0.5
+    ).wait(mock.MagicMock(side_effect=states))
+
+    self.assertTrue(result.stable)
+    self.assertEqual(result.num_polls, 4)
+    # The window restarts when the UI changes from 'a' to 'b'.
+    sleeps = [c.args[0] for c in mock_sleep.call_args_list]
+    self.assertEqual(sleeps[:2], [0.05, 0.05])
+    self.assertAlmostEqual(sleeps[2], 0.45)
+
+  def test_times_out(self, unused_mock_sleep):
+    states = [_state(str(i)) for i in range(5)]
+    with mock.patch('time.time', side_effect=[0, 0, 0.5, 1.1, 1.1]):
+      result = ui_stability.StabilityDetector(timeout=1.0).wait(
+          mock.MagicMock(side_effect=states)
+      )
+
+    self.assertFalse(result.stable)
+    self.assertIs(result.state, states[2])
+
+  def test_invalid_threshold(self, unused_mock_sleep):
+    with self.assertRaises(ValueError):
+      ui_stability.StabilityDetector(stability_threshold=0)
+
+
+class StabilizationStatsTest(absltest.TestCase):
+
+  def test_summary(self):
+    stats = ui_stability.StabilizationStats()
+    stats.record('com.app', ui_stability.StabilizationResult(None, True, 2, 1))
+    stats.record('com.app', ui_stability.StabilizationResult(None, False, 4, 3))
+    stats.record('com.other', ui_stability.StabilizationResult(None, True, 2, 0))
+
+    summary = stats.summary()
+
+    self.assertEqual(list(summary), ['com.app', 'com.other'])
+    self.assertEqual(summary['com.app']['count'], 2)
+    self.assertEqual(summary['com.app']['timeout_rate'], 0.5)
+    self.assertEqual(summary['com.app']['mean_polls'], 3.0)
+    self.assertEqual(summary['com.app']['p50_sec'], 2.0)
+    self.assertEqual(summary['com.app']['max_sec'], 3.0)
+    self.assertIn('com.other', stats.format_summary())
+
+  def test_record_drops_state(self):
+    stats = ui_stability.StabilizationStats()
+    stats.record(
+        'com.app', ui_stability.StabilizationResult(_state('a'), True, 2, 1)
+    )
+    self.assertIsNone(stats._results['com.app'][0].state)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -19,6 +19,7 @@ from typing import Any, Callable, Optional
 from android_world import constants
 from android_world.agents import base_agent
 from android_world.env import interface
+from android_world.utils import tracing
 import termcolor
 
 
@@ -46,6 +47,7 @@ def run_episode(
     start_on_home_screen: bool = False,
     termination_fn: Callable[[interface.AsyncEnv], float] | None = None,
     print_fn: Callable[[str], None] = print,
+    tracer: tracing.Tracer | None = None,
 ) -> EpisodeResult:
   """Runs an agent on goal, e.g., "turn off wifi".
 
@@ -64,6 +66,8 @@ def run_episode(
       For example, for MiniWoB++ tasks, the episode should terminate if there is
       a nonzero reward.
     print_fn: A function to print log messages to the console or logger.
+    tracer: If provided, the spans of every step are recorded into it, e.g. to
+      export a Chrome trace of the episode.
 
   Returns:
     Data collected during running agent on goal.
@@ -76,12 +80,24 @@ def run_episode(
   agent.reset(start_on_home_screen)
   agent.set_max_steps(max_n_steps)
 
+  if tracer is None:
+    tracer = tracing.Tracer()
   output = []
   for step_n in range(max_n_steps):
-    result = agent.step(goal)
+    num_spans = len(tracer.spans)
+    with tracer.activate(), tracing.span(tracing.STEP, step=step_n):
+      result = agent.step(goal)
     print_fn('Completed step {:d}.'.format(step_n + 1))
     assert constants.STEP_NUMBER not in result.data
-    output.append(result.data | {constants.STEP_NUMBER: step_n})
+    output.append(
+        result.data
+        | {
+            constants.STEP_NUMBER: step_n,
+            constants.STEP_TIMING: tracing.breakdown(
+                tracer.spans[num_spans:]
+            ),
+        }
+    )
     if termination_fn(agent.env):
       print_fn('Environment ends episode.')
       return EpisodeResult(
@@ -19,6 +19,7 @@ from android_world import constants
 from android_world import episode_runner
 from android_world.agents import base_agent
 from android_world.env import interface
+from android_world.utils import tracing
 
 
 class FakeEnvironmentInteractingAgent(base_agent.EnvironmentInteractingAgent):
@@ -89,6 +90,34 @@ class EpisodeRunnerTest(absltest.TestCase):
 
     mock_agent.env.reset.assert_called_with(go_home=True)
 
+  @mock.patch.object(base_agent, 'EnvironmentInteractingAgent')
+  def test_records_step_timing(self, mock_agent_class):
+    mock_agent = FakeEnvironmentInteractingAgent(self.env, 'fake_agent')
+    mock_agent_class.return_value = mock_agent
+
+    def step(goal):
+      del goal
+      with tracing.span(tracing.LLM):
+        pass
+      return base_agent.AgentInteractionResult(done=False, data={})
+
+    mock_agent.step = step
+    tracer = tracing.Tracer()
+
+    result = episode_runner.run_episode(
+        'test_goal', mock_agent, max_n_steps=2, tracer=tracer
+    )
+
+    timings = result.step_data[constants.STEP_TIMING]
+    self.assertLen(timings, 2)
+    for timing in timings:
+      self.assertCountEqual(timing, [tracing.STEP, tracing.LLM])
+      self.assertGreaterEqual(timing[tracing.STEP], timing[tracing.LLM])
+    self.assertEqual(
+        [s.name for s in tracer.spans],
+        [tracing.LLM, tracing.STEP, tracing.LLM, tracing.STEP],
+    )
+
 
 if __name__ == '__main__':
   absltest.main()
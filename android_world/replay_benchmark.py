@@ -0,0 +1,180 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks agent step latency offline, by replaying a recorded episode.
+
+No emulator or model is needed: observations are served from a checkpointed
+episode and the LLM returns canned responses, so the measured time is the
+agent's own overhead, e.g. building prompts and describing UI elements.
+
+Example:
+
+```
+python -m android_world.replay_benchmark \
+  --checkpoint_dir=~/android_world/runs/run_20240101T000000 --agents=m3a,t3a
+```
+"""
+
+from collections.abc import Callable, Sequence
+import os
+import time
+from typing import Any
+
+from absl import app
+from absl import flags
+from absl import logging
+from android_world import checkpointer as checkpointer_lib
+from android_world import constants
+from android_world.agents import base_agent
+from android_world.agents import infer
+from android_world.agents import m3a
+from android_world.agents import seeact
+from android_world.agents import t3a
+from android_world.env import interface
+from android_world.env import replay_env
+from android_world.utils import tracing
+import numpy as np
+
+_CHECKPOINT_DIR = flags.DEFINE_string(
+    'checkpoint_dir', None, 'Run directory with the episode to replay.'
+)
+_EPISODE_INDEX = flags.DEFINE_integer(
+    'episode_index', 0, 'Index of the episode to replay in the checkpoint.'
+)
+_AGENTS = flags.DEFINE_list(
+    'agents', ['m3a', 't3a', 'seeact'], 'Agents to benchmark.'
+)
+_NUM_STEPS = flags.DEFINE_integer(
+    'num_steps', None, 'Steps per agent; defaults to the recorded episode length.'
+)
+_KEY = flags.DEFINE_enum(
+    'key',
+    'step',
+    ['step', 'fingerprint'],
+    'How the state following an action is chosen; see ReplayAsyncEnv.',
+)
+_LLM_LATENCY_SEC = flags.DEFINE_float(
+    'llm_latency_sec', 0.0, 'Simulated latency of each LLM call.'
+)
+
+# Canned responses, in the order each agent queries the model during a step.
+_M3A_RESPONSES = [
+    'Reason: Benchmark.\nAction: {"action_type": "wait"}',
+    'Waited for the screen to update.',
+]
+_T3A_RESPONSES = [
+    'Reason: Benchmark.\nAction: wait',
+    'Reason: Benchmark.\nAction: {"action_type": "wait"}',
+    'Summary:\n{"summary": "Waited.", "new_knowledge": "None"}',
+]
+_T3A_DESCRIPTION_RESPONSES = ['A screen of an app.']
+# SeeAct actuates through the controller, where waiting would really sleep.
+_SEEACT_RESPONSES = [
+    'Go back.',
+    'ELEMENT: None\nACTION: NAVIGATE BACK\nVALUE: None',
+]
+
+
+def _openai_response(llm: infer.ScriptedLlmWrapper) -> Callable[..., Any]:
+  """Adapts a scripted LLM to SeeAct's OpenAI request function."""
+
+  def execute_request(payload: list[dict[str, Any]]) -> dict[str, Any]:
+    text, _, _ = llm.predict(str(payload))
+    return {'choices': [{'message': {'content': text}}]}
+
+  return execute_request
+
+
+def _create_agent(
+    name: str, env: interface.AsyncEnv
+) -> base_agent.EnvironmentInteractingAgent:
+  """Creates the named agent with a scripted LLM."""
+  latency = _LLM_LATENCY_SEC.value
+  if name == 'm3a':
+    agent = m3a.M3A(
+        env,
+        infer.ScriptedLlmWrapper(_M3A_RESPONSES, latency_sec=latency),
+        wait_after_action_seconds=0.0,
+    )
+  elif name == 't3a':
+    agent = t3a.T3A(
+        env,
+        infer.ScriptedLlmWrapper(_T3A_RESPONSES, latency_sec=latency),
+        description_llm=infer.ScriptedLlmWrapper(
+            _T3A_DESCRIPTION_RESPONSES, latency_sec=latency
+        ),
+    )
+  elif name == 'seeact':
+    agent = seeact.SeeAct(
+        env,
+        execute_request_fn=_openai_response(
+            infer.ScriptedLlmWrapper(_SEEACT_RESPONSES, latency_sec=latency)
+        ),
+    )
+  else:
+    raise ValueError(f'Unknown agent: {name}')
+  # Recorded states are already settled.
+  agent.transition_pause = None
+  return agent
+
+
+def _benchmark(
+    name: str, episode: dict[str, Any], num_steps: int
+) -> tuple[np.ndarray, dict[str, float]]:
+  """Returns per-step latencies in ms and the mean ms per step in each span."""
+  env = replay_env.ReplayAsyncEnv.from_episode(episode, key=_KEY.value)
+  agent = _create_agent(name, env)
+  agent.reset()
+  goal = episode[constants.EpisodeConstants.GOAL]
+  tracer = tracing.Tracer()
+  latencies = []
+  for _ in range(num_steps):
+    start = time.perf_counter()
+    with tracer.activate():
+      agent.step(goal)
+    latencies.append((time.perf_counter() - start) * 1000)
+  totals = tracing.breakdown(tracer.spans)
+  return np.array(latencies), {
+      k: v * 1000 / num_steps for k, v in sorted(totals.items())
+  }
+
+
+def main(argv: Sequence[str]) -> None:
+  del argv
+  logging.set_verbosity(logging.WARNING)
+  checkpointer = checkpointer_lib.IncrementalCheckpointer(
+      os.path.expanduser(_CHECKPOINT_DIR.value)
+  )
+  episode = checkpointer.load()[_EPISODE_INDEX.value]
+  num_steps = _NUM_STEPS.value or episode[
+      constants.EpisodeConstants.EPISODE_LENGTH
+  ]
+
+  print(
+      f'{"agent":<8} | {"p50 ms":>8} {"p90 ms":>8} {"max ms":>8} |'
+      ' mean ms per step by span'
+  )
+  for name in _AGENTS.value:
+    latencies, spans = _benchmark(name, episode, num_steps)
+    p50, p90 = np.percentile(latencies, [50, 90])
+    breakdown = ', '.join(f'{k}={v:.1f}' for k, v in spans.items())
+    print(
+        f'{name:<8} | {p50:8.1f} {p90:8.1f} {latencies.max():8.1f} |'
+        f' {breakdown}'
+    )
+
+
+if __name__ == '__main__':
+  flags.mark_flag_as_required('checkpoint_dir')
+  app.run(main)
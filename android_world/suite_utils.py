@@ -15,11 +15,17 @@
 """Utilities for evaluating automation agents."""
 
 import collections
+from collections.abc import Mapping, Sequence
+from concurrent import futures
+import dataclasses
 import datetime
+import functools
 import hashlib
 import logging
 import os
+import queue
 import random
+import threading
 import time
 import traceback
 from typing import Any, Callable, Type, TypeVar
@@ -33,6 +39,7 @@ from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.task_evals import task_eval
 from android_world.task_evals.miniwob import miniwob_base
+from android_world.utils import tracing
 from fuzzywuzzy import process
 import numpy as np
 import pandas as pd
@@ -41,9 +48,48 @@ import pandas as pd
 _FIXED_SEED = 123
 _TASK_TEMPLATE_COLUMN = 'task_template'
 _TASK_PROMPT_COLUMN = 'task_prompt'
+# Fields kept in memory for each episode and used to resume from checkpoints.
+_METADATA_FIELDS = (
+    constants.EpisodeConstants.GOAL,
+    constants.EpisodeConstants.TASK_TEMPLATE,
+    constants.EpisodeConstants.INSTANCE_ID,
+    constants.EpisodeConstants.IS_SUCCESSFUL,
+    constants.EpisodeConstants.EPISODE_LENGTH,
+    constants.EpisodeConstants.RUN_TIME,
+    constants.EpisodeConstants.EXCEPTION_INFO,
+    constants.EpisodeConstants.AUX_DATA,
+)
 TaskEvalType = TypeVar('TaskEvalType', bound=task_eval.TaskEval)
 
 
+def _episode_metadata(episode: dict[str, Any]) -> dict[str, Any]:
+  """Returns the metadata fields of an episode, plus its step timing if any.
+
+  The step timing is kept with the metadata so result summaries can include it,
+  but is not part of `_METADATA_FIELDS` since checkpoints written without it
+  must still load.
+
+  Args:
+    episode: A full episode.
+  """
+  metadata = {k: episode[k] for k in _METADATA_FIELDS}
+  timings = _step_timings(episode)
+  if timings:
+    metadata[constants.STEP_TIMING] = timings
+  return metadata
+
+
+def _step_timings(episode: dict[str, Any]) -> list[dict[str, float]]:
+  """Returns the per-step latency breakdown of a full or metadata episode."""
+  timings = episode.get(constants.STEP_TIMING)
+  if isinstance(timings, list):
+    return timings
+  episode_data = episode.get(constants.EpisodeConstants.EPISODE_DATA)
+  if isinstance(episode_data, dict):
+    return episode_data.get(constants.STEP_TIMING, [])
+  return []
+
+
 class Suite(dict[str, list[task_eval.TaskEval]]):
   """A suite of tasks.
 
@@ -316,6 +362,43 @@ def _get_task_info(
   return completed, failed
 
 
+class _EpisodeRecorder:
+  """Collects episode metadata during a suite run and reports progress.
+
+  By default results are accumulated in a `ResultsAggregator`. If a custom
+  `process_episodes_fn` is provided, it is called on all episode metadata after
+  every new episode instead.
+  """
+
+  def __init__(
+      self, process_episodes_fn=None, summary_interval: int | None = 1
+  ):
+    self.episodes_metadata: list[dict[str, Any]] = []
+    self._process_episodes_fn = process_episodes_fn
+    self._aggregator = (
+        ResultsAggregator(summary_interval)
+        if process_episodes_fn is None
+        else None
+    )
+
+  def add(self, episodes: list[dict[str, Any]], report: bool) -> None:
+    """Records episodes' metadata, reporting progress if `report` is set."""
+    self.episodes_metadata.extend(episodes)
+    if self._aggregator is None:
+      if report:
+        self._process_episodes_fn(self.episodes_metadata, print_summary=True)
+      return
+    for episode in episodes:
+      self._aggregator.add(episode)
+    if report:
+      self._aggregator.maybe_print_summary()
+
+  def finish(self) -> None:
+    """Reports any results not yet included in a printed summary."""
+    if self._aggregator is not None:
+      self._aggregator.maybe_print_summary(force=True)
+
+
 def _run_task_suite(
     suite: Suite,
     run_episode: Callable[[task_eval.TaskEval], episode_runner.EpisodeResult],
@@ -326,6 +409,7 @@ def _run_task_suite(
     return_full_episode_data: bool = False,
     process_episodes_fn=None,
     check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_interval: int | None = 1,
 ) -> list[dict[str, Any]]:
   """Runs e2e system on suite.
 
@@ -338,34 +422,26 @@ def _run_task_suite(
     agent_name: The name of the agent.
     return_full_episode_data: Whether to return full episode data instead of
       just metadata.
-    process_episodes_fn: The function to process episode data. Usually to
-      compute metrics. Deafaults to process_episodes from this file.
+    process_episodes_fn: The function to process episode data, called with all
+      episode metadata after every episode. Defaults to incrementally
+      aggregating results with a `ResultsAggregator`.
     check_episode_fn: The function to check episode data.
+    summary_interval: When `process_episodes_fn` is not set, print the results
+      summary every this many episodes. If None, only print it at the end.
 
   Returns:
     Metadata for each episode, including the scripted reward.
   """
-  metadata_fields = [
-      constants.EpisodeConstants.GOAL,
-      constants.EpisodeConstants.TASK_TEMPLATE,
-      constants.EpisodeConstants.INSTANCE_ID,
-      constants.EpisodeConstants.IS_SUCCESSFUL,
-      constants.EpisodeConstants.EPISODE_LENGTH,
-      constants.EpisodeConstants.RUN_TIME,
-      constants.EpisodeConstants.EXCEPTION_INFO,
-      constants.EpisodeConstants.AUX_DATA,
-  ]
+  metadata_fields = list(_METADATA_FIELDS)
   completed_tasks, failed_tasks = _get_task_info(
       checkpointer.load(fields=metadata_fields)
   )
-  if process_episodes_fn is None:
-    process_episodes_fn = process_episodes
 
   if (completed_tasks or failed_tasks) and return_full_episode_data:
     raise ValueError(
         'Cannot return full episode data when resuming from a checkpoint.'
     )
-  episodes_metadata: list[dict[str, Any]] = []
+  recorder = _EpisodeRecorder(process_episodes_fn, summary_interval)
   full_episode_data = []
   correct, total = 0, 0
   for name, instances in suite.items():
@@ -381,9 +457,9 @@ def _run_task_suite(
         completed_episodes: list[dict[str, Any]] = completed_tasks[
             instance_name
         ]
-        episodes_metadata.extend(completed_episodes)
+        recorder.add(completed_episodes, report=False)
       if instance_name in failed_tasks:
-        episodes_metadata.extend(failed_tasks[instance_name])
+        recorder.add(failed_tasks[instance_name], report=False)
       already_processed = (
           instance_name in completed_tasks and instance_name not in failed_tasks
       )
@@ -405,8 +481,7 @@ def _run_task_suite(
       if return_full_episode_data:
         full_episode_data.append(episode)
 
-      episodes_metadata.append({k: episode[k] for k in metadata_fields})
-      process_episodes_fn(episodes_metadata, print_summary=True)
+      recorder.add([_episode_metadata(episode)], report=True)
 
       if episode[constants.EpisodeConstants.EXCEPTION_INFO] is not None:
         # Don't include episode in tally if execution/eval logic errored out.
@@ -416,8 +491,13 @@ def _run_task_suite(
       if demo_mode:
         _update_scoreboard(correct, total, env.controller)
     print()
+  recorder.finish()
 
-  return full_episode_data if return_full_episode_data else episodes_metadata
+  return (
+      full_episode_data
+      if return_full_episode_data
+      else recorder.episodes_metadata
+  )
 
 
 def run(
@@ -428,6 +508,8 @@ def run(
     return_full_episode_data: bool = False,
     process_episodes_fn=None,
     check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_interval: int | None = 1,
+    trace_dir: str | None = None,
 ) -> list[dict[str, Any]]:
   """Create suite and runs eval suite.
 
@@ -442,28 +524,20 @@ def run(
       task instruction as a notification.
     return_full_episode_data: Whether to return full episode data instead of
       just metadata.
-    process_episodes_fn: The function to process episode data. Usually to
-      compute metrics. Deafaults to process_episodes from this file.
+    process_episodes_fn: The function to process episode data, called with all
+      episode metadata after every episode. Defaults to incrementally
+      aggregating results with a `ResultsAggregator`.
     check_episode_fn: The function to check episode data.
+    summary_interval: When `process_episodes_fn` is not set, print the results
+      summary every this many episodes. If None, only print it at the end.
+    trace_dir: If set, a Chrome trace of each episode's steps is written to
+      this directory.
 
   Returns:
     Step-by-step data from each episode.
   """
 
-  def run_episode(task: task_eval.TaskEval) -> episode_runner.EpisodeResult:
-    if demo_mode:
-      _display_goal(agent.env, task)
-    return episode_runner.run_episode(
-        goal=task.goal,
-        agent=agent,
-        max_n_steps=_allocate_step_budget(task.complexity),
-        start_on_home_screen=task.start_on_home_screen,
-        termination_fn=(
-            miniwob_base.is_episode_terminated
-            if task.name.lower().startswith('miniwob')
-            else None
-        ),
-    )
+  run_episode = _make_run_episode(agent, demo_mode, trace_dir)
 
   if demo_mode:
     adb_utils.send_android_intent(
@@ -483,11 +557,221 @@ def run(
       return_full_episode_data=return_full_episode_data,
       process_episodes_fn=process_episodes_fn,
       check_episode_fn=check_episode_fn,
+      summary_interval=summary_interval,
   )
 
   return results
 
 
+def _make_run_episode(
+    agent: base_agent.EnvironmentInteractingAgent,
+    demo_mode: bool,
+    trace_dir: str | None = None,
+) -> Callable[[task_eval.TaskEval], episode_runner.EpisodeResult]:
+  """Returns a function that runs `agent` on a task for one episode."""
+
+  def run_episode(task: task_eval.TaskEval) -> episode_runner.EpisodeResult:
+    if demo_mode:
+      _display_goal(agent.env, task)
+    tracer = tracing.Tracer()
+    try:
+      return episode_runner.run_episode(
+          goal=task.goal,
+          agent=agent,
+          max_n_steps=_allocate_step_budget(task.complexity),
+          start_on_home_screen=task.start_on_home_screen,
+          termination_fn=(
+              miniwob_base.is_episode_terminated
+              if task.name.lower().startswith('miniwob')
+              else None
+          ),
+          tracer=tracer,
+      )
+    finally:
+      if trace_dir is not None:
+        tracer.write_chrome_trace(
+            os.path.join(
+                trace_dir,
+                f'{task.name}_{datetime.datetime.now():%Y%m%d_%H%M%S_%f}.json',
+            )
+        )
+
+  return run_episode
+
+
+def _run_task_suite_parallel(
+    suite: Suite,
+    workers: Sequence[
+        tuple[
+            interface.AsyncEnv,
+            Callable[[task_eval.TaskEval], episode_runner.EpisodeResult],
+        ]
+    ],
+    checkpointer: checkpointer_lib.Checkpointer = checkpointer_lib.NullCheckpointer(),
+    agent_name: str = '',
+    return_full_episode_data: bool = False,
+    process_episodes_fn=None,
+    check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_interval: int | None = 1,
+) -> list[dict[str, Any]]:
+  """Runs e2e system on suite using a pool of environments.
+
+  Each worker owns one environment and the function that runs an episode on it.
+  Task instances are put on a shared queue and dispatched to whichever worker
+  is free, so run time scales roughly linearly with the number of workers.
+  Episodes are checkpointed as soon as they finish, exactly like in
+  `_run_task_suite`, and the returned episodes follow the suite order.
+
+  Args:
+    suite: The suite to run it on.
+    workers: Pairs of (environment, run_episode function). The run_episode
+      function must only interact with its paired environment.
+    checkpointer: See docstring from `run`.
+    agent_name: The name of the agent.
+    return_full_episode_data: Whether to return full episode data instead of
+      just metadata.
+    process_episodes_fn: The function to process episode data, called with all
+      episode metadata after every episode. Defaults to incrementally
+      aggregating results with a `ResultsAggregator`.
+    check_episode_fn: The function to check episode data.
+    summary_interval: When `process_episodes_fn` is not set, print the results
+      summary every this many episodes. If None, only print it at the end.
+
+  Returns:
+    Metadata for each episode, including the scripted reward.
+
+  Raises:
+    ValueError: If no workers are provided.
+  """
+  if not workers:
+    raise ValueError('At least one worker is required.')
+  metadata_fields = list(_METADATA_FIELDS)
+  completed_tasks, failed_tasks = _get_task_info(
+      checkpointer.load(fields=metadata_fields)
+  )
+
+  if (completed_tasks or failed_tasks) and return_full_episode_data:
+    raise ValueError(
+        'Cannot return full episode data when resuming from a checkpoint.'
+    )
+
+  # Episodes for each instance, in suite order. Resumed episodes are filled in
+  # up front and newly run episodes are filled in by the workers.
+  slots: list[list[dict[str, Any]]] = []
+  pending = queue.Queue()
+  for name, instances in suite.items():
+    for i, instance in enumerate(instances):
+      instance_name = (
+          instance.name + checkpointer_lib.INSTANCE_SEPARATOR + str(i)
+      )
+      slot = list(completed_tasks.get(instance_name, [])) + list(
+          failed_tasks.get(instance_name, [])
+      )
+      slots.append(slot)
+      if instance_name in completed_tasks and instance_name not in failed_tasks:
+        _log_and_print('Skipping already processed task %s', instance_name)
+        continue
+      pending.put((len(slots) - 1, name, i, instance, instance_name))
+
+  lock = threading.Lock()
+  recorder = _EpisodeRecorder(process_episodes_fn, summary_interval)
+  recorder.add([episode for slot in slots for episode in slot], report=False)
+
+  def work(
+      env: interface.AsyncEnv,
+      run_episode: Callable[[task_eval.TaskEval], episode_runner.EpisodeResult],
+  ) -> None:
+    while True:
+      try:
+        index, name, i, instance, instance_name = pending.get_nowait()
+      except queue.Empty:
+        return
+      _log_and_print('Running task: %s (instance %d)', name, i)
+      episode = _run_task(instance, run_episode, env, demo_mode=False)
+      if (
+          episode.get(constants.EpisodeConstants.EXCEPTION_INFO) is None
+          and check_episode_fn is not None
+      ):
+        if not check_episode_fn(episode):
+          continue
+      episode[constants.EpisodeConstants.AGENT_NAME] = agent_name
+      episode[constants.EpisodeConstants.INSTANCE_ID] = i
+      checkpointer.save_episodes([episode], instance_name)
+
+      with lock:
+        metadata = _episode_metadata(episode)
+        slots[index].append(
+            episode if return_full_episode_data else metadata
+        )
+        recorder.add([metadata], report=True)
+
+  with futures.ThreadPoolExecutor(max_workers=len(workers)) as executor:
+    running = [
+        executor.submit(work, env, run_episode) for env, run_episode in workers
+    ]
+    for future in running:
+      future.result()
+  recorder.finish()
+
+  return [episode for slot in slots for episode in slot]
+
+
+def run_parallel(
+    suite: Suite,
+    agent_factory: Callable[
+        [interface.AsyncEnv], base_agent.EnvironmentInteractingAgent
+    ],
+    envs: Sequence[interface.AsyncEnv],
+    checkpointer: checkpointer_lib.Checkpointer = checkpointer_lib.NullCheckpointer(),
+    return_full_episode_data: bool = False,
+    process_episodes_fn=None,
+    check_episode_fn: Callable[[dict[str, Any]], bool] | None = None,
+    summary_interval: int | None = 1,
+    trace_dir: str | None = None,
+) -> list[dict[str, Any]]:
+  """Runs eval suite on several environments at once.
+
+  One agent is created per environment using `agent_factory`, and task
+  instances are dispatched to whichever environment is free. Demo mode is not
+  supported since there is no single screen to display the scoreboard on.
+
+  NOTE: Task instances share the process-wide `random` module, so random data
+  generated during `initialize_task` is not reproducible across runs.
+
+  Args:
+    suite: The suite of tasks to run on.
+    agent_factory: Creates an agent that interacts on the given environment.
+    envs: Environments to run on, e.g. one per emulator.
+    checkpointer: See docstring from `run`. It is shared by all environments.
+    return_full_episode_data: Whether to return full episode data instead of
+      just metadata.
+    process_episodes_fn: The function to process episode data, called with all
+      episode metadata after every episode. Defaults to incrementally
+      aggregating results with a `ResultsAggregator`.
+    check_episode_fn: The function to check episode data.
+    summary_interval: When `process_episodes_fn` is not set, print the results
+      summary every this many episodes. If None, only print it at the end.
+    trace_dir: See docstring from `run`.
+
+  Returns:
+    Step-by-step data from each episode, in suite order.
+  """
+  agents = [agent_factory(env) for env in envs]
+  return _run_task_suite_parallel(
+      suite,
+      [
+          (agent.env, _make_run_episode(agent, False, trace_dir))
+          for agent in agents
+      ],
+      checkpointer=checkpointer,
+      agent_name=agents[0].name if agents else '',
+      return_full_episode_data=return_full_episode_data,
+      process_episodes_fn=process_episodes_fn,
+      check_episode_fn=check_episode_fn,
+      summary_interval=summary_interval,
+  )
+
+
 def _allocate_step_budget(task_complexity: float) -> int:
   """Allocates number of steps dynamically based on the complexity score.
 
@@ -588,6 +872,12 @@ def _update_scoreboard(
 
 def _extract_task_metadata() -> pd.DataFrame:
   """Extracts metadata from task_metadata.json."""
+  return _load_task_metadata().copy()
+
+
+@functools.cache
+def _load_task_metadata() -> pd.DataFrame:
+  """Reads and parses task_metadata.json once per process."""
   name = 'task_metadata.json'
   filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
   df = pd.read_json(filepath)
@@ -707,21 +997,218 @@ def process_episodes(
   )
 
   if print_summary:
-    avg = result_df.mean(axis=0)
-    avg.name = '========= Average ========='
-
-    result = pd.concat([result_df, avg.to_frame().T])
-    result.index.name = 'task'
-    result.insert(0, 'task_num', list(range(len(result) - 1)) + [0])
-    result.task_num = result.task_num.astype(int)
-    pd.set_option('display.max_columns', 100)
-    pd.set_option('display.max_rows', 1000)
-    pd.set_option('display.width', 1000)
-    _log_and_print('\n\n%s', result)  # Use lazy % formatting
-
-    # Add a chart that shows mean success rate by tag and difficulty.
-    tags_df = _print_results_by_tag(tagged_result_df)
-    pd.set_option('display.precision', 2)
-    _log_and_print('\n\n%s', tags_df)
+    _print_summary(result_df, tagged_result_df)
+    _print_step_timing(summarize_step_timing(episodes))
 
   return tagged_result_df
+
+
+def summarize_step_timing(episodes: list[dict[str, Any]]) -> pd.DataFrame:
+  """Aggregates the per-step latency breakdown of episodes by task template.
+
+  Args:
+    episodes: Results from running `run_task_suite`, either full episodes or
+      their metadata. Episodes without step timing, e.g. failed ones, are
+      skipped.
+
+  Returns:
+    A dataframe indexed by task template with the number of steps and, for each
+    span name (e.g. "llm", "adb"), the mean seconds spent in it per step. Empty
+    if no episode has step timing.
+  """
+  totals = collections.defaultdict(collections.Counter)
+  num_steps = collections.Counter()
+  for episode in episodes:
+    template = episode[constants.EpisodeConstants.TASK_TEMPLATE]
+    for timing in _step_timings(episode):
+      totals[template].update(timing)
+      num_steps[template] += 1
+  return _step_timing_dataframe(totals, num_steps)
+
+
+def _step_timing_dataframe(
+    totals: Mapping[str, Mapping[str, float]], num_steps: Mapping[str, int]
+) -> pd.DataFrame:
+  """Returns the mean seconds per step of each span by task template.
+
+  Args:
+    totals: Seconds spent in each span per task template.
+    num_steps: Number of steps with timing per task template.
+
+  Returns:
+    See `summarize_step_timing`.
+  """
+  num_steps = {template: n for template, n in num_steps.items() if n}
+  if not num_steps:
+    return pd.DataFrame()
+  df = pd.DataFrame.from_dict(
+      {
+          template: {
+              name: total / num_steps[template]
+              for name, total in totals[template].items()
+          }
+          for template in num_steps
+      },
+      orient='index',
+  ).fillna(0.0)
+  df = df[sorted(df.columns)].sort_index()
+  df.insert(0, 'num_steps', pd.Series(num_steps))
+  df.index.name = _TASK_TEMPLATE_COLUMN
+  return df
+
+
+def _print_step_timing(timing_df: pd.DataFrame) -> None:
+  if not timing_df.empty:
+    _log_and_print('\n\nMean seconds per step:\n%s', timing_df.round(2))
+
+
+def _print_summary(
+    result_df: pd.DataFrame, tagged_result_df: pd.DataFrame
+) -> None:
+  """Prints the per-task results table and the per-tag results table."""
+  avg = result_df.mean(axis=0)
+  avg.name = '========= Average ========='
+
+  result = pd.concat([result_df, avg.to_frame().T])
+  result.index.name = 'task'
+  result.insert(0, 'task_num', list(range(len(result) - 1)) + [0])
+  result.task_num = result.task_num.astype(int)
+  pd.set_option('display.max_columns', 100)
+  pd.set_option('display.max_rows', 1000)
+  pd.set_option('display.width', 1000)
+  _log_and_print('\n\n%s', result)  # Use lazy % formatting
+
+  # Add a chart that shows mean success rate by tag and difficulty.
+  tags_df = _print_results_by_tag(tagged_result_df)
+  pd.set_option('display.precision', 2)
+  _log_and_print('\n\n%s', tags_df)
+
+
+@dataclasses.dataclass
+class _TemplateStats:
+  """Running counters for the episodes of a single task template."""
+
+  num_complete_trials: int = 0
+  success_sum: float = 0.0
+  episode_length_sum: float = 0.0
+  num_episode_lengths: int = 0
+  total_runtime_s: float = 0.0
+  num_fail_trials: int = 0
+  step_timing_totals: collections.Counter[str] = dataclasses.field(
+      default_factory=collections.Counter
+  )
+  num_timed_steps: int = 0
+
+
+class ResultsAggregator:
+  """Incrementally aggregates episode results by task template.
+
+  Produces the same tables as `process_episodes`, but keeps running counters
+  per task template so adding an episode is O(1) and rendering the summary only
+  depends on the number of task templates, not on the number of episodes.
+  """
+
+  def __init__(self, summary_interval: int | None = 1):
+    """Initializes the aggregator.
+
+    Args:
+      summary_interval: Print the summary tables from `maybe_print_summary`
+        every this many added episodes. If None, summaries are only printed on
+        demand.
+    """
+    self._summary_interval = summary_interval
+    self._stats: dict[str, _TemplateStats] = {}
+    self._num_unreported = 0
+
+  def add(self, episode: dict[str, Any]) -> None:
+    """Adds an episode's metadata to the running counters."""
+    task_template = episode.get(constants.EpisodeConstants.TASK_TEMPLATE)
+    if pd.isna(task_template):
+      return
+    stats = self._stats.setdefault(task_template, _TemplateStats())
+    is_successful = episode.get(constants.EpisodeConstants.IS_SUCCESSFUL)
+    if not pd.isna(is_successful):
+      stats.num_complete_trials += 1
+      stats.success_sum += float(is_successful)
+    episode_length = episode.get(constants.EpisodeConstants.EPISODE_LENGTH)
+    if not pd.isna(episode_length):
+      stats.episode_length_sum += float(episode_length)
+      stats.num_episode_lengths += 1
+    run_time = episode.get(constants.EpisodeConstants.RUN_TIME)
+    if not pd.isna(run_time):
+      stats.total_runtime_s += float(run_time)
+    if pd.notnull(episode.get(constants.EpisodeConstants.EXCEPTION_INFO)):
+      stats.num_fail_trials += 1
+    for timing in _step_timings(episode):
+      stats.step_timing_totals.update(timing)
+      stats.num_timed_steps += 1
+    self._num_unreported += 1
+
+  def to_dataframe(self) -> pd.DataFrame:
+    """Returns the aggregated results; see `process_episodes`."""
+    return self._to_dataframes()[1]
+
+  def step_timing_dataframe(self) -> pd.DataFrame:
+    """Returns the step timing breakdown; see `summarize_step_timing`."""
+    return _step_timing_dataframe(
+        {t: stats.step_timing_totals for t, stats in self._stats.items()},
+        {t: stats.num_timed_steps for t, stats in self._stats.items()},
+    )
+
+  def print_summary(self) -> None:
+    """Prints the summary tables for all episodes added so far."""
+    self._num_unreported = 0
+    if self._stats:
+      _print_summary(*self._to_dataframes())
+      _print_step_timing(self.step_timing_dataframe())
+
+  def maybe_print_summary(self, force: bool = False) -> None:
+    """Prints the summary tables if the summary interval has been reached.
+
+    Args:
+      force: Print regardless of the summary interval if any episode was added
+        since the last summary.
+    """
+    if not self._num_unreported:
+      return
+    if force or (
+        self._summary_interval is not None
+        and self._num_unreported >= self._summary_interval
+    ):
+      self.print_summary()
+
+  def _to_dataframes(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Returns the untagged and tagged results tables."""
+    rows = {}
+    for task_template, stats in self._stats.items():
+      rows[task_template] = {
+          'num_complete_trials': stats.num_complete_trials,
+          'mean_success_rate': (
+              stats.success_sum / stats.num_complete_trials
+              if stats.num_complete_trials
+              else np.nan
+          ),
+          'mean_episode_length': (
+              stats.episode_length_sum / stats.num_episode_lengths
+              if stats.num_episode_lengths
+              else np.nan
+          ),
+          'total_runtime_s': float('{:.1f}'.format(stats.total_runtime_s)),
+          'num_fail_trials': stats.num_fail_trials,
+      }
+    result_df = pd.DataFrame.from_dict(
+        rows,
+        orient='index',
+        columns=[
+            'num_complete_trials',
+            'mean_success_rate',
+            'mean_episode_length',
+            'total_runtime_s',
+            'num_fail_trials',
+        ],
+    ).sort_index()
+    result_df.index.name = constants.EpisodeConstants.TASK_TEMPLATE
+    tagged_result_df = result_df.merge(
+        _load_task_metadata(), on=[_TASK_TEMPLATE_COLUMN], how='left'
+    )
+    return result_df, tagged_result_df
@@ -31,6 +31,7 @@ from android_world.env import interface
 from android_world.utils import test_utils
 import dm_env
 import numpy as np
+import pandas as pd
 
 
 class TestCreateSuite(parameterized.TestCase):
@@ -712,5 +713,290 @@ class RunTaskSuiteTest(absltest.TestCase):
     self.assertLen(result2, 1)
 
 
+class RunTaskSuiteParallelTest(absltest.TestCase):
+
+  def _create_suite(self) -> suite_utils.Suite:
+    suite = suite_utils.Suite(
+        **{
+            'FakeCurrentStateEval': [
+                test_utils.FakeCurrentStateEval(
+                    test_utils.FakeCurrentStateEval.generate_random_params()
+                ),
+                test_utils.FakeCurrentStateEval(
+                    test_utils.FakeCurrentStateEval.generate_random_params()
+                ),
+            ],
+            'FakeAdbEval': [
+                test_utils.FakeAdbEval(
+                    test_utils.FakeAdbEval.generate_random_params()
+                )
+            ],
+        },
+    )
+    suite.suite_family = 'android'
+    return suite
+
+  def _create_run_episode(self) -> mock.MagicMock:
+    mock_run_e2e = mock.MagicMock()
+    mock_run_e2e.return_value = episode_runner.EpisodeResult(
+        True,
+        {'step_number': [0]},
+    )
+    return mock_run_e2e
+
+  @mock.patch.object(checkpointer, 'Checkpointer')
+  def test_runs_every_instance_once(self, mock_checkpointer):
+    mock_checkpointer.load.return_value = []
+    run_episode_fns = [self._create_run_episode() for _ in range(2)]
+    workers = [(test_utils.FakeAsyncEnv(), fn) for fn in run_episode_fns]
+
+    result = suite_utils._run_task_suite_parallel(
+        self._create_suite(),
+        workers,
+        mock_checkpointer,
+        agent_name='AnAgent',
+    )
+
+    self.assertEqual(sum(fn.call_count for fn in run_episode_fns), 3)
+    self.assertEqual(
+        [r[constants.EpisodeConstants.TASK_TEMPLATE] for r in result],
+        ['FakeCurrentStateEval', 'FakeCurrentStateEval', 'FakeAdbEval'],
+    )
+    self.assertEqual(
+        [r[constants.EpisodeConstants.INSTANCE_ID] for r in result], [0, 1, 0]
+    )
+    mock_checkpointer.save_episodes.assert_has_calls(
+        [
+            mock.call(mock.ANY, 'FakeCurrentStateEval_0'),
+            mock.call(mock.ANY, 'FakeCurrentStateEval_1'),
+            mock.call(mock.ANY, 'FakeAdbEval_0'),
+        ],
+        any_order=True,
+    )
+
+  @mock.patch.object(suite_utils, '_print_step_timing')
+  @mock.patch.object(checkpointer, 'Checkpointer')
+  def test_summary_includes_step_timing(
+      self, mock_checkpointer, mock_print_step_timing
+  ):
+    mock_checkpointer.load.return_value = []
+    run_episode = self._create_run_episode()
+    run_episode.return_value = episode_runner.EpisodeResult(
+        True,
+        {
+            'step_number': [0, 1],
+            constants.STEP_TIMING: [{'llm': 2.0, 'adb': 1.0}, {'llm': 4.0}],
+        },
+    )
+
+    result = suite_utils._run_task_suite_parallel(
+        self._create_suite(),
+        [(test_utils.FakeAsyncEnv(), run_episode)],
+        mock_checkpointer,
+    )
+
+    self.assertEqual(
+        result[0][constants.STEP_TIMING],
+        [{'llm': 2.0, 'adb': 1.0}, {'llm': 4.0}],
+    )
+    timing_df = mock_print_step_timing.call_args.args[0]
+    self.assertEqual(
+        timing_df.loc['FakeAdbEval'].to_dict(),
+        {'num_steps': 2, 'adb': 0.5, 'llm': 3.0},
+    )
+
+  @mock.patch.object(checkpointer, 'Checkpointer')
+  def test_resume_from_middle(self, mock_checkpointer):
+    mock_checkpointer.load.return_value = [
+        {
+            'instance_id': 0,
+            'is_successful': 0.0,
+            'goal': 'Current state eval',
+            'task_template': 'FakeCurrentStateEval',
+            'episode_length': 1,
+            'run_time': 0,
+        },
+    ]
+    run_episode_fns = [self._create_run_episode() for _ in range(2)]
+    workers = [(test_utils.FakeAsyncEnv(), fn) for fn in run_episode_fns]
+
+    result = suite_utils._run_task_suite_parallel(
+        self._create_suite(), workers, mock_checkpointer
+    )
+
+    self.assertLen(result, 3)
+    self.assertEqual(result[0]['is_successful'], 0)
+    self.assertEqual(result[1]['is_successful'], 1)
+    self.assertEqual(result[2]['is_successful'], 1)
+    self.assertEqual(sum(fn.call_count for fn in run_episode_fns), 2)
+
+  def test_no_workers_raises_value_error(self):
+    with self.assertRaises(ValueError):
+      suite_utils._run_task_suite_parallel(self._create_suite(), [])
+
+  @mock.patch.object(suite_utils, '_run_task_suite_parallel')
+  def test_run_parallel_creates_agent_per_env(self, mock_run_suite):
+    mock_run_suite.return_value = []
+    envs = [test_utils.FakeAsyncEnv(), test_utils.FakeAsyncEnv()]
+    agents = []
+
+    def agent_factory(env):
+      agent = mock.create_autospec(
+          base_agent.EnvironmentInteractingAgent, instance=True
+      )
+      agent.env = env
+      agent.name = 'AnAgent'
+      agents.append(agent)
+      return agent
+
+    suite_utils.run_parallel(self._create_suite(), agent_factory, envs)
+
+    self.assertLen(agents, 2)
+    workers = mock_run_suite.call_args.args[1]
+    self.assertEqual([env for env, _ in workers], envs)
+    self.assertEqual(mock_run_suite.call_args.kwargs['agent_name'], 'AnAgent')
+
+
+class ResultsAggregatorTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.episodes = [
+        {
+            'task_template': 'ContactsAddContact',
+            'is_successful': 1.0,
+            'episode_length': 4,
+            'run_time': 10.0,
+            'exception_info': None,
+        },
+        {
+            'task_template': 'ContactsAddContact',
+            'is_successful': 0.0,
+            'episode_length': 8,
+            'run_time': 20.04,
+            'exception_info': None,
+        },
+        {
+            'task_template': 'ClockStopWatchRunning',
+            'is_successful': np.nan,
+            'episode_length': np.nan,
+            'run_time': 1.0,
+            'exception_info': 'Traceback',
+        },
+        {
+            'task_template': 'ClockStopWatchRunning',
+            'is_successful': 1.0,
+            'episode_length': 2,
+            'run_time': 3.0,
+            'exception_info': None,
+        },
+    ]
+
+  def test_matches_process_episodes(self):
+    aggregator = suite_utils.ResultsAggregator()
+    for episode in self.episodes:
+      aggregator.add(episode)
+
+    pd.testing.assert_frame_equal(
+        aggregator.to_dataframe(),
+        suite_utils.process_episodes(self.episodes),
+        check_dtype=False,
+    )
+
+  def test_nan_exception_info_is_not_a_failure(self):
+    # Episodes loaded from a dataframe have NaN rather than None.
+    self.episodes[0]['exception_info'] = np.nan
+    aggregator = suite_utils.ResultsAggregator()
+    for episode in self.episodes:
+      aggregator.add(episode)
+
+    pd.testing.assert_frame_equal(
+        aggregator.to_dataframe(),
+        suite_utils.process_episodes(self.episodes),
+        check_dtype=False,
+    )
+
+  def test_step_timing_matches_summarize_step_timing(self):
+    self.episodes[0][constants.STEP_TIMING] = [{'llm': 2.0}, {'adb': 1.0}]
+    self.episodes[3][constants.STEP_TIMING] = [{'llm': 1.0}]
+    aggregator = suite_utils.ResultsAggregator()
+    for episode in self.episodes:
+      aggregator.add(episode)
+
+    pd.testing.assert_frame_equal(
+        aggregator.step_timing_dataframe(),
+        suite_utils.summarize_step_timing(self.episodes),
+    )
+
+  @mock.patch.object(suite_utils, '_print_summary')
+  def test_prints_every_summary_interval(self, mock_print_summary):
+    aggregator = suite_utils.ResultsAggregator(summary_interval=2)
+
+    for episode in self.episodes[:3]:
+      aggregator.add(episode)
+      aggregator.maybe_print_summary()
+    self.assertEqual(mock_print_summary.call_count, 1)
+
+    aggregator.maybe_print_summary(force=True)
+    self.assertEqual(mock_print_summary.call_count, 2)
+    aggregator.maybe_print_summary(force=True)
+    self.assertEqual(mock_print_summary.call_count, 2)
+
+  @mock.patch.object(suite_utils, '_print_summary')
+  def test_no_interval_only_prints_on_demand(self, mock_print_summary):
+    aggregator = suite_utils.ResultsAggregator(summary_interval=None)
+
+    for episode in self.episodes:
+      aggregator.add(episode)
+      aggregator.maybe_print_summary()
+    mock_print_summary.assert_not_called()
+
+    aggregator.print_summary()
+    mock_print_summary.assert_called_once()
+
+
+class SummarizeStepTimingTest(absltest.TestCase):
+
+  def test_mean_seconds_per_step(self):
+    episodes = [
+        {
+            constants.EpisodeConstants.TASK_TEMPLATE: 'TaskA',
+            constants.EpisodeConstants.EPISODE_DATA: {
+                constants.STEP_TIMING: [
+                    {'llm': 2.0, 'adb': 1.0},
+                    {'llm': 4.0},
+                ]
+            },
+        },
+        # Episode metadata carries the timing at the top level.
+        {
+            constants.EpisodeConstants.TASK_TEMPLATE: 'TaskB',
+            constants.STEP_TIMING: [{'llm': 1.0}],
+        },
+        {
+            constants.EpisodeConstants.TASK_TEMPLATE: 'TaskB',
+            constants.EpisodeConstants.EPISODE_DATA: np.nan,
+        },
+    ]
+
+    df = suite_utils.summarize_step_timing(episodes)
+
+    self.assertEqual(list(df.columns), ['num_steps', 'adb', 'llm'])
+    self.assertEqual(
+        df.loc['TaskA'].to_dict(), {'num_steps': 2, 'adb': 0.5, 'llm': 3.0}
+    )
+    self.assertEqual(
+        df.loc['TaskB'].to_dict(), {'num_steps': 1, 'adb': 0.0, 'llm': 1.0}
+    )
+
+  def test_no_timing(self):
+    self.assertTrue(
+        suite_utils.summarize_step_timing([{
+            constants.EpisodeConstants.TASK_TEMPLATE: 'TaskA',
+            constants.EpisodeConstants.EPISODE_DATA: {},
+        }]).empty
+    )
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -14,13 +14,19 @@
 
 """Logic for validating an SMS has been sent."""
 
+import collections
+from collections.abc import Sequence
+import dataclasses
 import random
+import re
+import shlex
 import time
 
 from absl import logging
 from android_env import env_interface
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
+from android_world.env import conditions
 from android_world.env import interface
 from android_world.task_evals import task_eval
 from android_world.task_evals.utils import user_data_generation
@@ -180,6 +186,112 @@ def clear_sms_and_threads(env: env_interface.AndroidEnvInterface) -> None:
   adb_utils.execute_sql_command(db_path, "DELETE FROM threads;", env)
 
 
+@dataclasses.dataclass(frozen=True)
+class ReceivedSms:
+  """A text message received from `address`."""
+
+  address: str
+  body: str
+
+
+def _normalize_address(address: str) -> str:
+  return re.sub(r"\D", "", address)
+
+
+def _insert_received_messages_command(messages: Sequence[ReceivedSms]) -> str:
+  """Returns a shell command inserting messages into the SMS inbox.
+
+  Messages are dated a second apart in the order given, the last one a second
+  after the current device time, so they are listed in that order.
+
+  Args:
+    messages: The messages to insert.
+  """
+  commands = ["now=$(date +%s)"]
+  for i, message in enumerate(messages):
+    address = re.sub(r"[^0-9+]", "", message.address)
+    commands.append(
+        "content insert --uri content://sms/inbox"
+        f" --bind {shlex.quote(f'address:s:{address}')}"
+        f" --bind {shlex.quote(f'body:s:{message.body}')}"
+        f" --bind date:l:$(((now + {i + 2 - len(messages)}) * 1000))"
+    )
+  return " && ".join(commands)
+
+
+def _inbox_contains(
+    messages: Sequence[ReceivedSms], env: env_interface.AndroidEnvInterface
+) -> bool:
+  """Returns whether all messages are in the SMS inbox."""
+  response = adb_utils.issue_generic_request(
+      [
+          "shell",
+          "content query --uri content://sms/inbox"
+          " --projection _id:address:body",
+      ],
+      env,
+  )
+  inbox = collections.Counter()
+  for row in _decode_messages_from_response(response):
+    fields = parse_message(row)
+    if "address" in fields and "body" in fields:
+      inbox[(_normalize_address(fields["address"]), fields["body"])] += 1
+  expected = collections.Counter(
+      (_normalize_address(message.address), message.body)
+      for message in messages
+  )
+  return all(inbox[key] >= count for key, count in expected.items())
+
+
+def receive_messages(
+    messages: Sequence[ReceivedSms],
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: float = 10.0,
+) -> None:
+  """Adds messages to the SMS inbox, as if they were received in order.
+
+  The messages are inserted through the SMS content provider with a single adb
+  call. If that fails, they are sent through the emulator console instead, one
+  at a time, each once the previous one is in the inbox so they arrive in
+  order. Either way, this returns once every message is in the inbox.
+
+  Args:
+    messages: The messages to add, oldest first.
+    env: The Android environment.
+    timeout_sec: How long to wait for the messages to be in the inbox.
+
+  Raises:
+    RuntimeError: If the messages are not in the inbox before the timeout. When
+      they are sent, the timeout applies to each message.
+  """
+  if not messages:
+    return
+  (result,) = adb_utils.issue_shell_batch(
+      [_insert_received_messages_command(messages)], env
+  )
+  if result.ok:
+    _wait_for_inbox(messages, env, timeout_sec)
+    return
+  logging.warning(
+      "Failed to insert messages, sending them instead: %s", result.output
+  )
+  for i, message in enumerate(messages):
+    adb_utils.text_emulator(env, message.address, message.body)
+    _wait_for_inbox(messages[: i + 1], env, timeout_sec)
+
+
+def _wait_for_inbox(
+    messages: Sequence[ReceivedSms],
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: float,
+) -> None:
+  """Waits for all messages to be in the SMS inbox."""
+  if not conditions.wait_until(
+      lambda: _inbox_contains(messages, env), timeout=timeout_sec
+  ):
+    raise RuntimeError(f"Messages did not arrive in the inbox: {messages}")
+
+
 class SimpleSMSSendSms(task_eval.TaskEval):
   """Task for checking that a single text message has been sent to a specific number with a specific message.
 
@@ -238,7 +350,6 @@ class SimpleSMSSendSms(task_eval.TaskEval):
     android_time = self.get_android_time(env.controller)
 
     messages = self.get_sent_messages(env.controller)
-    time.sleep(5)
     logging.info("During initialize_task, messages: %s", messages)
     if was_sent(
         messages,
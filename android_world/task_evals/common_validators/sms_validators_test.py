@@ -12,13 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import shutil
+import tempfile
 import time
 from unittest import mock
 
 from absl.testing import absltest
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
+from android_world.env import android_world_controller
 from android_world.task_evals.common_validators import sms_validators
+from android_world.utils import fake_adb_responses
 from android_world.utils import test_utils
 
 
@@ -205,5 +210,128 @@ class TestMessagesSendTextMessage(test_utils.AdbEvalTestBase):
     self.assertEqual(self.mock_execute_sql_command.call_count, 2)
 
 
+class TestReceiveMessages(absltest.TestCase):
+  """Runs the insert command locally, against a stand-in `content` command."""
+
+  def setUp(self):
+    super().setUp()
+    root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root)
+    self.inbox = os.path.join(root, 'inbox')
+    self.fail = os.path.join(root, 'fail')
+    content = os.path.join(root, 'content')
+    with open(content, 'w') as f:
+      f.write(
+          '#!/bin/sh\n'
+          'if [ "$1" = query ]; then\n'
+          f'  [ -s {self.inbox} ] && cat {self.inbox} ||'
+          ' echo "No result found."\n'
+          '  exit 0\n'
+          'fi\n'
+          f'[ -e {self.fail} ] && exit 1\n'
+          'shift 3\n'
+          'while [ $# -gt 1 ]; do\n'
+          '  case "$2" in\n'
+          '    address:s:*) address=${2#address:s:} ;;\n'
+          '    body:s:*) body=${2#body:s:} ;;\n'
+          '    date:l:*) date=${2#date:l:} ;;\n'
+          '  esac\n'
+          '  shift 2\n'
+          'done\n'
+          f'echo "Row: 0 _id=1, date=$date, address=$address, body=$body"'
+          f' >> {self.inbox}\n'
+      )
+    os.chmod(content, 0o755)
+    self.enter_context(
+        mock.patch.dict(os.environ, {'PATH': f"{root}:{os.environ['PATH']}"})
+    )
+    self.mock_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'issue_generic_request',
+            side_effect=fake_adb_responses.run_generic_request_locally,
+        )
+    )
+    self.mock_text_emulator = self.enter_context(
+        mock.patch.object(adb_utils, 'text_emulator')
+    )
+    self.env = mock.create_autospec(
+        android_world_controller.AndroidWorldController, instance=True
+    )
+    self.messages = [
+        sms_validators.ReceivedSms('+1 (212) 555-0100', "It's me, Mario"),
+        sms_validators.ReceivedSms('+12125550101', 'Hi'),
+        sms_validators.ReceivedSms('+12125550101', 'Hi'),
+    ]
+
+  def _read_inbox(self) -> list[dict[str, str]]:
+    with open(self.inbox) as f:
+      return [sms_validators.parse_message(row) for row in f]
+
+  def test_receive_messages(self):
+    sms_validators.receive_messages(self.messages, self.env)
+
+    inbox = self._read_inbox()
+    self.assertEqual(
+        [(row['address'], row['body']) for row in inbox],
+        [
+            ('+12125550100', "It's me, Mario"),
+            ('+12125550101', 'Hi'),
+            ('+12125550101', 'Hi'),
+        ],
+    )
+    dates = [int(row['date']) for row in inbox]
+    self.assertEqual(dates, sorted(dates))
+    self.assertLen(set(dates), len(dates))
+    self.mock_text_emulator.assert_not_called()
+
+  def test_no_messages(self):
+    sms_validators.receive_messages([], self.env)
+
+    self.mock_generic_request.assert_not_called()
+
+  def test_falls_back_to_emulator(self):
+    open(self.fail, 'w').close()
+
+    def text_emulator(env, address, body):
+      del env
+      with open(self.inbox, 'a') as f:
+        f.write(f'Row: 0 _id=1, address={address}, body={body}\n')
+
+    self.mock_text_emulator.side_effect = text_emulator
+
+    sms_validators.receive_messages(self.messages, self.env)
+
+    self.mock_text_emulator.assert_has_calls([
+        mock.call(self.env, message.address, message.body)
+        for message in self.messages
+    ])
+
+  def test_sends_messages_one_at_a_time(self):
+    open(self.fail, 'w').close()
+    open(self.inbox, 'w').close()
+    sent = []
+
+    def text_emulator(env, address, body):
+      del env
+      # The previous messages have all arrived.
+      self.assertLen(self._read_inbox(), len(sent))
+      sent.append(body)
+      with open(self.inbox, 'a') as f:
+        f.write(f'Row: 0 _id=1, address={address}, body={body}\n')
+
+    self.mock_text_emulator.side_effect = text_emulator
+
+    sms_validators.receive_messages(self.messages, self.env)
+
+    self.assertEqual(sent, [message.body for message in self.messages])
+
+  def test_raises_if_messages_do_not_arrive(self):
+    open(self.fail, 'w').close()
+
+    with self.assertRaises(RuntimeError):
+      sms_validators.receive_messages(self.messages, self.env, timeout_sec=0)
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -17,6 +17,7 @@
 import abc
 import dataclasses
 from typing import Any
+from typing import Generic
 from typing import Optional
 from typing import Type
 from absl import logging
@@ -70,6 +71,121 @@ def verify_playlist(
   return matched_files == len(candidate_files)
 
 
+@dataclasses.dataclass(frozen=True)
+class RowDiff(Generic[sqlite_schema_utils.RowType]):
+  """The differences between two states of a table.
+
+  Attributes:
+    added: Rows in the 'after' state that are not in the 'before' state.
+    removed: Rows in the 'before' state that are not in the 'after' state.
+    modified: (before, after) pairs of rows that share an ID but whose contents
+      differ. Such rows are not also listed in `added` or `removed`.
+  """
+
+  added: list[sqlite_schema_utils.RowType]
+  removed: list[sqlite_schema_utils.RowType]
+  modified: list[
+      tuple[sqlite_schema_utils.RowType, sqlite_schema_utils.RowType]
+  ]
+
+  @property
+  def is_empty(self) -> bool:
+    return not (self.added or self.removed or self.modified)
+
+
+def diff_rows(
+    before: list[sqlite_schema_utils.RowType],
+    after: list[sqlite_schema_utils.RowType],
+    id_name: str | None = None,
+) -> RowDiff[sqlite_schema_utils.RowType]:
+  """Computes which rows were added, removed or modified between two states.
+
+  Rows are compared by value; both states are indexed in hash sets, so the diff
+  takes time linear in the number of rows.
+
+  Args:
+    before: State of the rows before the change.
+    after: State of the rows after the change.
+    id_name: The name of the ID column. If provided, a removed row and an added
+      row with the same ID are reported as a modification.
+
+  Returns:
+    The differences between the two states.
+  """
+  before_index = set(before)
+  after_index = set(after)
+  added = [row for row in after if row not in before_index]
+  removed = [row for row in before if row not in after_index]
+  modified = []
+  if id_name is not None and added and removed:
+    added_by_id = {}
+    for row in added:
+      added_by_id.setdefault(getattr(row, id_name), row)
+    paired = set()
+    remaining_removed = []
+    for row in removed:
+      new_row = added_by_id.pop(getattr(row, id_name), None)
+      if new_row is None:
+        remaining_removed.append(row)
+      else:
+        modified.append((row, new_row))
+        paired.add(id(new_row))
+    added = [row for row in added if id(row) not in paired]
+    removed = remaining_removed
+  return RowDiff(added=added, removed=removed, modified=modified)
+
+
+def find_unmatched_rows(
+    reference_rows: list[sqlite_schema_utils.RowType],
+    rows: list[sqlite_schema_utils.RowType],
+    compare_fields: list[str],
+    free_form_fields: list[str] | None = None,
+) -> list[sqlite_schema_utils.RowType]:
+  """Returns the reference rows that don't match any of `rows`.
+
+  `rows` are indexed by their values of the compare fields that aren't free
+  form, so fuzzy matching only runs against the rows that agree exactly on
+  those.
+
+  Args:
+    reference_rows: The expected rows.
+    rows: The rows to search.
+    compare_fields: Which fields to use for comparison for each row.
+    free_form_fields: Free-form, text fields where fuzzy matching will be used
+      for comparison.
+
+  Returns:
+    The reference rows, in order, for which no row matches.
+  """
+  free_form_fields = [
+      field for field in compare_fields if field in (free_form_fields or [])
+  ]
+  exact_fields = [
+      field for field in compare_fields if field not in free_form_fields
+  ]
+
+  def exact_key(row: sqlite_schema_utils.RowType) -> tuple[Any, ...]:
+    return tuple(getattr(row, field) for field in exact_fields)
+
+  index = {}
+  for row in rows:
+    index.setdefault(exact_key(row), []).append(row)
+
+  unmatched = []
+  for reference_row in reference_rows:
+    if not any(
+        all(
+            fuzzy_match_lib.fuzzy_match(
+                getattr(reference_row, field), getattr(row, field)
+            )
+            for field in free_form_fields
+        )
+        for row in index.get(exact_key(reference_row), [])
+    ):
+      unmatched.append(reference_row)
+  return unmatched
+
+
 def validate_rows_removal_integrity(
     before: list[sqlite_schema_utils.RowType],
     after: list[sqlite_schema_utils.RowType],
@@ -93,25 +209,21 @@ def validate_rows_removal_integrity(
     maintained; False if any specified rows are not removed, if any
     non-specified rows are missing, or if new rows have been added.
   """
+  ids = set(ids)
+  before_ids = {getattr(row, id_name) for row in before}
   for row_id in ids:
-    if not any(row for row in before if getattr(row, id_name) == row_id):
+    if row_id not in before_ids:
       raise ValueError(f"row ID {row_id} not present in before.")
 
-  # Validate the removal and intactness of other rows
+  diff = diff_rows(before, after, id_name)
+  if diff.added or diff.modified:
+    # New rows were added, or rows were changed rather than removed.
+    return False
+  removed = {id(row) for row in diff.removed}
   for row in before:
-    # If the row ID is in the list of removed row IDs
-    if getattr(row, id_name) in ids:
-      if row in after:
-        return False
-    elif row not in after:
-      # Make sure we didn't remove other rows.
-      return False
-
-  # Check that no new unexpected rows have been added
-  for row in after:
-    if row not in before:
+    if (getattr(row, id_name) in ids) != (id(row) in removed):
+      # A specified row remains, or another row was removed.
       return False
-
   return True
 
 
@@ -143,32 +255,16 @@ def validate_rows_addition_integrity(
   """
   if not compare_fields:
     raise ValueError("compare_fields must not be empty.")
-  if not free_form_fields:
-    free_form_fields = []
-
-  def db_row_matches_reference(
-      reference_row: sqlite_schema_utils.RowType,
-      row: sqlite_schema_utils.RowType,
-  ) -> bool:
-    for field in compare_fields:
-      reference_value = getattr(reference_row, field)
-      candidate_value = getattr(row, field)
-      # Fuzzy match for text fields.
-      if field in free_form_fields:
-        if not fuzzy_match_lib.fuzzy_match(reference_value, candidate_value):
-          return False
-      else:
-        if reference_value != candidate_value:
-          return False
-    return True
 
   # Check if the added rows are present in the 'after' state
-  for reference_row in reference_rows:
-    if not any(db_row_matches_reference(reference_row, row) for row in after):
-      logging.warning(
-          "Expected row %s not found in the 'after' state.", reference_row
-      )
-      return False
+  unmatched = find_unmatched_rows(
+      reference_rows, after, compare_fields, free_form_fields
+  )
+  if unmatched:
+    logging.warning(
+        "Expected row %s not found in the 'after' state.", unmatched[0]
+    )
+    return False
 
   if len(after) != len(before) + len(reference_rows):
     logging.warning(
@@ -181,13 +277,13 @@ def validate_rows_addition_integrity(
     return False
 
   # Validate that no other rows were altered or removed during the addition
-  for row in before:
-    if row not in after:
-      logging.warning(
-          "row %s from 'before' state missing or altered in the 'after' state.",
-          row,
-      )
-      return False
+  diff = diff_rows(before, after)
+  if diff.removed:
+    logging.warning(
+        "row %s from 'before' state missing or altered in the 'after' state.",
+        diff.removed[0],
+    )
+    return False
 
   return True
 
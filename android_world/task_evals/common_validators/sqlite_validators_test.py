@@ -12,13 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dataclasses
 import sqlite3
+from unittest import mock
 from absl.testing import absltest
 from android_world.task_evals.common_validators import sqlite_validators
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_test_utils
 from android_world.task_evals.utils import sqlite_utils
 from android_world.utils import datetime_utils
+from android_world.utils import fuzzy_match_lib
 
 
 def remove_event_by_event_id(db_path: str, event_id: int):
@@ -423,6 +426,85 @@ class TestAddEvent(absltest.TestCase):
     )
 
 
+class DiffRowsTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.rows = [
+        sqlite_schema_utils.CalendarEvent(0, 60, f'Event {i}', id=i)
+        for i in range(5)
+    ]
+
+  def test_no_changes(self):
+    diff = sqlite_validators.diff_rows(self.rows, list(reversed(self.rows)))
+
+    self.assertTrue(diff.is_empty)
+
+  def test_added_and_removed(self):
+    new_row = sqlite_schema_utils.CalendarEvent(0, 60, 'New', id=5)
+
+    diff = sqlite_validators.diff_rows(self.rows, self.rows[1:] + [new_row])
+
+    self.assertEqual(diff.added, [new_row])
+    self.assertEqual(diff.removed, [self.rows[0]])
+    self.assertEmpty(diff.modified)
+
+  def test_modified_rows_are_paired_by_id(self):
+    changed = dataclasses.replace(self.rows[2], title='Changed')
+    after = self.rows[:2] + [changed] + self.rows[3:]
+
+    diff = sqlite_validators.diff_rows(self.rows, after, 'id')
+
+    self.assertEmpty(diff.added)
+    self.assertEmpty(diff.removed)
+    self.assertEqual(diff.modified, [(self.rows[2], changed)])
+
+  def test_without_id_modifications_are_additions_and_removals(self):
+    changed = dataclasses.replace(self.rows[2], title='Changed')
+
+    diff = sqlite_validators.diff_rows(self.rows, self.rows[:2] + [changed])
+
+    self.assertEqual(diff.added, [changed])
+    self.assertEqual(diff.removed, self.rows[2:])
+
+
+class FindUnmatchedRowsTest(absltest.TestCase):
+
+  def test_fuzzy_matches_free_form_fields(self):
+    rows = [
+        sqlite_schema_utils.CalendarEvent(0, 60, 'Coffee with Alex', id=1),
+        sqlite_schema_utils.CalendarEvent(0, 120, 'Lunch', id=2),
+    ]
+    references = [
+        sqlite_schema_utils.CalendarEvent(0, 60, 'coffee with alex'),
+        sqlite_schema_utils.CalendarEvent(0, 60, 'Lunch'),
+    ]
+
+    unmatched = sqlite_validators.find_unmatched_rows(
+        references, rows, ['start_ts', 'end_ts', 'title'], ['title']
+    )
+
+    # Lunch matches on title, but not on the exact end time.
+    self.assertEqual(unmatched, references[1:])
+
+  def test_fuzzy_match_only_on_exact_candidates(self):
+    rows = [
+        sqlite_schema_utils.CalendarEvent(i, 60, f'Event {i}')
+        for i in range(100)
+    ]
+    reference = sqlite_schema_utils.CalendarEvent(7, 60, 'event 7')
+
+    with mock.patch.object(
+        fuzzy_match_lib, 'fuzzy_match', wraps=fuzzy_match_lib.fuzzy_match
+    ) as fuzzy_match:
+      unmatched = sqlite_validators.find_unmatched_rows(
+          [reference], rows, ['start_ts', 'title'], ['title']
+      )
+
+    self.assertEmpty(unmatched)
+    fuzzy_match.assert_called_once_with('event 7', 'Event 7')
+
+
 class TestVerifyPlaylist(absltest.TestCase):
 
   def setUp(self):
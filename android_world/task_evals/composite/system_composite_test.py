@@ -25,8 +25,8 @@ class TurnOnWifiAndOpenAppTest(absltest.TestCase):
 
   def setUp(self):
     super().setUp()
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, "restore_snapshot").start()
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, "restore_snapshots").start()
     )
 
   def test_generate_random_params(self):
@@ -93,8 +93,8 @@ class TurnOffWifiAndTurnOnBluetoothTest(absltest.TestCase):
 
   def setUp(self):
     super().setUp()
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, "restore_snapshot")
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, "restore_snapshots")
     )
 
   def test_is_successful_returns_0_if_wifi_is_on_and_bluetooth_is_off(self):
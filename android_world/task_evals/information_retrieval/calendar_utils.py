@@ -26,6 +26,7 @@ from android_world.task_evals.information_retrieval.proto import task_pb2
 from android_world.task_evals.single.calendar import calendar_utils as utils
 from android_world.task_evals.single.calendar import events_generator
 from android_world.task_evals.utils import sqlite_schema_utils
+from android_world.task_evals.utils import sqlite_utils
 from android_world.utils import datetime_utils
 
 TIME_FORMAT = '%H:%M'
@@ -146,13 +147,16 @@ def setup_task_state(
       events.
     env: The android environment instance.
   """
-  utils.clear_calendar_db(env)
   events = []
   for event in relevant_state.events:
     events.append(create_event_from_proto(event))
   events += [generate_random_event(exclusion_conditions) for _ in range(75)]
   random.shuffle(events)
-  utils.add_events(events, env)
+  with sqlite_utils.remote_sqlite_session(
+      utils.DB_PATH, utils.APP_NAME, env
+  ) as conn:
+    conn.execute(f'DELETE FROM {utils.EVENTS_TABLE}')
+    sqlite_utils.insert_rows(conn, events, utils.DB_KEY, utils.EVENTS_TABLE)
 
 
 def generate_random_event(
@@ -14,26 +14,27 @@
 
 """Utils for Joplin app."""
 
-import os
 import random
+import sqlite3
 
-from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.task_evals.information_retrieval import proto_utils
 from android_world.task_evals.information_retrieval.proto import state_pb2
 from android_world.task_evals.information_retrieval.proto import task_pb2
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_utils
-from android_world.utils import file_utils
 
 _NOTES_TABLE = "notes"
 _NOTES_NORMALIZED_TABLE = "notes_normalized"
 _FOLDER_TABLE = "folders"
 _DB_PATH = "/data/data/net.cozic.joplin/databases/joplin.sqlite"
 _APP_NAME = "joplin"
+_TABLES = (_FOLDER_TABLE, _NOTES_TABLE, _NOTES_NORMALIZED_TABLE)
 # Sometimes this field gets added to the Joplin db, but we do not need it.
 _EXCLUDE_FIELD = "deleted_time"
 
+sqlite_utils.set_backend(_APP_NAME, sqlite_utils.REMOTE_SQL)
+
 
 def setup_task_state(
     relevant_state: state_pb2.NotesApp,
@@ -48,51 +49,53 @@ def setup_task_state(
       notes.
     env: The Android environment interface for database interaction.
   """
-  clear_dbs(env)
-  notes = []
+  _create_tables_if_missing(env)
+  # All changes are made to one copy of the database, pushed back at the end.
+  with sqlite_utils.remote_sqlite_session(_DB_PATH, _APP_NAME, env) as conn:
+    _clear_tables(conn)
+    notes = []
 
-  # Keep track of already created folders.
-  folder_mapping = {}
-  notes += _generate_random_notes(
-      100,
-      exclusion_conditions,
-      [note.folder for note in relevant_state.notes],
-      folder_mapping,
-      env,
-  )
-  for note in relevant_state.notes:
-    notes.append(_create_note_from_proto(note, folder_mapping, env))
-  random.shuffle(notes)
-  add_notes(notes, env)
+    # Keep track of already created folders.
+    folder_mapping = {}
+    notes += _generate_random_notes(
+        100,
+        exclusion_conditions,
+        [note.folder for note in relevant_state.notes],
+        folder_mapping,
+        conn,
+    )
+    for note in relevant_state.notes:
+      notes.append(_create_note_from_proto(note, folder_mapping, conn))
+    random.shuffle(notes)
+    _insert_notes(notes, conn)
 
 
 def clear_dbs(env: interface.AsyncEnv) -> None:
   """Clears Joplin databases."""
-  sqlite_utils.delete_all_rows_from_table(
-      _FOLDER_TABLE, _DB_PATH, env, _APP_NAME
-  )
-  sqlite_utils.delete_all_rows_from_table(
-      _NOTES_TABLE, _DB_PATH, env, _APP_NAME
-  )
-  sqlite_utils.delete_all_rows_from_table(
+  sqlite_utils.delete_all_rows_from_tables(_TABLES, _DB_PATH, env, _APP_NAME)
+
+
+def _create_tables_if_missing(env: interface.AsyncEnv) -> None:
+  # Joplin creates all of its tables together when it is first opened.
+  sqlite_utils.launch_app_if_table_missing(
       _NOTES_NORMALIZED_TABLE, _DB_PATH, env, _APP_NAME
   )
-  adb_utils.close_app(_APP_NAME, env.controller)  # Register changes.
+
+
+def _clear_tables(conn: sqlite3.Connection) -> None:
+  for table in _TABLES:
+    conn.execute(f"DELETE FROM {table}")
 
 
 def _get_folder_to_id(
-    env: interface.AsyncEnv,
+    conn: sqlite3.Connection,
 ) -> dict[str, str]:
   """Gets a mapping from folder title to ID as represented in Folder table."""
-  with env.controller.pull_file(_DB_PATH) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(_DB_PATH)[1]
-    )
-    folder_info = sqlite_utils.execute_query(
-        f"select * from {_FOLDER_TABLE};",
-        local_db_path,
-        sqlite_schema_utils.JoplinFolder,
-    )
+  folder_info = sqlite_utils.fetch_rows(
+      conn,
+      f"select * from {_FOLDER_TABLE};",
+      sqlite_schema_utils.JoplinFolder,
+  )
 
   result = {}
   for row in folder_info:
@@ -102,23 +105,15 @@ def _get_folder_to_id(
 
 def _add_folders(
     rows: list[sqlite_schema_utils.JoplinFolder],
-    env: interface.AsyncEnv,
+    conn: sqlite3.Connection,
 ) -> None:
-  """Inserts multiple folder rows into the remote Joplin database.
+  """Inserts multiple folder rows into the Joplin database.
 
   Args:
       rows: A list of JoplinFolder instances to be inserted.
-      env: The Android environment interface for database interaction.
+      conn: A connection to the Joplin database.
   """
-
-  sqlite_utils.insert_rows_to_remote_db(
-      rows,
-      _EXCLUDE_FIELD,
-      _FOLDER_TABLE,
-      _DB_PATH,
-      _APP_NAME,
-      env,
-  )
+  sqlite_utils.insert_rows(conn, rows, _EXCLUDE_FIELD, _FOLDER_TABLE)
 
 
 def create_note(
@@ -130,15 +125,31 @@ def create_note(
     is_todo: int = False,
     todo_completed: bool = False,
 ) -> sqlite_schema_utils.JoplinNote:
-  """Generates random note."""
+  """Generates random note, creating its folder on the device if needed."""
+  with sqlite_utils.remote_sqlite_session(_DB_PATH, _APP_NAME, env) as conn:
+    return _create_note(
+        folder, title, body, folder_mapping, conn, is_todo, todo_completed
+    )
+
+
+def _create_note(
+    folder: str,
+    title: str,
+    body: str,
+    folder_mapping: dict[str, str],
+    conn: sqlite3.Connection,
+    is_todo: int = False,
+    todo_completed: bool = False,
+) -> sqlite_schema_utils.JoplinNote:
+  """Generates random note, creating its folder if needed."""
   if not folder_mapping:
-    folder_mapping.update(_get_folder_to_id(env))
+    folder_mapping.update(_get_folder_to_id(conn))
 
   if folder not in folder_mapping:
     # Folder hasn't been created yet.
-    _add_folders([sqlite_schema_utils.JoplinFolder(folder)], env)
+    _add_folders([sqlite_schema_utils.JoplinFolder(folder)], conn)
     folder_mapping.clear()
-    folder_mapping.update(_get_folder_to_id(env))
+    folder_mapping.update(_get_folder_to_id(conn))
     if folder not in folder_mapping:
       raise ValueError("Something went wrong could not find or create folder.")
   parent_id = folder_mapping[folder]
@@ -156,21 +167,17 @@ def add_notes(
     env: interface.AsyncEnv,
 ) -> None:
   """Inserts multiple note rows into the remote Joplin database."""
-  sqlite_utils.insert_rows_to_remote_db(
-      rows,
-      None,
-      _NOTES_TABLE,
-      _DB_PATH,
-      _APP_NAME,
-      env,
-  )
-  sqlite_utils.insert_rows_to_remote_db(
-      _normalize_notes(rows),
-      None,
-      _NOTES_NORMALIZED_TABLE,
-      _DB_PATH,
-      _APP_NAME,
-      env,
+  with sqlite_utils.remote_sqlite_session(_DB_PATH, _APP_NAME, env) as conn:
+    _insert_notes(rows, conn)
+
+
+def _insert_notes(
+    rows: list[sqlite_schema_utils.JoplinNote],
+    conn: sqlite3.Connection,
+) -> None:
+  sqlite_utils.insert_rows(conn, rows, None, _NOTES_TABLE)
+  sqlite_utils.insert_rows(
+      conn, _normalize_notes(rows), None, _NOTES_NORMALIZED_TABLE
   )
 
 
@@ -211,17 +218,17 @@ def list_notes(
 def _create_note_from_proto(
     note: state_pb2.Note,
     folder_mapping: dict[str, str],
-    env: interface.AsyncEnv,
+    conn: sqlite3.Connection,
 ) -> sqlite_schema_utils.JoplinNote:
   """Creates a JoplinNote object from a state_pb2.Note proto."""
   is_todo = note.is_todo.lower() == "true"
   todo_completed = note.todo_completed.lower() == "true"
-  return create_note(
+  return _create_note(
       note.folder,
       note.title,
       note.body,
       folder_mapping,
-      env,
+      conn,
       is_todo,
       todo_completed,
   )
@@ -232,13 +239,13 @@ def _generate_random_notes(
     exclusion_conditions: list[task_pb2.ExclusionCondition],
     relevant_folders: list[str],
     folder_mapping: dict[str, str],
-    env: interface.AsyncEnv,
+    conn: sqlite3.Connection,
 ) -> list[sqlite_schema_utils.JoplinNote]:
   """Generates random notes with the given exclusion conditions."""
   return sqlite_schema_utils.get_random_items(
       num_notes,
       generate_item_fn=lambda: _generate_random_note(
-          relevant_folders, folder_mapping, env
+          relevant_folders, folder_mapping, conn
       ),
       filter_fn=lambda x: _check_note_conditions(
           x, exclusion_conditions, folder_mapping
@@ -249,7 +256,7 @@ def _generate_random_notes(
 def _generate_random_note(
     relevant_folders: list[str],
     folder_mapping: dict[str, str],
-    env: interface.AsyncEnv,
+    conn: sqlite3.Connection,
 ):
   """Generates a single random sqlite_schema_utils.JoplinNote object."""
   new_note = state_pb2.Note()
@@ -269,7 +276,7 @@ def _generate_random_note(
 
   new_note.title = random_note["title"]
   new_note.body = random_note["body"]
-  note = _create_note_from_proto(new_note, folder_mapping, env)
+  note = _create_note_from_proto(new_note, folder_mapping, conn)
   return note
 
 
@@ -0,0 +1,136 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from unittest import mock
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.env import interface
+from android_world.task_evals.information_retrieval import joplin_app_utils
+from android_world.task_evals.utils import sqlite_utils
+from android_world.utils import fake_adb_responses
+from android_world.utils import file_test_utils
+
+
+def _create_db(db_path: str) -> None:
+  conn = sqlite3.connect(db_path)
+  for table in ('folders', 'notes', 'notes_normalized'):
+    conn.execute(f'CREATE TABLE {table} (id TEXT, title TEXT)')
+    conn.execute(f"INSERT INTO {table} VALUES ('1', 'Title')")
+  conn.commit()
+  conn.close()
+
+
+def _count_rows(db_path: str) -> dict[str, int]:
+  conn = sqlite3.connect(db_path)
+  try:
+    return {
+        table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        for table in ('folders', 'notes', 'notes_normalized')
+    }
+  finally:
+    conn.close()
+
+
+class ClearDbsTest(parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    db_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, db_dir)
+    self.db_path = os.path.join(db_dir, 'joplin.db')
+    self.enter_context(
+        mock.patch.object(joplin_app_utils, '_DB_PATH', self.db_path)
+    )
+    self.env = mock.create_autospec(interface.AsyncEnv)
+    self.env.controller = mock.create_autospec(
+        android_world_controller.AndroidWorldController
+    )
+    self.env.controller.pull_file.side_effect = (
+        lambda path, timeout_sec=None, sqlite_files_only=False: (
+            file_test_utils.mock_tmp_sqlite_from_device(path, None, timeout_sec)
+        )
+    )
+    self.env.controller.push_file.side_effect = (
+        lambda local, remote, timeout_sec: (
+            file_test_utils.mock_copy_data_to_device(local, remote, None)
+        )
+    )
+    self.mock_launch_app = self.enter_context(
+        mock.patch.object(adb_utils, 'launch_app', autospec=True)
+    )
+    self.enter_context(mock.patch.object(adb_utils, 'close_app', autospec=True))
+    self.enter_context(mock.patch.object(time, 'sleep'))
+    self.enter_context(
+        mock.patch.object(adb_utils, 'set_root_if_needed', autospec=True)
+    )
+    self.mock_issue_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'issue_generic_request',
+            side_effect=fake_adb_responses.run_generic_request_locally,
+        )
+    )
+    self.enter_context(mock.patch.dict(sqlite_utils._backends))
+
+  def test_clears_tables_on_device(self):
+    _create_db(self.db_path)
+
+    joplin_app_utils.clear_dbs(self.env)
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.env.controller.push_file.assert_not_called()
+    self.assertEqual(
+        _count_rows(self.db_path),
+        {'folders': 0, 'notes': 0, 'notes_normalized': 0},
+    )
+
+  @parameterized.parameters(sqlite_utils.REMOTE_SQL, sqlite_utils.PULL_PUSH)
+  def test_clears_tables(self, backend):
+    sqlite_utils.set_backend('joplin', backend)
+    _create_db(self.db_path)
+
+    joplin_app_utils.clear_dbs(self.env)
+
+    self.mock_launch_app.assert_not_called()
+    self.assertEqual(
+        _count_rows(self.db_path),
+        {'folders': 0, 'notes': 0, 'notes_normalized': 0},
+    )
+
+  @parameterized.parameters(sqlite_utils.REMOTE_SQL, sqlite_utils.PULL_PUSH)
+  def test_launches_app_to_create_missing_database(self, backend):
+    sqlite_utils.set_backend('joplin', backend)
+    self.mock_launch_app.side_effect = lambda *_: _create_db(self.db_path)
+
+    joplin_app_utils.clear_dbs(self.env)
+
+    self.mock_launch_app.assert_called_once_with(
+        'joplin', self.env.controller
+    )
+    self.assertEqual(
+        _count_rows(self.db_path),
+        {'folders': 0, 'notes': 0, 'notes_normalized': 0},
+    )
+
+
+if __name__ == '__main__':
+  absltest.main()
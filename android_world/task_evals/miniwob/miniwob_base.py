@@ -19,11 +19,14 @@ import time
 
 from android_env import env_interface
 from android_world.env import adb_utils
+from android_world.env import conditions
 from android_world.env import interface
 from android_world.task_evals import task_eval
 
 _APP_NAME = "com.google.androidenv.miniwob"
 _MAIN_ACTIVITY = f"{_APP_NAME}/{_APP_NAME}.app.MainActivity"
+# Time for the app to load a task's config before it is reset.
+_CONFIG_LOAD_SECS = 1.0
 
 
 def _extract_data(
@@ -121,12 +124,18 @@ class MiniWoBTask(task_eval.TaskEval, abc.ABC):
     super().initialize_task(env)
     task_name = self.params["task_name"]
     task_config = f'{{"task":"{task_name}"}}'
+    config_sent = time.monotonic()
     adb_utils.start_activity(
         _MAIN_ACTIVITY,
         ["--es", "RL_TASK_APP_CONFIG", f"'{task_config}'"],
         env.controller,
     )
-    time.sleep(1)
+    env.wait_until(
+        conditions.activity_is(_MAIN_ACTIVITY, env.controller), timeout=1.0
+    )
+    # The activity is usually in the foreground already, from a previous task,
+    # and nothing signals that the config has loaded, so allow it some time.
+    time.sleep(max(0.0, _CONFIG_LOAD_SECS - (time.monotonic() - config_sent)))
     # Reset and start the task.
     adb_utils.start_activity(
         _MAIN_ACTIVITY, ["--ez", "reset", "true"], env.controller
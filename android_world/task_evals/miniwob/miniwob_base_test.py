@@ -143,6 +143,16 @@ class TestMiniWoBTask(absltest.TestCase):
     self.assertIn("utterance", self.mock_task.params)
     self.assertEqual(self.mock_task.params["utterance"], "test utterance")
 
+  def test_initialize_task_waits_for_config_to_load(
+      self, unused_mock_get_utterance, mock_sleep, unused_mock_start_activity
+  ):
+    self.mock_task.initialize_task(self.mock_env)
+
+    mock_sleep.assert_called_once()
+    self.assertBetween(
+        mock_sleep.call_args.args[0], 0.5, miniwob_base._CONFIG_LOAD_SECS
+    )
+
   @mock.patch.object(miniwob_base, "get_episode_reward")
   def test_is_successful(
       self,
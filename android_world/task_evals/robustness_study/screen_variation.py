@@ -63,6 +63,7 @@ def generate_screen_variation_wrapper(
       # Task starts from the home screen and the following orientation change
       # will take effect for the next app opened but expired after closing.
       adb_utils.change_orientation(self.orientation, env.controller)
+      env.invalidate_geometry_cache()
 
     @property
     def name(self) -> str:
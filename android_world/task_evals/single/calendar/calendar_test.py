@@ -69,8 +69,8 @@ class CalendarEventTestSetup(parameterized.TestCase):
     self.mock_clear_db = mock.patch.object(
         sqlite_validators.SQLiteApp, "_clear_db"
     ).start()
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, "restore_snapshot")
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, "restore_snapshots")
     )
 
   def tearDown(self):
@@ -25,6 +25,9 @@ from android_world.utils import datetime_utils
 DB_PATH = '/data/data/com.simplemobiletools.calendar.pro/databases/events.db'
 EVENTS_TABLE = 'events'  # Table in events.db.
 DB_KEY = 'id'
+APP_NAME = 'simple calendar pro'
+
+sqlite_utils.set_backend(APP_NAME, sqlite_utils.REMOTE_SQL)
 
 
 def clear_calendar_db(
@@ -32,7 +35,7 @@ def clear_calendar_db(
 ) -> None:
   """Removes the calendar database on the device."""
   sqlite_utils.delete_all_rows_from_table(
-      EVENTS_TABLE, DB_PATH, env, 'simple calendar pro'
+      EVENTS_TABLE, DB_PATH, env, APP_NAME
   )
   try:
     sqlite_utils.get_rows_from_remote_device(
@@ -69,7 +72,7 @@ def add_events(
       DB_KEY,
       EVENTS_TABLE,
       DB_PATH,
-      'simple calendar pro',
+      APP_NAME,
       env,
       timeout_sec,
   )
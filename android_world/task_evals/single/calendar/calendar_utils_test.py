@@ -12,9 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dataclasses
+import os
+import shutil
+from unittest import mock
+
 from absl.testing import absltest
 from absl.testing import parameterized
+from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.env import interface
 from android_world.task_evals.single.calendar import calendar_utils
+from android_world.task_evals.utils import sqlite_schema_utils
+from android_world.task_evals.utils import sqlite_test_utils
+from android_world.task_evals.utils import sqlite_utils
+from android_world.utils import fake_adb_responses
+from android_world.utils import file_test_utils
 
 
 class TestTimestampToLocalDatetime(parameterized.TestCase):
@@ -35,5 +48,63 @@ class TestTimestampToLocalDatetime(parameterized.TestCase):
     self.assertEqual(result, expected, f'Test failed for {name}')
 
 
+class CalendarDbTest(absltest.TestCase):
+  """Seeds and clears the calendar through the on-device SQL backend."""
+
+  def setUp(self):
+    super().setUp()
+    self.db_path = sqlite_test_utils.setup_test_db()
+    self.addCleanup(shutil.rmtree, os.path.dirname(self.db_path))
+    self.enter_context(
+        mock.patch.object(calendar_utils, 'DB_PATH', self.db_path)
+    )
+    self.env = mock.create_autospec(interface.AsyncEnv)
+    self.env.controller = mock.create_autospec(
+        android_world_controller.AndroidWorldController
+    )
+    self.env.controller.pull_file.side_effect = (
+        lambda path, timeout_sec=None, sqlite_files_only=False: (
+            file_test_utils.mock_tmp_sqlite_from_device(path, None, timeout_sec)
+        )
+    )
+    self.mock_issue_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'issue_generic_request',
+            side_effect=fake_adb_responses.run_generic_request_locally,
+        )
+    )
+    self.enter_context(mock.patch.object(adb_utils, 'close_app', autospec=True))
+
+  def _rows(self) -> list[sqlite_schema_utils.CalendarEvent]:
+    return sqlite_utils.execute_query(
+        'SELECT * FROM events;',
+        self.db_path,
+        sqlite_schema_utils.CalendarEvent,
+    )
+
+  def test_uses_remote_sql_backend(self):
+    self.assertEqual(
+        sqlite_utils.get_backend(calendar_utils.APP_NAME),
+        sqlite_utils.REMOTE_SQL,
+    )
+
+  def test_clear_and_add_events_on_device(self):
+    event = sqlite_schema_utils.CalendarEvent(
+        start_ts=1672707600, end_ts=1672714800, title="Bob's party"
+    )
+
+    calendar_utils.clear_calendar_db(self.env)
+    calendar_utils.add_events([event, event], self.env)
+
+    self.assertEqual(self.mock_issue_generic_request.call_count, 2)
+    self.env.controller.push_file.assert_not_called()
+    rows = self._rows()
+    self.assertEqual(
+        rows, [dataclasses.replace(event, id=row.id) for row in rows]
+    )
+    self.assertLen(rows, 2)
+
+
 if __name__ == '__main__':
   absltest.main()
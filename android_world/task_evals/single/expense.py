@@ -381,14 +381,14 @@ class ExpenseAddMultipleFromGallery(_ExpenseAddMultiple):
     data = _get_expense_rows_as_text(
         self.params[sqlite_validators.ROW_OBJECTS], 'text_block', wrap_width=60
     )
-    user_data_generation.write_to_gallery(data, 'expenses.jpg', env)
+    images = {'expenses.jpg': data}
     for i in range(10):
-      data = _get_expense_rows_as_text(
+      images[f'old_expenses_{i}.jpg'] = _get_expense_rows_as_text(
           self.params[sqlite_validators.NOISE_ROW_OBJECTS],
           'text_block',
           wrap_width=60,
       )
-      user_data_generation.write_to_gallery(data, f'old_expenses_{i}.jpg', env)
+    user_data_generation.write_images_to_gallery(images, env)
 
   def tear_down(self, env: interface.AsyncEnv):
     super().tear_down(env)
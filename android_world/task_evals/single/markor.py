@@ -562,23 +562,13 @@ class MarkorMergeNotes(Markor):
   def initialize_task(self, env: interface.AsyncEnv) -> None:
     super().initialize_task(env)
     self.create_file_task.initialize_task(env)
-    file_utils.create_file(
-        self.params["file1_name"],
-        device_constants.MARKOR_DATA,
-        env.controller,
-        content=self.params["file1_content"],
-    )
-    file_utils.create_file(
-        self.params["file2_name"],
-        device_constants.MARKOR_DATA,
-        env.controller,
-        content=self.params["file2_content"],
-    )
-    file_utils.create_file(
-        self.params["file3_name"],
+    file_utils.push_files(
+        {
+            self.params[f"file{i}_name"]: self.params[f"file{i}_content"] + "\n"
+            for i in range(1, 4)
+        },
         device_constants.MARKOR_DATA,
         env.controller,
-        content=self.params["file3_content"],
     )
 
   def tear_down(self, env: interface.AsyncEnv) -> None:
@@ -906,15 +896,9 @@ class MarkorTranscribeVideo(Markor):
         messages=self.params["messages"],
         message_display_time=8,
     )
-    for file in self.params["noise_files"]:
-      user_data_generation.write_video_file_to_device(
-          file,
-          device_constants.DOWNLOAD_DATA,
-          env,
-          messages=[user_data_generation.generate_random_string(10)],
-          fps=1,
-          message_display_time=random.randint(20, 180),
-      )
+    user_data_generation.write_random_video_files_to_device(
+        self.params["noise_files"], device_constants.DOWNLOAD_DATA, env
+    )
 
   def is_successful(self, env: interface.AsyncEnv) -> float:
     super().is_successful(env)
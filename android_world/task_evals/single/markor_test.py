@@ -244,7 +244,15 @@ class TestMarkorMergeNotes(test_utils.AdbEvalTestBase):
     self.mock_check_file_or_folder_exists.return_value = False
     task.initialize_task(async_env)
     self.assertIsNotNone(task.create_file_task)
-    self.assertEqual(self.mock_create_file.call_count, 3)
+    self.mock_push_files.assert_called_once_with(
+        {
+            'file1': 'file1 content.\n\n',
+            'file2': 'file2 content.\n\n',
+            'file3': 'file3 content.\n\n',
+        },
+        device_constants.MARKOR_DATA,
+        async_env.controller,
+    )
     self.assertDictEqual(
         task.create_file_task.params,
         {
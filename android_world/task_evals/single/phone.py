@@ -15,9 +15,9 @@
 """Tasks for making and receiving phone calls."""
 
 import random
-import time
 from typing import Any
 from android_world.env import adb_utils
+from android_world.env import conditions
 from android_world.env import device_constants
 from android_world.env import interface
 from android_world.task_evals.common_validators import phone_validators
@@ -96,7 +96,7 @@ class PhoneReturnMissedCall(phone_validators.MakeCall):
   def initialize_task(self, env: interface.AsyncEnv):
     super().initialize_task(env)
     adb_utils.call_emulator(env.controller, self.phone_number)
-    time.sleep(5)
+    env.wait_until(conditions.call_state_is('RINGING', env.controller))
     adb_utils.end_call_if_active(env.controller)
 
 
@@ -115,7 +115,7 @@ class PhoneRedialNumber(phone_validators.MakeCall):
   def initialize_task(self, env: interface.AsyncEnv):
     super().initialize_task(env)
     adb_utils.call_phone_number(env.controller, self.phone_number)
-    time.sleep(5)
+    env.wait_until(conditions.call_state_is('OFFHOOK', env.controller))
     adb_utils.end_call_if_active(env.controller)
 
 
@@ -138,8 +138,8 @@ class RecipeDeleteDuplicateRecipesTest(parameterized.TestCase):
     self.mock_clear_db = self.enter_context(
         mock.patch.object(sqlite_validators.SQLiteApp, '_clear_db')
     )
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, 'restore_snapshot')
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, 'restore_snapshots')
     )
 
     self.params = {
@@ -61,10 +61,10 @@ class SaveCopyOfReceiptTaskEvalTest(absltest.TestCase):
             ),
         )
     )
-    self.mock_restore_snapshot = self.enter_context(
+    self.mock_restore_snapshots = self.enter_context(
         mock.patch.object(
             app_snapshot,
-            "restore_snapshot",
+            "restore_snapshots",
         )
     )
     self.mock_setup_datetime = self.enter_context(
@@ -15,8 +15,8 @@
 """Tasks for Simple SMS Messenger."""
 
 import random
-import time
 from android_world.env import adb_utils
+from android_world.env import conditions
 from android_world.env import interface
 from android_world.env import tools
 from android_world.task_evals.common_validators import phone_validators
@@ -50,7 +50,7 @@ class SimpleSmsSendAfterCall(sms_validators.SimpleSMSSendSms):
     super().initialize_task(env)
     phone_validators.clear_phone_state(env.controller)
     adb_utils.call_emulator(env.controller, self.params["number"])
-    time.sleep(5.0)
+    env.wait_until(conditions.call_state_is("RINGING", env.controller))
     adb_utils.end_call_if_active(env.controller)
 
 
@@ -75,27 +75,18 @@ class SimpleSmsReplyMostRecent(sms_validators.SimpleSMSSendSms):
     # before running the task.
     adb_utils.disable_headsup_notifications(env.controller)
 
-    for _ in range(random.randint(0, 5)):
-      adb_utils.text_emulator(
-          env.controller,
-          user_data_generation.generate_random_number(),
-          self._generate_non_goal_message(),
-      )
-
-    # Texts don't necessarily come in the same order as sent here, so pause here
-    # to make sure the most recent text comes last.
-    time.sleep(5)
-
+    messages = [
+        sms_validators.ReceivedSms(
+            user_data_generation.generate_random_number(),
+            self._generate_non_goal_message(),
+        )
+        for _ in range(random.randint(0, 5))
+    ]
     most_recent_message = self._generate_non_goal_message()
-    adb_utils.text_emulator(
-        env.controller,
-        self.params["number"],
-        most_recent_message,
+    messages.append(
+        sms_validators.ReceivedSms(self.params["number"], most_recent_message)
     )
-
-    # Need to pause to make sure re-enabling notifications happens after the
-    # last text came in
-    time.sleep(5)
+    sms_validators.receive_messages(messages, env.controller)
 
     adb_utils.enable_headsup_notifications(env.controller)
 
@@ -123,35 +114,37 @@ class SimpleSmsReply(sms_validators.SimpleSMSSendSms):
     adb_utils.disable_headsup_notifications(env.controller)
 
     relevant_text_sent = False
+    messages = []
 
     # Add a random number of texts, with the text we care about randomly
     # interspersed.
     for _ in range(random.randint(1, 5)):
       if not relevant_text_sent:
         if random.choice([True, False]):
-          adb_utils.text_emulator(
-              env.controller,
-              self.params["number"],
-              random.choice(sms_validators.SimpleSMSSendSms.messages),
+          messages.append(
+              sms_validators.ReceivedSms(
+                  self.params["number"],
+                  random.choice(sms_validators.SimpleSMSSendSms.messages),
+              )
           )
           relevant_text_sent = True
 
-      adb_utils.text_emulator(
-          env.controller,
-          user_data_generation.generate_random_number(),
-          random.choice(sms_validators.SimpleSMSSendSms.messages),
+      messages.append(
+          sms_validators.ReceivedSms(
+              user_data_generation.generate_random_number(),
+              random.choice(sms_validators.SimpleSMSSendSms.messages),
+          )
       )
 
     if not relevant_text_sent:
-      adb_utils.text_emulator(
-          env.controller,
-          self.params["number"],
-          random.choice(sms_validators.SimpleSMSSendSms.messages),
+      messages.append(
+          sms_validators.ReceivedSms(
+              self.params["number"],
+              random.choice(sms_validators.SimpleSMSSendSms.messages),
+          )
       )
 
-    # Need to pause to make sure re-enabling notifications happens after the
-    # last text came in
-    time.sleep(0.5)
+    sms_validators.receive_messages(messages, env.controller)
     adb_utils.enable_headsup_notifications(env.controller)
 
 
@@ -218,24 +211,20 @@ class SimpleSmsSendReceivedAddress(sms_validators.SimpleSMSSendSms):
     super().initialize_task(env)
 
     name2_number = user_data_generation.generate_random_number()
-    contacts_utils.add_contact(
-        self.params["name1"], self.params["number"], env.controller
-    )
-    time.sleep(5.0)
-    contacts_utils.add_contact(
-        self.params["name2"], name2_number, env.controller
+    contacts_utils.add_contacts_bulk(
+        [
+            contacts_utils.Contact(self.params["name1"], self.params["number"]),
+            contacts_utils.Contact(self.params["name2"], name2_number),
+        ],
+        env.controller,
+        ui_fallback=True,
     )
 
     # Add text containing address from name2
-    adb_utils.text_emulator(
+    sms_validators.receive_messages(
+        [sms_validators.ReceivedSms(name2_number, self.params["message"])],
         env.controller,
-        name2_number,
-        self.params["message"],
     )
-
-    # Need to pause to make sure re-enabling notifications happens after the
-    # text came in
-    time.sleep(1)
     adb_utils.enable_headsup_notifications(env.controller)
 
   def tear_down(self, env: interface.AsyncEnv):
@@ -272,25 +261,25 @@ class SimpleSmsResend(sms_validators.SimpleSMSSendSms):
     adb_utils.disable_headsup_notifications(env.controller)
     super().initialize_task(env)
 
-    contacts_utils.add_contact(
-        self.params["name"], self.params["number"], env.controller
+    contacts_utils.add_contacts_bulk(
+        [contacts_utils.Contact(self.params["name"], self.params["number"])],
+        env.controller,
+        ui_fallback=True,
     )
-    time.sleep(3.0)
     controller.send_sms(self.params["number"], self.params["message"])
 
-    # Make sure conversation happens before the repeat message
-    time.sleep(3.0)
-
-    # Add text asking to repeat
-    adb_utils.text_emulator(
+    # Add text asking to repeat. It is dated after the message just sent, so
+    # the conversation lists it last.
+    sms_validators.receive_messages(
+        [
+            sms_validators.ReceivedSms(
+                self.params["number"],
+                "Sorry, there was a glitch, what was the last message you sent"
+                " me?",
+            )
+        ],
         env.controller,
-        self.params["number"],
-        "Sorry, there was a glitch, what was the last message you sent me?",
     )
-
-    # Need to pause to make sure re-enabling notifications happens after the
-    # text came in
-    time.sleep(1)
     adb_utils.enable_headsup_notifications(env.controller)
     self.before_messages = self.get_sent_messages(env.controller)
 
@@ -104,8 +104,8 @@ class TestSimpleSmsReplyMostRecent(test_utils.AdbEvalTestBase):
     self.mock_enable_notifications = mock.patch.object(
         adb_utils, 'enable_headsup_notifications'
     ).start()
-    self.mock_text_emulator = mock.patch.object(
-        adb_utils, 'text_emulator'
+    self.mock_receive_messages = mock.patch.object(
+        sms_validators, 'receive_messages'
     ).start()
 
     # Setup mocks
@@ -163,13 +163,16 @@ class TestSimpleSmsReplyMostRecent(test_utils.AdbEvalTestBase):
 
     task = sms.SimpleSmsReplyMostRecent(params)
     task.initialize_task(env)
-    self.mock_text_emulator.assert_has_calls([
-        mock.call(env.controller, self.random_number_1, self.message_1),
-        mock.call(env.controller, self.random_number_2, self.message_2),
-        mock.call(
-            env.controller, self.most_recent_number, self.most_recent_message
-        ),
-    ])
+    self.mock_receive_messages.assert_called_once_with(
+        [
+            sms_validators.ReceivedSms(self.random_number_1, self.message_1),
+            sms_validators.ReceivedSms(self.random_number_2, self.message_2),
+            sms_validators.ReceivedSms(
+                self.most_recent_number, self.most_recent_message
+            ),
+        ],
+        env.controller,
+    )
     self.mock_disable_notifications.assert_called_once()
     self.mock_enable_notifications.assert_called_once()
 
@@ -224,8 +227,8 @@ class TestSimpleSmsReply(test_utils.AdbEvalTestBase):
     self.mock_enable_notifications = mock.patch.object(
         adb_utils, 'enable_headsup_notifications'
     ).start()
-    self.mock_text_emulator = mock.patch.object(
-        adb_utils, 'text_emulator'
+    self.mock_receive_messages = mock.patch.object(
+        sms_validators, 'receive_messages'
     ).start()
 
     # Setup mocks
@@ -266,11 +269,16 @@ class TestSimpleSmsReply(test_utils.AdbEvalTestBase):
 
     task = sms.SimpleSmsReply(params)
     task.initialize_task(env)
-    self.mock_text_emulator.assert_has_calls([
-        mock.call(env.controller, self.random_number_1, self.message_1),
-        mock.call(env.controller, self.random_number_2, self.message_2),
-        mock.call(env.controller, self.relevant_number, self.relevant_message),
-    ])
+    self.mock_receive_messages.assert_called_once_with(
+        [
+            sms_validators.ReceivedSms(self.random_number_1, self.message_1),
+            sms_validators.ReceivedSms(self.random_number_2, self.message_2),
+            sms_validators.ReceivedSms(
+                self.relevant_number, self.relevant_message
+            ),
+        ],
+        env.controller,
+    )
     self.mock_disable_notifications.assert_called_once()
     self.mock_enable_notifications.assert_called_once()
 
@@ -395,8 +403,8 @@ class TestSimpleSmsSendReceivedAddress(test_utils.AdbEvalTestBase):
     ).start()
 
     # Mock controller methods
-    self.mock_add_contact = mock.patch.object(
-        contacts_utils, 'add_contact'
+    self.mock_add_contacts_bulk = mock.patch.object(
+        contacts_utils, 'add_contacts_bulk'
     ).start()
 
     # Mock adb_utils methods
@@ -406,8 +414,8 @@ class TestSimpleSmsSendReceivedAddress(test_utils.AdbEvalTestBase):
     self.mock_enable_notifications = mock.patch.object(
         adb_utils, 'enable_headsup_notifications'
     ).start()
-    self.mock_text_emulator = mock.patch.object(
-        adb_utils, 'text_emulator'
+    self.mock_receive_messages = mock.patch.object(
+        sms_validators, 'receive_messages'
     ).start()
     self.mock_delete_contacts = mock.patch.object(
         adb_utils, 'delete_contacts'
@@ -448,12 +456,17 @@ class TestSimpleSmsSendReceivedAddress(test_utils.AdbEvalTestBase):
     task.initialize_task(env)
     self.mock_disable_notifications.assert_called_once()
     self.mock_initialize_sms_task.assert_called_once()
-    self.mock_add_contact.assert_has_calls([
-        mock.call(name1, name1_number, env.controller),
-        mock.call(name2, self.random_number, env.controller),
-    ])
-    self.mock_text_emulator.assert_called_with(
-        env.controller, self.random_number, '100 Main Street'
+    self.mock_add_contacts_bulk.assert_called_once_with(
+        [
+            contacts_utils.Contact(name1, name1_number),
+            contacts_utils.Contact(name2, self.random_number),
+        ],
+        env.controller,
+        ui_fallback=True,
+    )
+    self.mock_receive_messages.assert_called_once_with(
+        [sms_validators.ReceivedSms(self.random_number, '100 Main Street')],
+        env.controller,
     )
     self.mock_enable_notifications.assert_called_once()
 
@@ -562,8 +575,8 @@ class TestMessagesResendTextMessage(test_utils.AdbEvalTestBase):
     ).start()
 
     # Mock controller methods
-    self.mock_add_contact = mock.patch.object(
-        contacts_utils, 'add_contact'
+    self.mock_add_contacts_bulk = mock.patch.object(
+        contacts_utils, 'add_contacts_bulk'
     ).start()
     self.mock_send_sms = mock.patch.object(
         tools.AndroidToolController, 'send_sms'
@@ -576,8 +589,8 @@ class TestMessagesResendTextMessage(test_utils.AdbEvalTestBase):
     self.mock_enable_notifications = mock.patch.object(
         adb_utils, 'enable_headsup_notifications'
     ).start()
-    self.mock_text_emulator = mock.patch.object(
-        adb_utils, 'text_emulator'
+    self.mock_receive_messages = mock.patch.object(
+        sms_validators, 'receive_messages'
     ).start()
     self.mock_delete_contacts = mock.patch.object(
         adb_utils, 'delete_contacts'
@@ -650,12 +663,17 @@ class TestMessagesResendTextMessage(test_utils.AdbEvalTestBase):
     task.initialize_task(env)
     self.mock_disable_notifications.assert_called_once()
     self.mock_initialize_sms_task.assert_called_once()
-    self.mock_add_contact.assert_called_with(name, number, env.controller)
+    self.mock_add_contacts_bulk.assert_called_once_with(
+        [contacts_utils.Contact(name, number)],
+        env.controller,
+        ui_fallback=True,
+    )
     # Check that initial message was sent
     self.mock_send_sms.assert_called_with(number, message)
     # Check that resend message was sent
-    self.mock_text_emulator.assert_called_with(
-        env.controller, number, self.glitch_message
+    self.mock_receive_messages.assert_called_once_with(
+        [sms_validators.ReceivedSms(number, self.glitch_message)],
+        env.controller,
     )
     self.mock_enable_notifications.assert_called_once()
 
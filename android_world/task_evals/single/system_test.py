@@ -25,8 +25,8 @@ class SystemWifiTurnOnTest(absltest.TestCase):
 
   def setUp(self):
     super().setUp()
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, 'restore_snapshot')
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, 'restore_snapshots')
     )
 
   def test_is_successful_returns_1_if_wifi_enabled(self):
@@ -54,8 +54,8 @@ class SystemWifiTurnOffTest(absltest.TestCase):
 
   def setUp(self):
     super().setUp()
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, 'restore_snapshot')
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, 'restore_snapshots')
     )
 
   def test_is_successful_returns_1_if_wifi_disabled(self):
@@ -148,8 +148,8 @@ class SystemTest(absltest.TestCase):
 
   def setUp(self):
     super().setUp()
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, 'restore_snapshot')
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, 'restore_snapshots')
     )
 
   def test_parse_component_name_normalizes_components(self):
@@ -60,7 +60,9 @@ def _get_playlist_file_info(
     env: interface.AsyncEnv,
 ) -> list[sqlite_schema_utils.PlaylistInfo]:
   """Executes join query to fetch playlist file info."""
-  with env.controller.pull_file(_DB_PATH, timeout_sec=3) as local_db_directory:
+  with env.controller.pull_file(
+      _DB_PATH, timeout_sec=3, sqlite_files_only=True
+  ) as local_db_directory:
     local_db_path = file_utils.convert_to_posix_path(
         local_db_directory, os.path.split(_DB_PATH)[1]
     )
@@ -113,24 +115,11 @@ class VlcCreatePlaylist(_VLC):
     )
 
   def setup_files(self, env: interface.AsyncEnv):
-    for file in self.params['files']:
-      user_data_generation.write_video_file_to_device(
-          file,
-          apps.VlcApp.videos_path,
-          env,
-          messages=[user_data_generation.generate_random_string(10)],
-          fps=1,
-          message_display_time=random.randint(20, 180),
-      )
-    for file in self.params['noise_files']:
-      user_data_generation.write_video_file_to_device(
-          file,
-          apps.VlcApp.videos_path,
-          env,
-          messages=[user_data_generation.generate_random_string(10)],
-          fps=1,
-          message_display_time=random.randint(20, 180),
-      )
+    user_data_generation.write_random_video_files_to_device(
+        self.params['files'] + self.params['noise_files'],
+        apps.VlcApp.videos_path,
+        env,
+    )
 
   def initialize_task(self, env: interface.AsyncEnv):
     super().initialize_task(env)
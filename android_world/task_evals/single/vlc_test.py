@@ -121,6 +121,13 @@ class VlcTestBase(parameterized.TestCase):
             side_effect=file_test_utils.mock_tmp_directory_from_device,
         )
     )
+    self.mock_pull_db = self.enter_context(
+        mock.patch.object(
+            file_utils,
+            'tmp_sqlite_from_device',
+            side_effect=file_test_utils.mock_tmp_sqlite_from_device,
+        )
+    )
     self.mock_copy_data_to_device = self.enter_context(
         mock.patch.object(
             file_utils,
@@ -128,8 +135,8 @@ class VlcTestBase(parameterized.TestCase):
             side_effect=file_test_utils.mock_copy_data_to_device,
         )
     )
-    self.mock_restore_snapshot = self.enter_context(
-        mock.patch.object(app_snapshot, 'restore_snapshot')
+    self.mock_restore_snapshots = self.enter_context(
+        mock.patch.object(app_snapshot, 'restore_snapshots')
     )
 
   def tearDown(self):
@@ -160,14 +167,11 @@ class VlcTaskEvalsTestBase(VlcTestBase):
 
   def setUp(self):
     super().setUp()
-    self.mock_write_video_file_to_device = self.enter_context(
+    self.mock_write_video_files_to_device = self.enter_context(
         mock.patch.object(
-            user_data_generation, 'write_video_file_to_device', autospec=True
-        )
-    )
-    self.mock_generate_random_string = self.enter_context(
-        mock.patch.object(
-            user_data_generation, 'generate_random_string', autospec=True
+            user_data_generation,
+            'write_random_video_files_to_device',
+            autospec=True,
         )
     )
     self.mock_remove_files = self.enter_context(
@@ -207,40 +211,14 @@ class VlcCreatePlaylist(VlcTaskEvalsTestBase):
         'files': ['test_media.mp4', 'test_media2.mp4'],
         'noise_files': ['noise_media.mp4'],
     }
-    self.mock_generate_random_string.side_effect = ['hello', 'world', 'test']
 
     instance = vlc.VlcCreatePlaylist(params)
     instance.initialize_task(self.env_mock)
 
-    expected_calls = [
-        mock.call(
-            'test_media.mp4',
-            apps.VlcApp.videos_path,
-            self.env_mock,
-            messages=['hello'],
-            fps=1,
-            message_display_time=mock.ANY,
-        ),
-        mock.call(
-            'test_media2.mp4',
-            apps.VlcApp.videos_path,
-            self.env_mock,
-            messages=['world'],
-            fps=1,
-            message_display_time=mock.ANY,
-        ),
-        mock.call(
-            'noise_media.mp4',
-            apps.VlcApp.videos_path,
-            self.env_mock,
-            messages=['test'],
-            fps=1,
-            message_display_time=mock.ANY,
-        ),
-    ]
-
-    self.mock_write_video_file_to_device.assert_has_calls(
-        expected_calls, any_order=False
+    self.mock_write_video_files_to_device.assert_called_once_with(
+        ['test_media.mp4', 'test_media2.mp4', 'noise_media.mp4'],
+        apps.VlcApp.videos_path,
+        self.env_mock,
     )
 
   @parameterized.named_parameters(
@@ -332,37 +310,21 @@ class TestCreateTwoPlaylists(VlcTaskEvalsTestBase):
         'files2': ['file3.mp3', 'file4.mp3'],
         'noise_files2': ['noise_file2.mp3'],
     }
-    self.mock_generate_random_string.side_effect = [
-        'random1',
-        'random2',
-        'noise1',
-        'random3',
-        'random4',
-        'noise2',
-    ]
-
     instance = vlc.VlcCreateTwoPlaylists(params)
     instance.initialize_task(self.env_mock)
 
-    expected_calls = [
+    self.mock_write_video_files_to_device.assert_has_calls([
         mock.call(
-            filename,
+            ['file1.mp3', 'file2.mp3', 'noise_file1.mp3'],
             apps.VlcApp.videos_path,
             self.env_mock,
-            messages=[mock.ANY],
-            fps=1,
-            message_display_time=mock.ANY,
-        )
-        for filename in [
-            'file1.mp3',
-            'file2.mp3',
-            'noise_file1.mp3',
-            'file3.mp3',
-            'file4.mp3',
-            'noise_file2.mp3',
-        ]
-    ]
-    self.mock_write_video_file_to_device.assert_has_calls(expected_calls)
+        ),
+        mock.call(
+            ['file3.mp3', 'file4.mp3', 'noise_file2.mp3'],
+            apps.VlcApp.videos_path,
+            self.env_mock,
+        ),
+    ])
 
   def test_is_successful(self):
     params = {
@@ -112,15 +112,28 @@ class TaskEval(abc.ABC):
     """Returns a random set of parameters for defining the task."""
 
   def _initialize_apps(self, env: interface.AsyncEnv) -> None:
+    # Don't need to restore snapshot for clipper app since it doesn't have
+    # any state.
+    app_names = [
+        app_name
+        for app_name in self.app_names
+        if app_name and app_name != "clipper"
+    ]
+    if not app_names:
+      return
+    # Apps whose data is unchanged since their snapshot don't need a restore.
+    try:
+      app_names = app_snapshot.changed_apps(app_names, env.controller)
+    except RuntimeError as error:
+      logging.warning("Failed to check app snapshots, restoring all: %s", error)
 
-    for app_name in self.app_names:
-      # Don't need to restore snapshot for clipper app since it doesn't have
-      # any state.
-      if app_name and app_name != "clipper":
-        try:
-          app_snapshot.restore_snapshot(app_name, env.controller)
-        except RuntimeError as error:
-          logging.warning("Skipping app snapshot loading : %s", error)
+    try:
+      result = app_snapshot.restore_snapshots(app_names, env.controller)
+    except RuntimeError as error:
+      logging.warning("Skipping app snapshot loading : %s", error)
+      return
+    for error in result.failures.values():
+      logging.warning("Skipping app snapshot loading : %s", error)
 
   @classmethod
   def set_device_time(cls, env: interface.AsyncEnv) -> None:
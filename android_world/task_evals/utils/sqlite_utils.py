@@ -14,15 +14,37 @@
 
 """Utility functions for interacting with SQLite database on an Android device."""
 
+from collections.abc import Iterator, Sequence
+import contextlib
+import math
 import os
+import shlex
 import sqlite3
 import time
-from typing import Optional, Type
+from typing import Any, Optional, Type
+import uuid
+
+from absl import logging
+from android_env.proto import adb_pb2
 from android_world.env import adb_utils
 from android_world.env import interface
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.utils import file_utils
 
+# Backends for writing rows to an app's databases; see `set_backend`.
+# Runs the statements with the device's sqlite3 binary, in a single adb call.
+REMOTE_SQL = "remote_sql"
+# Copies the database to the host, modifies it there and pushes it back.
+PULL_PUSH = "pull_push"
+
+_backends: dict[str, str] = {}
+
+# Longer SQL scripts are pushed to a file rather than passed on the command
+# line.
+_MAX_INLINE_SQL_LENGTH = 64 * 1024
+_REMOTE_SQL_SCRIPT_DIR = "/data/local/tmp"
+_NO_DATABASE = "no such database"
+
 
 def execute_query(
     query: str, db_path: str, row_type: Type[sqlite_schema_utils.RowType]
@@ -38,10 +60,32 @@ def execute_query(
       A list of tuples, each representing an row from the database.
   """
   conn = sqlite3.connect(db_path)
-  conn.row_factory = sqlite3.Row
+  try:
+    return fetch_rows(conn, query, row_type)
+  finally:
+    conn.close()
+
+
+def fetch_rows(
+    conn: sqlite3.Connection,
+    query: str,
+    row_type: Type[sqlite_schema_utils.RowType],
+    parameters: Sequence[Any] = (),
+) -> list[sqlite_schema_utils.RowType]:
+  """Retrieves the rows returned by a query on an open database.
+
+  Args:
+    conn: The database connection, e.g. from `remote_sqlite_session`.
+    query: The query to issue.
+    row_type: The object type that will be created for each retrieved row.
+    parameters: Values for the placeholders in the query.
+
+  Returns:
+    The rows, as `row_type` objects.
+  """
   cursor = conn.cursor()
-  raw_rows = cursor.execute(query).fetchall()
-  conn.close()
+  cursor.row_factory = sqlite3.Row
+  raw_rows = cursor.execute(query, parameters).fetchall()
 
   rows = []
   for row in raw_rows:
@@ -50,6 +94,82 @@ def execute_query(
   return rows
 
 
+def insert_rows(
+    conn: sqlite3.Connection,
+    rows: Sequence[sqlite_schema_utils.RowType],
+    exclude_key: str | None,
+    table_name: str,
+) -> None:
+  """Inserts rows into a table of an open database.
+
+  Args:
+    conn: The database connection, e.g. from `remote_sqlite_session`.
+    rows: The rows to insert.
+    exclude_key: Name of field to exclude adding to database. Typically an auto
+      incrementing key.
+    table_name: The name of the table to insert rows into.
+  """
+  for row in rows:
+    insert_command, values = sqlite_schema_utils.insert_into_db(
+        row, table_name, exclude_key
+    )
+    conn.execute(insert_command, values)
+
+
+@contextlib.contextmanager
+def remote_sqlite_session(
+    remote_db_file_path: str,
+    app_name: str,
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> Iterator[sqlite3.Connection]:
+  """Opens a local copy of a database on the device for several operations.
+
+  The database is pulled once on entry. On exit, if any rows were inserted,
+  updated or deleted, the changes are committed, the database is pushed back
+  once and the app is closed to register the changes. If the body raises, the
+  changes are discarded.
+
+  Example:
+  ~~~~~~~
+
+  with remote_sqlite_session(db_path, 'joplin', env) as conn:
+    conn.execute('DELETE FROM notes')
+    folders = fetch_rows(conn, 'SELECT * FROM folders', JoplinFolder)
+
+  Args:
+    remote_db_file_path: The path to the sqlite database on the device.
+    app_name: The name of the app that owns the database.
+    env: The environment.
+    timeout_sec: Timeout in seconds for the adb calls.
+
+  Yields:
+    A connection to the local copy of the database.
+
+  Raises:
+    FileNotFoundError: If the database does not exist.
+  """
+  with env.controller.pull_file(
+      remote_db_file_path, timeout_sec, sqlite_files_only=True
+  ) as local_db_directory:
+    local_db_path = file_utils.convert_to_posix_path(
+        local_db_directory, os.path.split(remote_db_file_path)[1]
+    )
+    conn = sqlite3.connect(local_db_path)
+    try:
+      yield conn
+      modified = conn.total_changes > 0
+      conn.commit()
+    finally:
+      conn.close()
+
+    if modified:
+      env.controller.push_file(local_db_path, remote_db_file_path, timeout_sec)
+      adb_utils.close_app(
+          app_name, env.controller
+      )  # Close app to register the changes.
+
+
 def get_rows_from_remote_device(
     table_name: str,
     remote_db_file_path: str,
@@ -82,7 +202,7 @@ def get_rows_from_remote_device(
     ValueError: If cannot query table.
   """
   with env.controller.pull_file(
-      remote_db_file_path, timeout_sec
+      remote_db_file_path, timeout_sec, sqlite_files_only=True
   ) as local_db_directory:
     local_db_path = file_utils.convert_to_posix_path(
         local_db_directory, os.path.split(remote_db_file_path)[1]
@@ -130,44 +250,239 @@ def table_exists(
     return False
 
 
-def delete_all_rows_from_table(
+def launch_app_if_table_missing(
     table_name: str,
     remote_db_file_path: str,
     env: interface.AsyncEnv,
     app_name: str,
-    timeout_sec: Optional[float] = None,
 ) -> None:
-  """Deletes all rows from a specified table in a SQLite database on a remote Android device.
+  """Opens the app if a table does not exist yet, so that the app creates it.
 
   Args:
-    table_name: Deletes all rows from the table.
+    table_name: The table that should exist.
     remote_db_file_path: The path to the sqlite database on the device.
     env: The environment.
     app_name: The name of the app that owns the database.
-    timeout_sec: Timeout in seconds.
   """
   if not table_exists(table_name, remote_db_file_path, env):
     # If the database was never created, opening the app may create it.
     adb_utils.launch_app(app_name, env.controller)
     time.sleep(7.0)
 
-  with env.controller.pull_file(
-      remote_db_file_path, timeout_sec
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(remote_db_file_path)[1]
+
+def set_backend(app_name: str, backend: str) -> None:
+  """Selects how rows are written to an app's databases.
+
+  Apps use `PULL_PUSH` unless they opt in to `REMOTE_SQL`, which is best done
+  where the app's database paths are defined. With `REMOTE_SQL`, if the device
+  can't run the statements, e.g. because it has no sqlite3 binary,
+  `PULL_PUSH` is used instead.
+
+  Args:
+    app_name: The name of the app that owns the databases.
+    backend: `REMOTE_SQL` or `PULL_PUSH`.
+  """
+  if backend not in (REMOTE_SQL, PULL_PUSH):
+    raise ValueError(f"Unknown backend: {backend}")
+  _backends[app_name] = backend
+
+
+def get_backend(app_name: str) -> str:
+  """Returns how rows are written to an app's databases; see `set_backend`."""
+  return _backends.get(app_name, PULL_PUSH)
+
+
+def sql_literal(value: Any) -> str:
+  """Returns the SQLite literal for a value, quoting and escaping strings."""
+  if value is None:
+    return "NULL"
+  if isinstance(value, bool):
+    return str(int(value))
+  if isinstance(value, int):
+    return str(value)
+  if isinstance(value, float):
+    if math.isnan(value):
+      return "NULL"
+    if math.isinf(value):
+      return "9e999" if value > 0 else "-9e999"
+    return repr(value)
+  if isinstance(value, bytes):
+    return f"X'{value.hex()}'"
+  escaped = str(value).replace("'", "''")
+  return f"'{escaped}'"
+
+
+def _bind(command: str, values: Sequence[Any]) -> str:
+  """Substitutes the values for the ? placeholders of a statement."""
+  parts = command.split("?")
+  if len(parts) != len(values) + 1:
+    raise ValueError(
+        f"Statement has {len(parts) - 1} placeholders for {len(values)}"
+        f" values: {command}"
     )
+  bound = [parts[0]]
+  for value, part in zip(values, parts[1:]):
+    bound.extend((sql_literal(value), part))
+  return "".join(bound)
 
-    conn = sqlite3.connect(local_db_path)
-    cursor = conn.cursor()
-    delete_command = f"DELETE FROM {table_name}"
-    cursor.execute(delete_command)
-    conn.commit()
-    conn.close()
-    env.controller.push_file(local_db_path, remote_db_file_path, timeout_sec)
-    adb_utils.close_app(
-        app_name, env.controller
-    )  # Close app to register the changes.
+
+def _execute_remote_sql(
+    statements: Sequence[str],
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    timeout_sec: Optional[float] = None,
+) -> adb_utils.ShellResult:
+  """Runs the statements in one transaction with the device's sqlite3.
+
+  Args:
+    statements: SQL statements, with all values inlined.
+    remote_db_file_path: The path to the database on the device.
+    env: The environment.
+    timeout_sec: Timeout in seconds for the adb calls.
+
+  Returns:
+    The result of the sqlite3 command.
+
+  Raises:
+    RuntimeError: If there is an adb communication error.
+  """
+  db = shlex.quote(remote_db_file_path)
+  script = "\n".join(["BEGIN;", *(f"{s};" for s in statements), "COMMIT;"])
+  sqlite_command = f"sqlite3 -bail -cmd '.timeout 5000' {db}"
+  script_path = None
+  if len(script) <= _MAX_INLINE_SQL_LENGTH:
+    sqlite_command += f" {shlex.quote(script)}"
+  else:
+    # Very long commands may exceed the adb shell limit.
+    script_path = f"{_REMOTE_SQL_SCRIPT_DIR}/sql_{uuid.uuid4().hex}.sql"
+    adb_utils.check_ok(
+        env.controller.execute_adb_call(
+            adb_pb2.AdbRequest(
+                push=adb_pb2.AdbRequest.Push(
+                    content=script.encode(), path=script_path
+                ),
+                timeout_sec=timeout_sec,
+            )
+        ),
+        f"Failed to push SQL script to {script_path}.",
+    )
+    sqlite_command += f" < {script_path}"
+  cleanup = f"rm -f {script_path}" if script_path else ":"
+  command = "\n".join([
+      # Don't let sqlite3 create a database the app doesn't own.
+      f"[ -f {db} ] || {{ {cleanup}; echo '{_NO_DATABASE}'; exit 1; }}",
+      f"{sqlite_command}; rc=$?",
+      cleanup,
+      # Journal files created here must stay writable by the app.
+      f'chown "$(stat -c %u:%g {db})" {db}-* 2>/dev/null',
+      f"restorecon {db}* 2>/dev/null",
+      "exit $rc",
+  ])
+  (result,) = adb_utils.issue_shell_batch(
+      [command], env.controller, timeout_sec
+  )
+  return result
+
+
+def _write_on_device(
+    statements: Sequence[str],
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    app_name: str,
+    timeout_sec: Optional[float] = None,
+    launch_app_if_missing: bool = False,
+) -> bool:
+  """Runs the statements on the device, returning whether they succeeded."""
+
+  def execute() -> adb_utils.ShellResult:
+    return _execute_remote_sql(
+        statements, remote_db_file_path, env, timeout_sec
+    )
+
+  try:
+    result = execute()
+    if not result.ok and _NO_DATABASE in result.output:
+      # The database may only be visible as root.
+      adb_utils.set_root_if_needed(env.controller, timeout_sec)
+      result = execute()
+    if (
+        not result.ok
+        and launch_app_if_missing
+        and (_NO_DATABASE in result.output or "no such table" in result.output)
+    ):
+      # If the database was never created, opening the app may create it.
+      adb_utils.launch_app(app_name, env.controller)
+      time.sleep(7.0)
+      result = execute()
+  except RuntimeError as e:
+    result = adb_utils.ShellResult(
+        command="sqlite3", exit_code=-1, output=str(e)
+    )
+  if not result.ok:
+    logging.warning(
+        "Failed to modify %s on device, copying it instead: %s",
+        remote_db_file_path,
+        result.output,
+    )
+  return result.ok
+
+
+def delete_all_rows_from_table(
+    table_name: str,
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    app_name: str,
+    timeout_sec: Optional[float] = None,
+) -> None:
+  """Deletes all rows from a specified table in a SQLite database on a remote Android device.
+
+  Args:
+    table_name: Deletes all rows from the table.
+    remote_db_file_path: The path to the sqlite database on the device.
+    env: The environment.
+    app_name: The name of the app that owns the database.
+    timeout_sec: Timeout in seconds.
+  """
+  delete_all_rows_from_tables(
+      [table_name], remote_db_file_path, env, app_name, timeout_sec
+  )
+
+
+def delete_all_rows_from_tables(
+    table_names: Sequence[str],
+    remote_db_file_path: str,
+    env: interface.AsyncEnv,
+    app_name: str,
+    timeout_sec: Optional[float] = None,
+) -> None:
+  """Deletes all rows from several tables of a database in one transaction.
+
+  Args:
+    table_names: Deletes all rows from these tables.
+    remote_db_file_path: The path to the sqlite database on the device.
+    env: The environment.
+    app_name: The name of the app that owns the database.
+    timeout_sec: Timeout in seconds.
+  """
+  delete_commands = [f"DELETE FROM {table_name}" for table_name in table_names]
+  if get_backend(app_name) == REMOTE_SQL and _write_on_device(
+      delete_commands,
+      remote_db_file_path,
+      env,
+      app_name,
+      timeout_sec,
+      launch_app_if_missing=True,
+  ):
+    adb_utils.close_app(app_name, env.controller)
+    return
+
+  for table_name in table_names:
+    launch_app_if_table_missing(table_name, remote_db_file_path, env, app_name)
+  with remote_sqlite_session(
+      remote_db_file_path, app_name, env, timeout_sec
+  ) as conn:
+    for delete_command in delete_commands:
+      conn.execute(delete_command)
 
 
 def insert_rows_to_remote_db(
@@ -191,22 +506,21 @@ def insert_rows_to_remote_db(
     env: The environment.
     timeout_sec: Optional timeout in seconds for the database copy operation.
   """
-  with env.controller.pull_file(
-      remote_db_file_path, timeout_sec
-  ) as local_db_directory:
-    local_db_path = file_utils.convert_to_posix_path(
-        local_db_directory, os.path.split(remote_db_file_path)[1]
-    )
-
-    conn = sqlite3.connect(local_db_path)
-    cursor = conn.cursor()
-    for row in rows:
-      insert_command, values = sqlite_schema_utils.insert_into_db(
-          row, table_name, exclude_key
-      )
-      cursor.execute(insert_command, values)
-    conn.commit()
-    conn.close()
-
-    env.controller.push_file(local_db_path, remote_db_file_path, timeout_sec)
+  inserts = [
+      sqlite_schema_utils.insert_into_db(row, table_name, exclude_key)
+      for row in rows
+  ]
+  if get_backend(app_name) == REMOTE_SQL and _write_on_device(
+      [_bind(command, values) for command, values in inserts],
+      remote_db_file_path,
+      env,
+      app_name,
+      timeout_sec,
+  ):
     adb_utils.close_app(app_name, env.controller)
+    return
+
+  with remote_sqlite_session(
+      remote_db_file_path, app_name, env, timeout_sec
+  ) as conn:
+    insert_rows(conn, rows, exclude_key, table_name)
@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import dataclasses
 import os
+import shutil
 import sqlite3
+import tempfile
 from unittest import mock
 
 from absl.testing import absltest
+from absl.testing import parameterized
 from android_env import env_interface
+from android_env.proto import adb_pb2
 from android_env.wrappers import a11y_grpc_wrapper
 from android_world.env import adb_utils
 from android_world.env import android_world_controller
@@ -25,6 +30,7 @@ from android_world.env import interface
 from android_world.task_evals.utils import sqlite_schema_utils
 from android_world.task_evals.utils import sqlite_test_utils
 from android_world.task_evals.utils import sqlite_utils
+from android_world.utils import fake_adb_responses
 from android_world.utils import file_test_utils
 from android_world.utils import file_utils
 
@@ -59,6 +65,13 @@ class SqliteUtilsTest(absltest.TestCase):
             side_effect=file_test_utils.mock_tmp_directory_from_device,
         )
     )
+    self.mock_pull_db = self.enter_context(
+        mock.patch.object(
+            file_utils,
+            'tmp_sqlite_from_device',
+            side_effect=file_test_utils.mock_tmp_sqlite_from_device,
+        )
+    )
     self.mock_copy_data_to_device = self.enter_context(
         mock.patch.object(
             file_utils,
@@ -82,9 +95,10 @@ class SqliteUtilsTest(absltest.TestCase):
     )
 
     self.assertEqual(result, expected_rows)
-    self.mock_copy_db.assert_called_once_with(
-        os.path.dirname(self.remote_db_path), self.controller.env, None
+    self.mock_pull_db.assert_called_once_with(
+        self.remote_db_path, self.controller.env, None
     )
+    self.mock_copy_db.assert_not_called()
 
   @mock.patch.object(sqlite_utils, 'execute_query', autospec=True)
   def test_get_rows_from_remote_device_with_retries(self, mock_query_rows):
@@ -140,5 +154,239 @@ class SqliteUtilsTest(absltest.TestCase):
     self.assertEqual(retrieved, original_rows + [new_row])
 
 
+class RemoteSqliteSessionTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.remote_db_path = sqlite_test_utils.setup_test_db()
+    self.addCleanup(shutil.rmtree, os.path.dirname(self.remote_db_path))
+    self.env = mock.create_autospec(interface.AsyncEnv)
+    self.env.controller = mock.create_autospec(
+        android_world_controller.AndroidWorldController
+    )
+    self.env.controller.pull_file.side_effect = (
+        lambda path, timeout_sec, sqlite_files_only: (
+            file_test_utils.mock_tmp_sqlite_from_device(path, None, timeout_sec)
+        )
+    )
+    self.env.controller.push_file.side_effect = (
+        lambda local, remote, timeout_sec: (
+            file_test_utils.mock_copy_data_to_device(local, remote, None)
+        )
+    )
+    self.mock_close_app = self.enter_context(
+        mock.patch.object(adb_utils, 'close_app', autospec=True)
+    )
+
+  def test_pushes_changes_once(self):
+    with sqlite_utils.remote_sqlite_session(
+        self.remote_db_path, 'TestApp', self.env
+    ) as conn:
+      conn.execute('DELETE FROM events WHERE id = 1')
+      rows = sqlite_utils.fetch_rows(
+          conn, 'SELECT * FROM events', sqlite_schema_utils.CalendarEvent
+      )
+      sqlite_utils.insert_rows(conn, rows[:1], 'id', 'events')
+
+    self.env.controller.pull_file.assert_called_once()
+    self.env.controller.push_file.assert_called_once()
+    self.mock_close_app.assert_called_once_with('TestApp', self.env.controller)
+    expected = sqlite_test_utils.get_db_rows()[1:]
+    expected.append(dataclasses.replace(expected[0], id=len(expected) + 2))
+    self.assertEqual(
+        sqlite_utils.execute_query(
+            'SELECT * FROM events',
+            self.remote_db_path,
+            sqlite_schema_utils.CalendarEvent,
+        ),
+        expected,
+    )
+
+  def test_reads_are_not_pushed(self):
+    with sqlite_utils.remote_sqlite_session(
+        self.remote_db_path, 'TestApp', self.env
+    ) as conn:
+      sqlite_utils.fetch_rows(
+          conn, 'SELECT * FROM events', sqlite_schema_utils.CalendarEvent
+      )
+
+    self.env.controller.push_file.assert_not_called()
+    self.mock_close_app.assert_not_called()
+
+  def test_changes_are_discarded_on_error(self):
+    with self.assertRaises(ValueError):
+      with sqlite_utils.remote_sqlite_session(
+          self.remote_db_path, 'TestApp', self.env
+      ) as conn:
+        conn.execute('DELETE FROM events')
+        raise ValueError()
+
+    self.env.controller.push_file.assert_not_called()
+
+
+class RemoteSqlTest(parameterized.TestCase):
+  """Runs the remote SQL backend against a local database."""
+
+  def setUp(self):
+    super().setUp()
+    self.remote_db_path = sqlite_test_utils.setup_test_db()
+    self.addCleanup(shutil.rmtree, os.path.dirname(self.remote_db_path))
+    self.env = mock.create_autospec(interface.AsyncEnv)
+    self.env.controller = mock.create_autospec(
+        android_world_controller.AndroidWorldController
+    )
+    self.mock_issue_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'issue_generic_request',
+            side_effect=fake_adb_responses.run_generic_request_locally,
+        )
+    )
+    self.mock_close_app = self.enter_context(
+        mock.patch.object(adb_utils, 'close_app', autospec=True)
+    )
+    self.enter_context(mock.patch.dict(sqlite_utils._backends))
+    sqlite_utils.set_backend('TestApp', sqlite_utils.REMOTE_SQL)
+
+  def _event(self, title: str, event_id: int = -1):
+    return sqlite_schema_utils.CalendarEvent(
+        start_ts=1672707600, end_ts=1672714800, title=title, id=event_id
+    )
+
+  def _rows(self) -> list[sqlite_schema_utils.CalendarEvent]:
+    return sqlite_utils.execute_query(
+        'SELECT * FROM events;',
+        self.remote_db_path,
+        sqlite_schema_utils.CalendarEvent,
+    )
+
+  def test_insert_rows(self):
+    new_row = sqlite_schema_utils.CalendarEvent(
+        start_ts=1672707600,
+        end_ts=1672714800,
+        title="Bob's \"party\"; DROP TABLE events; --",
+        location='$HOME `ls`',
+        description='Line one\nline two',
+        id=-1,
+    )
+
+    sqlite_utils.insert_rows_to_remote_db(
+        [new_row],
+        'id',
+        'events',
+        self.remote_db_path,
+        'TestApp',
+        self.env,
+    )
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.mock_close_app.assert_called_once_with('TestApp', self.env.controller)
+    rows = self._rows()
+    self.assertEqual(rows[:-1], sqlite_test_utils.get_db_rows())
+    self.assertEqual(rows[-1], dataclasses.replace(new_row, id=rows[-1].id))
+
+  def test_insert_rows_from_script_file(self):
+    script_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, script_dir)
+    self.enter_context(
+        mock.patch.object(sqlite_utils, '_MAX_INLINE_SQL_LENGTH', 0)
+    )
+    self.enter_context(
+        mock.patch.object(sqlite_utils, '_REMOTE_SQL_SCRIPT_DIR', script_dir)
+    )
+
+    def push(request):
+      with open(request.push.path, 'wb') as f:
+        f.write(request.push.content)
+      return adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.OK)
+
+    self.env.controller.execute_adb_call.side_effect = push
+    new_row = self._event('Pushed')
+
+    sqlite_utils.insert_rows_to_remote_db(
+        [new_row] * 2,
+        'id',
+        'events',
+        self.remote_db_path,
+        'TestApp',
+        self.env,
+    )
+
+    self.assertEqual([r.title for r in self._rows()[-2:]], ['Pushed'] * 2)
+    self.assertEmpty(os.listdir(script_dir))
+
+  def test_delete_all_rows(self):
+    sqlite_utils.delete_all_rows_from_table(
+        'events', self.remote_db_path, self.env, 'TestApp'
+    )
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertEmpty(self._rows())
+
+  def test_failed_statements_are_rolled_back(self):
+    rows = [self._event('New', 100), self._event('Duplicate id', 1)]
+    self.env.controller.pull_file.side_effect = RuntimeError('Pull failed.')
+
+    with self.assertRaisesRegex(RuntimeError, 'Pull failed.'):
+      sqlite_utils.insert_rows_to_remote_db(
+          rows, None, 'events', self.remote_db_path, 'TestApp', self.env
+      )
+
+    self.assertEqual(self._rows(), sqlite_test_utils.get_db_rows())
+
+  @mock.patch.object(adb_utils, 'set_root_if_needed', autospec=True)
+  def test_missing_database_is_not_created(self, mock_set_root):
+    missing_db_path = os.path.join(
+        os.path.dirname(self.remote_db_path), 'missing.db'
+    )
+    self.env.controller.pull_file.side_effect = FileNotFoundError
+
+    with self.assertRaises(FileNotFoundError):
+      sqlite_utils.insert_rows_to_remote_db(
+          [self._event('New')],
+          'id',
+          'events',
+          missing_db_path,
+          'TestApp',
+          self.env,
+      )
+
+    mock_set_root.assert_called_once()
+    self.assertFalse(os.path.exists(missing_db_path))
+
+  def test_default_backend(self):
+    self.assertEqual(
+        sqlite_utils.get_backend('OtherApp'), sqlite_utils.PULL_PUSH
+    )
+
+  def test_pull_push_backend(self):
+    sqlite_utils.set_backend('TestApp', sqlite_utils.PULL_PUSH)
+    self.env.controller.pull_file.side_effect = (
+        lambda path, timeout_sec, sqlite_files_only=False: (
+            file_test_utils.mock_tmp_sqlite_from_device(path, None, timeout_sec)
+        )
+    )
+
+    sqlite_utils.delete_all_rows_from_table(
+        'events', self.remote_db_path, self.env, 'TestApp'
+    )
+
+    self.env.controller.push_file.assert_called_once()
+    self.mock_issue_generic_request.assert_not_called()
+    self.mock_close_app.assert_called_once()
+
+  @parameterized.parameters(
+      (None, 'NULL'),
+      (True, '1'),
+      (42, '42'),
+      (1.5, '1.5'),
+      (float('nan'), 'NULL'),
+      (b'\x00\xff', "X'00ff'"),
+      ("it's", "'it''s'"),
+  )
+  def test_sql_literal(self, value, expected):
+    self.assertEqual(sqlite_utils.sql_literal(value), expected)
+
+
 if __name__ == '__main__':
   absltest.main()
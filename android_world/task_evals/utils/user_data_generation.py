@@ -20,7 +20,9 @@ import logging
 import os
 import random
 import re
+import shutil
 import string
+import tempfile
 from android_env import env_interface
 from android_world.env import adb_utils
 from android_world.env import device_constants
@@ -101,8 +103,12 @@ def generate_noise_files(
       filename += extension
     names.add(filename)
 
-  for filename in names:
-    file_utils.create_file(filename, directory_path, env)
+  # Same contents as `file_utils.create_file` writes, but in a single push.
+  file_utils.push_files(
+      {filename: generate_random_string(20) + "\n" for filename in names},
+      directory_path,
+      env,
+  )
 
 
 def generate_modified_file_name(base_file_name: str) -> str:
@@ -179,6 +185,31 @@ def write_to_gallery(
   adb_utils.close_app("simple gallery", env.controller)
 
 
+def write_images_to_gallery(
+    images: dict[str, str],
+    env: interface.AsyncEnv,
+):
+  """Writes several jpeg files to the Simple Gallery directory at once.
+
+  Args:
+    images: Maps the name of each file to write to the text to display on it.
+    env: The environment to write to.
+  """
+  local_dir = tempfile.mkdtemp(dir=_TMP)
+  try:
+    for file_name, data in images.items():
+      image = _draw_text(data)
+      image.save(file_utils.convert_to_posix_path(local_dir, file_name))
+    file_utils.copy_data_to_device(
+        local_dir,
+        device_constants.GALLERY_DATA,
+        env.controller,
+    )
+  finally:
+    shutil.rmtree(local_dir, ignore_errors=True)
+  adb_utils.close_app("simple gallery", env.controller)
+
+
 def _copy_data_to_device(
     data: str, file_name: str, location: str, env: interface.AsyncEnv
 ):
@@ -304,6 +335,35 @@ def write_video_file_to_device(
   )
 
 
+def write_random_video_files_to_device(
+    file_names: list[str],
+    location: str,
+    env: interface.AsyncEnv,
+) -> None:
+  """Creates small videos, each showing a random message, on the device.
+
+  The videos play at 1 fps, showing a random message for 20 to 180 seconds, and
+  are pushed to the device together.
+
+  Args:
+    file_names: The names of the files to write.
+    location: The path to write the files to on the device.
+    env: The Android environment.
+  """
+  local_dir = tempfile.mkdtemp(dir=_TMP)
+  try:
+    for file_name in file_names:
+      _create_mpeg_with_messages(
+          file_utils.convert_to_posix_path(local_dir, file_name),
+          [generate_random_string(10)],
+          display_time=random.randint(20, 180),
+          fps=1,
+      )
+    file_utils.copy_data_to_device(local_dir, location, env.controller)
+  finally:
+    shutil.rmtree(local_dir, ignore_errors=True)
+
+
 def _create_test_mp3(
     file_path: str, artist: str, title: str, duration_milliseconds: int = 1000
 ) -> str:
@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import tempfile
+from unittest import mock
 from absl.testing import absltest
+from android_world.env import adb_utils
+from android_world.env import device_constants
+from android_world.env import interface
 from android_world.task_evals.utils import user_data_generation
 from android_world.utils import file_utils
 import cv2
@@ -60,5 +65,54 @@ class TestCreateMpegWithMessages(absltest.TestCase):
     self.assertEqual(total_frames, 300)
 
 
+class TestWriteFilesInBulk(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.env = mock.create_autospec(interface.AsyncEnv)
+    self.pushed = {}
+
+    def copy_data_to_device(local_path, remote_path, env):
+      del env
+      self.pushed[remote_path] = sorted(os.listdir(local_path))
+
+    self.mock_copy_data_to_device = self.enter_context(
+        mock.patch.object(
+            file_utils, "copy_data_to_device", side_effect=copy_data_to_device
+        )
+    )
+    self.enter_context(mock.patch.object(adb_utils, "close_app"))
+
+  def test_write_images_to_gallery(self):
+    user_data_generation.write_images_to_gallery(
+        {"a.jpg": "Receipt A", "b.jpg": "Receipt B"}, self.env
+    )
+
+    self.mock_copy_data_to_device.assert_called_once()
+    self.assertEqual(
+        self.pushed, {device_constants.GALLERY_DATA: ["a.jpg", "b.jpg"]}
+    )
+    local_dir = self.mock_copy_data_to_device.call_args.args[0]
+    self.assertFalse(os.path.exists(local_dir))
+
+  def test_write_random_video_files_to_device(self):
+    def create_mpeg(file_path, *args, **kwargs):
+      del args, kwargs
+      with open(file_path, "w"):
+        pass
+
+    with mock.patch.object(
+        user_data_generation,
+        "_create_mpeg_with_messages",
+        side_effect=create_mpeg,
+    ):
+      user_data_generation.write_random_video_files_to_device(
+          ["a.mp4", "b.mp4"], "/sdcard/Movies", self.env
+      )
+
+    self.mock_copy_data_to_device.assert_called_once()
+    self.assertEqual(self.pushed, {"/sdcard/Movies": ["a.mp4", "b.mp4"]})
+
+
 if __name__ == "__main__":
   absltest.main()
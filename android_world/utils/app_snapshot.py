@@ -14,6 +14,11 @@
 
 """Utils for handling snapshots for apps."""
 
+from collections.abc import Sequence
+import dataclasses
+import re
+import shlex
+
 from absl import logging
 from android_env import env_interface
 from android_world.env import adb_utils
@@ -37,6 +42,27 @@ def _snapshot_path(app_name: str) -> str:
   )
 
 
+def _manifest_path(app_name: str) -> str:
+  # Kept next to the snapshot, so it isn't copied into the app data.
+  return _snapshot_path(app_name) + ".manifest"
+
+
+def _digest_command(app_data_path: str) -> str:
+  """Returns a shell command printing a digest of app data.
+
+  The digest covers the name, size and modification time of every file, which
+  is much cheaper than hashing their contents but still changes when the app
+  writes any data.
+
+  Args:
+    app_data_path: Quoted path to the app data directory.
+  """
+  return (
+      f"cd {app_data_path} && find . -mindepth 1 -exec stat -c '%n %s %Y' {{}}"
+      " + | sort | md5sum"
+  )
+
+
 def clear_snapshot(
     app_name: str,
     env: env_interface.AndroidEnvInterface,
@@ -49,6 +75,37 @@ def clear_snapshot(
   """
   snapshot_path = _snapshot_path(app_name)
   file_utils.clear_directory(snapshot_path, env)
+  adb_utils.issue_shell_batch(
+      [f"rm -f {shlex.quote(_manifest_path(app_name))}"], env
+  )
+
+
+def _run_steps(
+    steps: list[tuple[str, str | None]],
+    env: env_interface.AndroidEnvInterface,
+) -> bool:
+  """Runs shell commands in one adb call, stopping at the first failure.
+
+  Args:
+    steps: Pairs of a shell command and the error message if it fails. If the
+      message is None, a failure just stops the remaining steps.
+    env: Android environment.
+
+  Returns:
+    Whether all steps succeeded.
+
+  Raises:
+    RuntimeError: with the step's error message if a command fails.
+  """
+  results = adb_utils.issue_shell_batch(
+      [command for command, _ in steps], env, stop_on_error=True
+  )
+  if results[-1].ok:
+    return True
+  message = steps[len(results) - 1][1]
+  if message is None:
+    return False
+  raise RuntimeError(f"{message} {results[-1].output}".strip())
 
 
 def save_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
@@ -64,16 +121,185 @@ def save_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
   Raises:
     RuntimeError: on failed or incomplete snapshot.
   """
-  snapshot_path = _snapshot_path(app_name)
-  try:
-    file_utils.clear_directory(snapshot_path, env)
-  except RuntimeError:
+  snapshot_path = shlex.quote(_snapshot_path(app_name))
+  manifest_path = shlex.quote(_manifest_path(app_name))
+  app_data_path = shlex.quote(_app_data_path(app_name))
+  if not _run_steps(
+      [
+          (f"test -d {app_data_path}", None),
+          (
+              f"rm -rf {snapshot_path}/* {manifest_path}",
+              "Failed to clear prior snapshot.",
+          ),
+          (f"mkdir -p {snapshot_path}", f"Failed to create {snapshot_path}."),
+          (
+              f"cp -a {app_data_path}/. {snapshot_path}/",
+              f"Failure copying {app_data_path} directory to {snapshot_path}.",
+          ),
+          (
+              f"{_digest_command(app_data_path)} > {manifest_path}",
+              f"Failed to record the manifest of {app_data_path}.",
+          ),
+      ],
+      env,
+  ):
     logging.warn(
-        "Continuing to save %s snapshot after failing to clear prior snapshot.",
-        app_name,
+        "App data %s does not exist, not saving a snapshot.", app_data_path
     )
 
-  file_utils.copy_dir(_app_data_path(app_name), snapshot_path, env)
+
+# Exit codes of the restore script, for each app.
+_CLOSE_FAILED = 1
+_MANIFEST_NOT_REMOVED = 2
+_SNAPSHOT_NOT_FOUND = 3
+_CLEAR_FAILED = 4
+_MKDIR_FAILED = 5
+_COPY_FAILED = 6
+_FIX_FAILED = 7
+_MANIFEST_NOT_RECORDED = 8
+_RESULT_MARKER = "__android_world_snapshot"
+
+
+@dataclasses.dataclass(frozen=True)
+class RestoreResult:
+  """Result of `restore_snapshots`.
+
+  Attributes:
+    restored: Apps whose snapshot was restored, in order.
+    failures: Maps each app whose snapshot could not be restored to the reason.
+  """
+
+  restored: list[str]
+  failures: dict[str, str]
+
+  @property
+  def ok(self) -> bool:
+    return not self.failures
+
+
+def _restore_script(app_names: Sequence[str]) -> str:
+  """Returns a script restoring the snapshots of apps concurrently.
+
+  The script stops every app, then clears and copies their data directories in
+  background jobs. Once all copies finish, security contexts and permissions
+  are fixed with one call each, and manifests are recorded. It prints the exit
+  code of each app, one of the constants above or 0 on success.
+
+  Args:
+    app_names: The apps to restore.
+  """
+  stop, copy, wait, fix, record, report = [], [], [], [], [], []
+  for i, app_name in enumerate(app_names):
+    package_name = adb_utils.extract_package_name(
+        adb_utils.get_adb_activity(app_name)
+    )
+    snapshot_path = shlex.quote(_snapshot_path(app_name))
+    manifest_path = shlex.quote(_manifest_path(app_name))
+    app_data_path = shlex.quote(_app_data_path(app_name))
+    status = f"s{i}"
+    stop.append(
+        f"{status}=0; am force-stop {package_name} || {status}={_CLOSE_FAILED}"
+    )
+    # Until the restore completes, the app data matches no manifest.
+    copy.append(
+        f"[ ${status} -ne 0 ] || {{ ("
+        f" rm -f {manifest_path} || exit {_MANIFEST_NOT_REMOVED};"
+        f" test -d {snapshot_path} || exit {_SNAPSHOT_NOT_FOUND};"
+        f" rm -rf {app_data_path}/* || exit {_CLEAR_FAILED};"
+        f" mkdir -p {app_data_path} || exit {_MKDIR_FAILED};"
+        f" cp -a {snapshot_path}/. {app_data_path}/ || exit {_COPY_FAILED}"
+        f" ) >/dev/null 2>&1 & p{i}=$!; }}"
+    )
+    wait.append(f"[ ${status} -ne 0 ] || {{ wait $p{i}; {status}=$?; }}")
+    fix.append(f'[ ${status} -ne 0 ] || set -- "$@" {app_data_path}')
+    record.append(
+        f"[ ${status} -ne 0 ] || {status}=$fix; [ ${status} -ne 0 ] ||"
+        f" ( {_digest_command(app_data_path)} ) > {manifest_path} ||"
+        f" {status}={_MANIFEST_NOT_RECORDED}"
+    )
+    report.append(f"echo {_RESULT_MARKER} {i} ${status}")
+  return "\n".join([
+      *stop,
+      *copy,
+      *wait,
+      "set --",
+      *fix,
+      # File permissions, ownership, and security context may be lost during
+      # save and/or loading of the snapshot. As a workaround, restore the
+      # security context and open up full file permissions.
+      "fix=0",
+      f'[ $# -eq 0 ] || {{ restorecon -RD "$@" && chmod 777 -R "$@"; }} ||'
+      f" fix={_FIX_FAILED}",
+      # Copies may not preserve every timestamp, so the manifest describes the
+      # restored data rather than the data the snapshot was taken from.
+      *record,
+      *report,
+  ])
+
+
+def restore_snapshots(
+    app_names: Sequence[str],
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: float | None = None,
+) -> RestoreResult:
+  """Loads the snapshots of several apps at once.
+
+  A single script runs on the device; the data directories of the apps are
+  restored concurrently.
+
+  Args:
+    app_names: Apps that will have their data overwritten with their stored
+      snapshots.
+    env: Android environment.
+    timeout_sec: A timeout for the whole restore.
+
+  Returns:
+    Which apps were restored and why the others failed.
+
+  Raises:
+    RuntimeError: If the restore script could not be run.
+  """
+  if not app_names:
+    return RestoreResult(restored=[], failures={})
+  (result,) = adb_utils.issue_shell_batch(
+      [_restore_script(app_names)], env, timeout_sec=timeout_sec
+  )
+  exit_codes = {
+      int(match.group(1)): int(match.group(2))
+      for match in re.finditer(
+          rf"^{_RESULT_MARKER} (\d+) (\d+)$", result.output, re.MULTILINE
+      )
+  }
+  restored, failures = [], {}
+  for i, app_name in enumerate(app_names):
+    snapshot_path = _snapshot_path(app_name)
+    app_data_path = _app_data_path(app_name)
+    errors = {
+        _CLOSE_FAILED: f"Failed to close {app_name}.",
+        _MANIFEST_NOT_REMOVED: f"Failed to remove {_manifest_path(app_name)}.",
+        _SNAPSHOT_NOT_FOUND: f"Snapshot not found in {snapshot_path}.",
+        _CLEAR_FAILED: f"Failed to clear {app_name} application data.",
+        _MKDIR_FAILED: f"Failed to create {app_data_path}.",
+        _COPY_FAILED: (
+            f"Failure copying {snapshot_path} directory to {app_data_path}."
+        ),
+        _FIX_FAILED: (
+            "Failed to restore app data security context or permissions."
+        ),
+        _MANIFEST_NOT_RECORDED: (
+            f"Failed to record the manifest of {app_data_path}."
+        ),
+    }
+    exit_code = exit_codes.get(i)
+    if exit_code == 0:
+      restored.append(app_name)
+    elif exit_code is None:
+      failures[app_name] = f"No result restoring {app_name}: {result.output}"
+    else:
+      failures[app_name] = errors.get(
+          exit_code, f"Failed to restore {app_name} ({exit_code})."
+      )
+  return RestoreResult(restored=restored, failures=failures)
 
 
 def restore_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
@@ -88,36 +314,46 @@ def restore_snapshot(app_name: str, env: env_interface.AndroidEnvInterface):
     RuntimeError: when there is no available snapshot or a failure occurs while
       loading the snapshot.
   """
-  adb_utils.close_app(app_name, env)
+  result = restore_snapshots([app_name], env)
+  if not result.ok:
+    raise RuntimeError(result.failures[app_name])
 
-  snapshot_path = _snapshot_path(app_name)
-  if not file_utils.check_directory_exists(snapshot_path, env):
-    raise RuntimeError(f"Snapshot not found in {snapshot_path}.")
 
-  app_data_path = _app_data_path(app_name)
-  try:
-    file_utils.clear_directory(app_data_path, env)
-  except RuntimeError:
-    logging.warn(
-        "Continuing to restore %s snapshot after failing to clear application"
-        " data.",
-        app_name,
-    )
+def changed_apps(
+    app_names: Sequence[str], env: env_interface.AndroidEnvInterface
+) -> list[str]:
+  """Closes apps and returns those whose data may differ from their snapshot.
 
-  file_utils.copy_dir(snapshot_path, app_data_path, env)
+  The data of each app is compared to the manifest recorded when its snapshot
+  was last saved or restored, with a single adb call for all apps. Apps without
+  a manifest are always reported as changed.
 
-  # File permissions, ownership, and security context may be lost during save
-  # and/or loading of the snapshot. As a workaround, restore the security
-  # context and open up full file permissions.
-  adb_utils.check_ok(
-      adb_utils.issue_generic_request(
-          ["shell", "restorecon", "-RD", app_data_path], env
-      ),
-      "Failed to restore app data security context.",
-  )
-  adb_utils.check_ok(
-      adb_utils.issue_generic_request(
-          ["shell", "chmod", "777", "-R", app_data_path], env
-      ),
-      "Failed to set app data permissions.",
-  )
+  Args:
+    app_names: The apps to check.
+    env: Android environment.
+
+  Returns:
+    The apps, in order, whose snapshot should be restored.
+
+  Raises:
+    RuntimeError: If the check could not be run.
+  """
+  commands = []
+  for app_name in app_names:
+    package_name = adb_utils.extract_package_name(
+        adb_utils.get_adb_activity(app_name)
+    )
+    manifest_path = shlex.quote(_manifest_path(app_name))
+    app_data_path = shlex.quote(_app_data_path(app_name))
+    # Closing the app first keeps it from writing during the check, and matches
+    # the state a restore leaves it in.
+    commands.append(
+        f"am force-stop {package_name}; m=$(cat {manifest_path}) &&"
+        f' [ -n "$m" ] && [ "$({_digest_command(app_data_path)})" = "$m" ]'
+    )
+  results = adb_utils.issue_shell_batch(commands, env)
+  return [
+      app_name
+      for app_name, result in zip(app_names, results)
+      if not result.ok
+  ]
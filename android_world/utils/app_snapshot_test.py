@@ -0,0 +1,177 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.env import adb_utils
+from android_world.utils import app_snapshot
+from android_world.utils import fake_adb_responses
+
+
+class AppSnapshotTestBase(absltest.TestCase):
+  """Saves snapshots of apps with data in a local directory."""
+
+  def setUp(self):
+    super().setUp()
+    self.root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.root)
+    self.mock_issue_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'issue_generic_request',
+            side_effect=fake_adb_responses.run_generic_request_locally,
+        )
+    )
+    self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            'get_adb_activity',
+            side_effect=lambda app_name: f'com.{app_name}/.Main',
+        )
+    )
+    self.enter_context(
+        mock.patch.object(
+            app_snapshot,
+            '_app_data_path',
+            side_effect=lambda app_name: os.path.join(
+                self.root, 'data', app_name
+            ),
+        )
+    )
+    self.enter_context(
+        mock.patch.object(
+            app_snapshot,
+            '_snapshot_path',
+            side_effect=lambda app_name: os.path.join(
+                self.root, 'snapshots', app_name
+            ),
+        )
+    )
+    self.env = mock.MagicMock()
+    for app_name in ('a', 'b'):
+      self._write(app_name, 'databases/app.db', 'rows')
+      app_snapshot.save_snapshot(app_name, self.env)
+
+  def _write(self, app_name: str, file_name: str, content: str) -> None:
+    path = os.path.join(self.root, 'data', app_name, file_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+      f.write(content)
+
+  def _read(self, app_name: str, file_name: str) -> str:
+    with open(os.path.join(self.root, 'data', app_name, file_name)) as f:
+      return f.read()
+
+
+class ChangedAppsTest(AppSnapshotTestBase):
+
+  def test_unchanged(self):
+    self.assertEmpty(app_snapshot.changed_apps(['a', 'b'], self.env))
+
+  def test_changed_file(self):
+    self._write('b', 'databases/app.db', 'more rows')
+
+    self.assertEqual(app_snapshot.changed_apps(['a', 'b'], self.env), ['b'])
+
+  def test_added_file(self):
+    self._write('a', 'shared_prefs/prefs.xml', '')
+
+    self.assertEqual(app_snapshot.changed_apps(['a', 'b'], self.env), ['a'])
+
+  def test_missing_manifest(self):
+    os.remove(os.path.join(self.root, 'snapshots', 'a.manifest'))
+
+    self.assertEqual(app_snapshot.changed_apps(['a', 'b'], self.env), ['a'])
+
+  def test_missing_app_data(self):
+    shutil.rmtree(os.path.join(self.root, 'data', 'b'))
+
+    self.assertEqual(app_snapshot.changed_apps(['a', 'b'], self.env), ['b'])
+
+
+class RestoreSnapshotsTest(AppSnapshotTestBase):
+
+  def setUp(self):
+    super().setUp()
+    # Stand-ins for the device commands, logging their arguments.
+    bin_dir = os.path.join(self.root, 'bin')
+    os.mkdir(bin_dir)
+    self.log = os.path.join(self.root, 'log')
+    for command in ('am', 'restorecon'):
+      path = os.path.join(bin_dir, command)
+      with open(path, 'w') as f:
+        f.write(f'#!/bin/sh\necho {command} "$@" >> {self.log}\n')
+      os.chmod(path, 0o755)
+    self.enter_context(
+        mock.patch.dict(
+            os.environ, {'PATH': f'{bin_dir}:{os.environ["PATH"]}'}
+        )
+    )
+
+  def test_restores_all_apps(self):
+    self._write('a', 'databases/app.db', 'changed')
+    self._write('a', 'new.txt', '')
+    shutil.rmtree(os.path.join(self.root, 'data', 'b'))
+
+    result = app_snapshot.restore_snapshots(['a', 'b'], self.env)
+
+    self.assertTrue(result.ok)
+    self.assertEqual(result.restored, ['a', 'b'])
+    for app_name in ('a', 'b'):
+      self.assertEqual(
+          os.listdir(os.path.join(self.root, 'data', app_name)), ['databases']
+      )
+      self.assertEqual(self._read(app_name, 'databases/app.db'), 'rows')
+    self.assertEmpty(app_snapshot.changed_apps(['a', 'b'], self.env))
+    with open(self.log) as f:
+      log = f.read().splitlines()
+    # Both apps are stopped, and their contexts fixed in a single call.
+    self.assertEqual(log[:2], ['am force-stop com.a', 'am force-stop com.b'])
+    self.assertEqual(
+        log[2], f'restorecon -RD {self.root}/data/a {self.root}/data/b'
+    )
+
+  def test_reports_failures_per_app(self):
+    shutil.rmtree(os.path.join(self.root, 'snapshots', 'a'))
+    self._write('b', 'databases/app.db', 'changed')
+
+    result = app_snapshot.restore_snapshots(['a', 'b'], self.env)
+
+    self.assertFalse(result.ok)
+    self.assertEqual(result.restored, ['b'])
+    self.assertEqual(list(result.failures), ['a'])
+    self.assertIn('Snapshot not found', result.failures['a'])
+    self.assertEqual(self._read('b', 'databases/app.db'), 'rows')
+
+  def test_restore_snapshot_raises(self):
+    shutil.rmtree(os.path.join(self.root, 'snapshots', 'a'))
+
+    with self.assertRaisesRegex(RuntimeError, 'Snapshot not found'):
+      app_snapshot.restore_snapshot('a', self.env)
+
+  def test_no_apps(self):
+    self.mock_issue_generic_request.reset_mock()
+
+    result = app_snapshot.restore_snapshots([], self.env)
+
+    self.assertTrue(result.ok)
+    self.mock_issue_generic_request.assert_not_called()
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import shutil
+import tempfile
 from unittest import mock
 
 from absl.testing import absltest
@@ -19,16 +22,24 @@ from android_env import env_interface
 from android_env.proto import adb_pb2
 from android_world.env import actuation
 from android_world.env import adb_utils
+from android_world.env import android_world_controller
+from android_world.env import conditions
 from android_world.utils import contacts_utils
+from android_world.utils import fake_adb_responses
 
 
 @mock.patch.object(adb_utils, "issue_generic_request")
 @mock.patch.object(actuation, "find_and_click_element")
 class TestContactsUtils(absltest.TestCase):
 
-  def test_add_contact(self, mock_click_element, mock_generic_request):
+  @mock.patch.object(conditions, "wait_until")
+  def test_add_contact(
+      self, mock_wait_until, mock_click_element, mock_generic_request
+  ):
     """Test adding a contact."""
-    mock_env = mock.create_autospec(env_interface.AndroidEnvInterface)
+    mock_env = mock.create_autospec(
+        android_world_controller.AndroidWorldController, instance=True
+    )
 
     phone_number = "+123456789"
     name = "Emma Watson"
@@ -49,6 +60,8 @@ class TestContactsUtils(absltest.TestCase):
 
     # Assert that the _click_element method was called with the correct argument
     mock_click_element.assert_called_once_with("SAVE", mock_env)
+    # Waits for the form, the saved contact and returning from it.
+    self.assertEqual(mock_wait_until.call_count, 3)
 
   def test_list_contacts(self, unused_mock_click_element, mock_generic_request):
     """Test listing all contacts."""
@@ -102,5 +115,86 @@ class TestContactsUtils(absltest.TestCase):
     mock_generic_request.assert_called_once_with(expected_adb_command, mock_env)
 
 
+class TestAddContactsBulk(absltest.TestCase):
+  """Runs the insert script locally, against a stand-in `content` command."""
+
+  def setUp(self):
+    super().setUp()
+    root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root)
+    self.log = os.path.join(root, "log")
+    content = os.path.join(root, "content")
+    with open(content, "w") as f:
+      f.write(
+          "#!/bin/sh\n"
+          f'printf "%s|" "$@" >> {self.log}; echo >> {self.log}\n'
+          '[ "$1" = query ] && echo "Row: 0 _id=7"\n'
+          "exit 0\n"
+      )
+    os.chmod(content, 0o755)
+    self.enter_context(
+        mock.patch.dict(os.environ, {"PATH": f"{root}:{os.environ['PATH']}"})
+    )
+    self.mock_generic_request = self.enter_context(
+        mock.patch.object(
+            adb_utils,
+            "issue_generic_request",
+            side_effect=fake_adb_responses.run_generic_request_locally,
+        )
+    )
+    self.mock_list_contacts = self.enter_context(
+        mock.patch.object(contacts_utils, "list_contacts")
+    )
+    self.mock_add_contact = self.enter_context(
+        mock.patch.object(contacts_utils, "add_contact")
+    )
+    self.env = mock.create_autospec(
+        android_world_controller.AndroidWorldController, instance=True
+    )
+    self.contacts = [
+        contacts_utils.Contact("Emma O'Neil", "+1 (234) 567"),
+        contacts_utils.Contact("Chen", "98765"),
+    ]
+
+  def test_add_contacts_bulk(self):
+    self.mock_list_contacts.return_value = [
+        contacts_utils.Contact("Emma O'Neil", "1234567"),
+        contacts_utils.Contact("Chen", "98765"),
+    ]
+
+    contacts_utils.add_contacts_bulk(self.contacts, self.env)
+
+    self.mock_generic_request.assert_called_once()
+    self.mock_add_contact.assert_not_called()
+    with open(self.log) as f:
+      calls = f.read().splitlines()
+    # Per contact: the raw contact, its ID, then its name and phone rows.
+    self.assertLen(calls, 8)
+    self.assertIn("--bind|raw_contact_id:i:7|", calls[2])
+    self.assertIn("--bind|data1:s:Emma O'Neil|", calls[2])
+    self.assertIn("--bind|data1:s:+1 (234) 567|", calls[3])
+    self.assertIn("--bind|data1:s:Chen|", calls[6])
+
+  def test_missing_contacts_raise(self):
+    self.mock_list_contacts.return_value = [
+        contacts_utils.Contact("Chen", "98765"),
+    ]
+
+    with self.assertRaises(RuntimeError):
+      contacts_utils.add_contacts_bulk(self.contacts, self.env)
+    self.mock_add_contact.assert_not_called()
+
+  def test_ui_fallback(self):
+    self.mock_list_contacts.return_value = [
+        contacts_utils.Contact("Chen", "98765"),
+    ]
+
+    contacts_utils.add_contacts_bulk(self.contacts, self.env, ui_fallback=True)
+
+    self.mock_add_contact.assert_called_once_with(
+        "Emma O'Neil", "+1 (234) 567", self.env
+    )
+
+
 if __name__ == "__main__":
   absltest.main()
@@ -19,6 +19,8 @@ on the mock returning a response to an adb call. This module provides functions
 to construct these for common use cases.
 """
 
+import subprocess
+
 from android_env.proto import adb_pb2
 from android_world.utils import file_utils
 
@@ -32,6 +34,37 @@ def create_successful_generic_response(output: str) -> adb_pb2.AdbResponse:
   )
 
 
+def run_generic_request_locally(
+    args: list[str], env, timeout_sec: float | None = None
+) -> adb_pb2.AdbResponse:
+  """Runs an `adb shell` generic request in the local shell.
+
+  Meant as a side effect for a mocked `adb_utils.issue_generic_request`, so
+  shell scripts can be tested against a local directory instead of a device.
+
+  Args:
+    args: The adb arguments; the first must be "shell".
+    env: Unused.
+    timeout_sec: Unused.
+
+  Returns:
+    A response with the combined stdout and stderr of the command.
+  """
+  del env, timeout_sec
+  if args[0] != "shell":
+    raise ValueError(f"Only shell requests can run locally, got {args}.")
+  output = subprocess.run(
+      ["sh", "-c", " ".join(args[1:])],
+      stdout=subprocess.PIPE,
+      stderr=subprocess.STDOUT,
+      check=False,
+  ).stdout
+  return adb_pb2.AdbResponse(
+      status=adb_pb2.AdbResponse.Status.OK,
+      generic=adb_pb2.AdbResponse.GenericResponse(output=output),
+  )
+
+
 def create_get_wifi_enabled_response(is_enabled: bool) -> adb_pb2.AdbResponse:
   """Returns an AdbResponse for whether wifi is turned on.
 
@@ -43,6 +43,23 @@ def mock_tmp_directory_from_device(
       shutil.rmtree(parent_dir)
 
 
+@contextlib.contextmanager
+def mock_tmp_sqlite_from_device(
+    db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: float | None,
+):
+  """Mocks `file_utils.tmp_sqlite_from_device` for unit testing."""
+  del env, timeout_sec
+  if not os.path.isfile(db_path):
+    raise FileNotFoundError(f"{db_path} does not exist.")
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    for suffix in ("",) + file_utils.SQLITE_COMPANION_SUFFIXES:
+      if os.path.isfile(db_path + suffix):
+        shutil.copy(db_path + suffix, tmp_dir)
+    yield tmp_dir
+
+
 def mock_copy_data_to_device(
     local_db_path: str,
     remote_db_path: str,
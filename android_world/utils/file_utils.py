@@ -14,16 +14,23 @@
 
 """Utils for file operations using adb."""
 
+import base64
 import contextlib
 import dataclasses
 import datetime
+import io
 import os
 import pathlib
 import random
+import shlex
 import shutil
 import string
+import tarfile
 import tempfile
+import time
+import uuid
 from typing import Iterator
+from typing import Mapping
 from typing import Optional
 
 from absl import logging
@@ -62,6 +69,9 @@ TMP_LOCAL_LOCATION = convert_to_posix_path(
     get_local_tmp_directory(), "android_world"
 )
 
+# Files SQLite keeps next to a database in write-ahead logging mode.
+SQLITE_COMPANION_SUFFIXES = ("-wal", "-shm")
+
 
 @dataclasses.dataclass(frozen=True)
 class FileWithMetadata:
@@ -92,14 +102,17 @@ def remove_single_file(
     base_path: Base directory to search for
     env: The environment to use.
   """
-  if check_directory_exists(base_path, env):
-    file_list = get_file_list_with_metadata(base_path, env)
-    if target in [file_info.file_name for file_info in file_list]:
-      adb_utils.issue_generic_request(
-          ["shell", "rm", "-r", convert_to_posix_path(base_path, target)],
-          env,
-      )
-  else:
+  target_path = shlex.quote(convert_to_posix_path(base_path, target))
+  base_exists, *_ = adb_utils.issue_shell_batch(
+      [
+          f"test -d {shlex.quote(base_path)}",
+          f"test -e {target_path}",
+          f"rm -r {target_path}",
+      ],
+      env,
+      stop_on_error=True,
+  )
+  if not base_exists.ok:
     logging.warn(
         "Base path %s does not exist, ignoring remove_single_file.", base_path
     )
@@ -118,22 +131,16 @@ def clear_directory(
   Raises:
     RuntimeError when directory exists a failure occured while deleting files.
   """
-  if not check_directory_exists(directory_path, env):
-    return
-
-  # Check if the folder is empty
-  res = adb_utils.issue_generic_request(
-      ["shell", "ls", "-1", directory_path], env
+  path = shlex.quote(directory_path)
+  # Stops early if the directory doesn't exist or is empty.
+  results = adb_utils.issue_shell_batch(
+      [f"test -d {path}", f'test -n "$(ls -1 {path})"', f"rm -r {path}/*"],
+      env,
+      stop_on_error=True,
   )
-  folder_contents = res.generic.output.decode().replace("\r", "").strip()
-
-  if folder_contents:
-    adb_utils.check_ok(
-        adb_utils.issue_generic_request(
-            ["shell", "rm", "-r", f"{directory_path}/*"],
-            env,
-        ),
-        f"Failed to clear directory {directory_path}.",
+  if len(results) == 3 and not results[-1].ok:
+    raise RuntimeError(
+        f"Failed to clear directory {directory_path}: {results[-1].output}"
     )
 
 
@@ -161,17 +168,16 @@ def create_file(
     )
   # Escape quotes to avoid issues with writing them to file.
   content = content.replace("'", "'\"'\"'")
-  mkdir(directory_path, env)
-  adb_utils.issue_generic_request(
+  results = adb_utils.issue_shell_batch(
       [
-          "shell",
-          "echo",
-          f"'{content}'",
-          ">",
-          f"{directory_path}/{file_name}",
+          f"mkdir -p {directory_path}",
+          f"echo '{content}' > {directory_path}/{file_name}",
       ],
       env,
+      stop_on_error=True,
   )
+  if not results[0].ok:
+    raise RuntimeError(f"Failed to create directory {directory_path}.")
   return content
 
 
@@ -213,22 +219,27 @@ def copy_dir(
     RuntimeError when the contents of the source path directory can not be
     written to the destination path.
   """
-
-  if not check_directory_exists(source_path, env):
+  source, dest = shlex.quote(source_path), shlex.quote(dest_path)
+  results = adb_utils.issue_shell_batch(
+      [
+          f"test -d {source}",
+          # Fails if the path exists as a file.
+          f"mkdir -p {dest}",
+          f"cp -a {source}/. {dest}/",
+      ],
+      env,
+      stop_on_error=True,
+  )
+  if not results[0].ok:
     logging.warn(
         "Source directory %s does not exist, ignoring copy_dir.", source_path
     )
-    return
-
-  if not check_directory_exists(dest_path, env):
-    mkdir(dest_path, env)  # RuntimeError raised if path exists as a file.
-
-  adb_utils.check_ok(
-      adb_utils.issue_generic_request(
-          ["shell", "cp", "-a", f"{source_path}/.", f"{dest_path}/"], env
-      ),
-      f"Failure copying {source_path} directory to {dest_path}.",
-  )
+  elif not results[1].ok:
+    raise RuntimeError(f"Failed to create directory {dest_path}.")
+  elif not results[2].ok:
+    raise RuntimeError(
+        f"Failure copying {source_path} directory to {dest_path}."
+    )
 
 
 def check_file_or_folder_exists(
@@ -371,6 +382,82 @@ def tmp_directory_from_device(
       )
 
 
+def _pull_sqlite_files(
+    db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> Optional[dict[str, bytes]]:
+  """Returns the contents of the existing SQLite files, or None if no .db."""
+  paths = [db_path] + [db_path + s for s in SQLITE_COMPANION_SUFFIXES]
+  quoted = [shlex.quote(p) for p in paths]
+  # One stat call checks all three files; files are base64 encoded since shell
+  # output isn't binary safe.
+  results = adb_utils.issue_shell_batch(
+      [f"stat -c %n {' '.join(quoted)} 2>/dev/null"]
+      + [f"[ ! -f {q} ] || base64 {q}" for q in quoted],
+      env,
+      timeout_sec,
+  )
+  existing = set(results[0].output.splitlines())
+  if db_path not in existing:
+    return None
+  contents = {}
+  for path, result in zip(paths, results[1:]):
+    if path not in existing:
+      continue
+    if not result.ok:
+      raise RuntimeError(f"Failed to read {path}: {result.output}")
+    contents[path] = base64.b64decode(result.output)
+  return contents
+
+
+@contextlib.contextmanager
+def tmp_sqlite_from_device(
+    db_path: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> Iterator[str]:
+  """Copies a SQLite database and its -wal and -shm files to a local directory.
+
+  Unlike `tmp_directory_from_device`, other files in the database's directory
+  are not copied, and the files are checked and read with a single adb call.
+
+  Args:
+    db_path: The path of the database on the Android device.
+    env: The Android environment interface.
+    timeout_sec: A timeout for the ADB operations.
+
+  Yields:
+    A temporary folder that contains the files under their remote names, which
+    is automatically deleted after use.
+
+  Raises:
+    FileNotFoundError: If the database does not exist.
+    RuntimeError: If there is an adb communication error.
+  """
+  contents = _pull_sqlite_files(db_path, env, timeout_sec)
+  if contents is None:
+    # Many databases are only visible as root; only check for it when needed.
+    adb_utils.set_root_if_needed(env, timeout_sec)
+    contents = _pull_sqlite_files(db_path, env, timeout_sec)
+  if contents is None:
+    raise FileNotFoundError(f"{db_path} does not exist.")
+
+  tmp_directory = tempfile.mkdtemp()
+  logging.info("Copying %s to local tmp %s", db_path, tmp_directory)
+  try:
+    for path, content in contents.items():
+      with open(
+          convert_to_posix_path(tmp_directory, os.path.basename(path)), "wb"
+      ) as f:
+        f.write(content)
+
+    yield tmp_directory
+
+  finally:
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+
+
 @contextlib.contextmanager
 def tmp_file_from_device(
     device_file: str,
@@ -445,6 +532,86 @@ def copy_file_to_device(
   return push_response
 
 
+def _build_archive(files: Mapping[str, bytes]) -> bytes:
+  """Returns an uncompressed tar archive holding the given files."""
+  buffer = io.BytesIO()
+  mtime = int(time.time())
+  with tarfile.open(fileobj=buffer, mode="w") as archive:
+    for name, content in files.items():
+      info = tarfile.TarInfo(name)
+      info.size = len(content)
+      info.mode = 0o777
+      info.mtime = mtime
+      archive.addfile(info, io.BytesIO(content))
+  return buffer.getvalue()
+
+
+def push_files(
+    files: Mapping[str, bytes | str],
+    remote_dir: str,
+    env: env_interface.AndroidEnvInterface,
+    timeout_sec: Optional[float] = None,
+) -> adb_pb2.AdbResponse:
+  """Writes several files to a directory on the device at once.
+
+  The files are packed into a tar archive locally, pushed with a single adb
+  request and extracted on the device, with their permissions set in the same
+  shell call. This is much faster than pushing or creating files one by one.
+
+  Args:
+    files: Maps file names, relative to `remote_dir`, to their contents. Text
+      is encoded as UTF-8.
+    remote_dir: The directory on the device to write the files to. It is
+      created if missing.
+    env: The Android environment interface.
+    timeout_sec: A timeout for the push and extraction, each.
+
+  Returns:
+    The response to the push request.
+
+  Raises:
+    RuntimeError: If the pushed archive could not be extracted.
+  """
+  if not files:
+    return adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.OK)
+  archive = _build_archive({
+      name: content.encode("utf-8") if isinstance(content, str) else content
+      for name, content in files.items()
+  })
+  archive_path = convert_to_posix_path(
+      remote_dir, f".android_world_{uuid.uuid4().hex}.tar"
+  )
+  response = env.execute_adb_call(
+      adb_pb2.AdbRequest(
+          push=adb_pb2.AdbRequest.Push(content=archive, path=archive_path),
+          timeout_sec=timeout_sec,
+      )
+  )
+  if response.status != adb_pb2.AdbResponse.OK:
+    return response
+
+  quoted_dir = shlex.quote(remote_dir)
+  quoted_archive = shlex.quote(archive_path)
+  quoted_names = " ".join(shlex.quote(f"./{name}") for name in files)
+  results = adb_utils.issue_shell_batch(
+      [
+          f"mkdir -p {quoted_dir}",
+          # -m stamps the files with the device's clock, like adb push does.
+          f"tar -xmf {quoted_archive} -C {quoted_dir}",
+          f"cd {quoted_dir} && chmod 777 {quoted_names}",
+          f"rm -f {quoted_archive}",
+      ],
+      env,
+      timeout_sec=timeout_sec,
+  )
+  for result in results[:3]:
+    if not result.ok:
+      raise RuntimeError(
+          f"Failed to extract files to {remote_dir}: {result.output}"
+      )
+  return response
+
+
 def copy_data_to_device(
     local_path: str,
     remote_path: str,
@@ -465,10 +632,11 @@ def copy_data_to_device(
   Raises:
     FileNotFoundError: If the local file or directory does not exist. Or if
       remote path does not exist.
+    RuntimeError: If the files of a directory could not be extracted on the
+      device.
   """
   if not os.path.exists(local_path):
     raise FileNotFoundError(f"{local_path} does not exist.")
-  response = adb_pb2.AdbResponse()
   if os.path.isfile(local_path):
     # If the file extension is different, remote_path is likely a directory.
     if os.path.splitext(local_path)[1] != os.path.splitext(remote_path)[1]:
@@ -477,19 +645,12 @@ def copy_data_to_device(
       )
     return copy_file_to_device(local_path, remote_path, env, timeout_sec)
 
-  # Copying a directory over, push every file separately.
-  for file_path in os.listdir(local_path):
-    current_response = copy_file_to_device(
-        convert_to_posix_path(local_path, file_path),
-        convert_to_posix_path(remote_path, os.path.basename(file_path)),
-        env,
-        timeout_sec,
-    )
-    if current_response.status != adb_pb2.AdbResponse.OK:
-      return current_response
-    response = current_response
-
-  return response
+  # Copying a directory over, push its files in a single archive.
+  files = {}
+  for file_name in os.listdir(local_path):
+    with open(convert_to_posix_path(local_path, file_name), "rb") as f:
+      files[file_name] = f.read()
+  return push_files(files, remote_path, env, timeout_sec)
 
 
 def get_file_list_with_metadata(
@@ -13,15 +13,19 @@
 # limitations under the License.
 
 import datetime
+import io
 import os
 import shutil
+import tarfile
 import tempfile
+import time
 from unittest import mock
 
 from absl.testing import absltest
 from absl.testing import parameterized
 from android_env.proto import adb_pb2
 from android_world.env import adb_utils
+from android_world.utils import fake_adb_responses
 from android_world.utils import file_utils
 
 
@@ -147,7 +151,9 @@ class FilesTest(parameterized.TestCase):
     )
 
     response = file_utils.copy_data_to_device(
-        temp_dir, '/remote/dir', self.mock_env
+        file_utils.convert_to_posix_path(temp_dir, file_name),
+        '/remote/dir',
+        self.mock_env,
     )
     self.mock_env.execute_adb_call.assert_has_calls(
         [
@@ -168,43 +174,6 @@ class FilesTest(parameterized.TestCase):
 
     self.assertEqual(response, mock_response)
 
-  def test_copy_data_to_device_copies_full_dir(self):
-    """Test if copy_data_to_device correctly copies data from a directory."""
-    file_contents = b'test file contents'
-    mock_response = adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.OK)
-    self.mock_env.execute_adb_call.return_value = mock_response
-    temp_dir = tempfile.mkdtemp()
-    file_names = ['file1.txt', 'file2.txt']
-    for file_name in file_names:
-      create_file_with_contents(
-          file_utils.convert_to_posix_path(temp_dir, file_name), file_contents
-      )
-
-    response = file_utils.copy_data_to_device(
-        temp_dir, '/remote/dir', self.mock_env
-    )
-    calls = []
-    for file_name in file_names:
-      calls.append(
-          mock.call(
-              adb_pb2.AdbRequest(
-                  push=adb_pb2.AdbRequest.Push(
-                      content=file_contents,
-                      path=file_utils.convert_to_posix_path(
-                          '/remote/dir/', file_name
-                      ),
-                  ),
-                  timeout_sec=None,
-              )
-          )
-      )
-    self.mock_env.execute_adb_call.assert_has_calls(
-        calls,
-        any_order=True,
-    )
-
-    self.assertEqual(response, mock_response)
-
   def test_copy_data_to_device_file_not_found(self):
     """Test if copy_data_to_device handles errors."""
     # Test FileNotFoundError
@@ -260,5 +229,205 @@ class FilesTest(parameterized.TestCase):
     self.assertTrue(res)
 
 
+class ShellHelpersTest(absltest.TestCase):
+  """Runs the shell helpers against a local directory."""
+
+  def setUp(self):
+    super().setUp()
+    self.mock_issue_generic_request = mock.patch.object(
+        adb_utils,
+        'issue_generic_request',
+        side_effect=fake_adb_responses.run_generic_request_locally,
+    ).start()
+    self.mock_env = mock.MagicMock()
+    self.root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.root)
+
+  def tearDown(self):
+    super().tearDown()
+    mock.patch.stopall()
+
+  def test_create_file(self):
+    directory = os.path.join(self.root, 'a', 'b')
+    content = file_utils.create_file(
+        'f.txt', directory, self.mock_env, content="it's"
+    )
+
+    self.mock_issue_generic_request.assert_called_once()
+    with open(os.path.join(directory, 'f.txt')) as f:
+      self.assertEqual(f.read(), "it's\n")
+    self.assertEqual(content, "it'\"'\"'s")
+
+  def test_clear_directory(self):
+    for name in ('x.txt', 'y.txt'):
+      file_utils.create_file(name, self.root, self.mock_env)
+    self.mock_issue_generic_request.reset_mock()
+
+    file_utils.clear_directory(self.root, self.mock_env)
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertEmpty(os.listdir(self.root))
+
+  def test_clear_directory_missing_or_empty(self):
+    file_utils.clear_directory(self.root, self.mock_env)
+    file_utils.clear_directory(
+        os.path.join(self.root, 'missing'), self.mock_env
+    )
+
+  def test_copy_dir(self):
+    source = os.path.join(self.root, 'source')
+    dest = os.path.join(self.root, 'dest')
+    file_utils.create_file('x.txt', source, self.mock_env)
+    self.mock_issue_generic_request.reset_mock()
+
+    file_utils.copy_dir(source, dest, self.mock_env)
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertEqual(os.listdir(dest), ['x.txt'])
+
+  def test_copy_dir_missing_source(self):
+    dest = os.path.join(self.root, 'dest')
+    file_utils.copy_dir(os.path.join(self.root, 'missing'), dest, self.mock_env)
+    self.assertFalse(os.path.exists(dest))
+
+  def test_copy_dir_to_file_raises(self):
+    source = os.path.join(self.root, 'source')
+    file_utils.create_file('x.txt', source, self.mock_env)
+    with self.assertRaises(RuntimeError):
+      file_utils.copy_dir(
+          source, os.path.join(source, 'x.txt'), self.mock_env
+      )
+
+  def test_remove_single_file(self):
+    file_utils.create_file('x.txt', self.root, self.mock_env)
+    file_utils.create_file('y.txt', self.root, self.mock_env)
+
+    file_utils.remove_single_file('x.txt', self.root, self.mock_env)
+
+    self.assertEqual(os.listdir(self.root), ['y.txt'])
+
+  def test_remove_single_file_removes_directory(self):
+    file_utils.create_file('x.txt', os.path.join(self.root, 'd'), self.mock_env)
+    file_utils.create_file('y.txt', self.root, self.mock_env)
+
+    file_utils.remove_single_file('d', self.root, self.mock_env)
+
+    self.assertEqual(os.listdir(self.root), ['y.txt'])
+
+  def _push_locally(self, request: adb_pb2.AdbRequest) -> adb_pb2.AdbResponse:
+    os.makedirs(os.path.dirname(request.push.path), exist_ok=True)
+    create_file_with_contents(request.push.path, request.push.content)
+    return adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.OK)
+
+  def test_push_files(self):
+    self.mock_env.execute_adb_call.side_effect = self._push_locally
+    directory = os.path.join(self.root, 'my dir')
+
+    response = file_utils.push_files(
+        {'a.txt': "it's\n", '-b.bin': bytes(range(256))},
+        directory,
+        self.mock_env,
+    )
+
+    self.assertEqual(response.status, adb_pb2.AdbResponse.Status.OK)
+    self.mock_env.execute_adb_call.assert_called_once()
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertCountEqual(os.listdir(directory), ['a.txt', '-b.bin'])
+    with open(os.path.join(directory, 'a.txt')) as f:
+      self.assertEqual(f.read(), "it's\n")
+    with open(os.path.join(directory, '-b.bin'), 'rb') as f:
+      self.assertEqual(f.read(), bytes(range(256)))
+    self.assertEqual(
+        os.stat(os.path.join(directory, 'a.txt')).st_mode & 0o777, 0o777
+    )
+
+  def test_push_files_uses_current_time(self):
+    self.mock_env.execute_adb_call.side_effect = self._push_locally
+    start = time.time()
+
+    file_utils.push_files({'a.txt': 'a'}, self.root, self.mock_env)
+
+    self.assertGreaterEqual(
+        os.stat(os.path.join(self.root, 'a.txt')).st_mtime, start - 1
+    )
+
+  def test_build_archive_sets_mtime(self):
+    start = int(time.time())
+
+    archive = file_utils._build_archive({'a.txt': b'a', 'b.txt': b'b'})
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as f:
+      for member in f.getmembers():
+        self.assertGreaterEqual(member.mtime, start)
+        self.assertLessEqual(member.mtime, time.time())
+
+  def test_push_files_failed_push(self):
+    failure = adb_pb2.AdbResponse(status=adb_pb2.AdbResponse.Status.ADB_ERROR)
+    self.mock_env.execute_adb_call.return_value = failure
+
+    response = file_utils.push_files({'a.txt': 'a'}, self.root, self.mock_env)
+
+    self.assertEqual(response, failure)
+    self.mock_issue_generic_request.assert_not_called()
+
+  def test_push_files_failed_extraction(self):
+    # The archive is never written, so extraction fails.
+    self.mock_env.execute_adb_call.return_value = adb_pb2.AdbResponse(
+        status=adb_pb2.AdbResponse.Status.OK
+    )
+
+    with self.assertRaises(RuntimeError):
+      file_utils.push_files({'a.txt': 'a'}, self.root, self.mock_env)
+
+  def test_copy_data_to_device_copies_full_dir(self):
+    self.mock_env.execute_adb_call.side_effect = self._push_locally
+    source = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, source)
+    for file_name in ['file1.txt', 'file2.txt']:
+      create_file_with_contents(os.path.join(source, file_name), b'contents')
+    destination = os.path.join(self.root, 'remote')
+
+    response = file_utils.copy_data_to_device(
+        source, destination, self.mock_env
+    )
+
+    self.assertEqual(response.status, adb_pb2.AdbResponse.Status.OK)
+    # A single push and a single shell call, regardless of the file count.
+    self.mock_env.execute_adb_call.assert_called_once()
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertCountEqual(os.listdir(destination), ['file1.txt', 'file2.txt'])
+
+  def test_tmp_sqlite_from_device(self):
+    db_path = os.path.join(self.root, 'my app.db')
+    contents = {db_path: bytes(range(256)) * 100, db_path + '-wal': b'\n\r\n'}
+    for path, content in contents.items():
+      create_file_with_contents(path, content)
+    create_file_with_contents(os.path.join(self.root, 'cache.bin'), b'x')
+
+    with file_utils.tmp_sqlite_from_device(
+        db_path, self.mock_env
+    ) as tmp_directory:
+      self.assertCountEqual(
+          os.listdir(tmp_directory), ['my app.db', 'my app.db-wal']
+      )
+      for path, content in contents.items():
+        with open(
+            os.path.join(tmp_directory, os.path.basename(path)), 'rb'
+        ) as f:
+          self.assertEqual(f.read(), content)
+
+    self.mock_issue_generic_request.assert_called_once()
+    self.assertFalse(os.path.exists(tmp_directory))
+
+  @mock.patch.object(adb_utils, 'set_root_if_needed')
+  def test_tmp_sqlite_from_device_not_found(self, mock_set_root):
+    with self.assertRaises(FileNotFoundError):
+      with file_utils.tmp_sqlite_from_device(
+          os.path.join(self.root, 'missing.db'), self.mock_env
+      ):
+        pass
+    mock_set_root.assert_called_once()
+
+
 if __name__ == '__main__':
   absltest.main()
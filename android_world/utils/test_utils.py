@@ -126,6 +126,7 @@ class AdbEvalTestBase(absltest.TestCase):
     ).start()
     self.mock_mkdir = mock.patch.object(file_utils, 'mkdir').start()
     self.mock_create_file = mock.patch.object(file_utils, 'create_file').start()
+    self.mock_push_files = mock.patch.object(file_utils, 'push_files').start()
     self.mock_remove_single_file = mock.patch.object(
         file_utils, 'remove_single_file'
     ).start()
@@ -169,6 +170,9 @@ class AdbEvalTestBase(absltest.TestCase):
     self.mock_add_contact = mock.patch.object(
         contacts_utils, 'add_contact'
     ).start()
+    self.mock_add_contacts_bulk = mock.patch.object(
+        contacts_utils, 'add_contacts_bulk'
+    ).start()
     self.mock_list_contacts = mock.patch.object(
         contacts_utils, 'list_contacts'
     ).start()
@@ -179,6 +183,14 @@ class AdbEvalTestBase(absltest.TestCase):
     self.mock_restore_snapshot = mock.patch.object(
         app_snapshot, 'restore_snapshot'
     ).start()
+    self.mock_restore_snapshots = mock.patch.object(
+        app_snapshot, 'restore_snapshots'
+    ).start()
+    self.mock_changed_apps = mock.patch.object(
+        app_snapshot,
+        'changed_apps',
+        side_effect=lambda app_names, env: list(app_names),
+    ).start()
 
   def tearDown(self):
     super().tearDown()
@@ -210,10 +222,12 @@ class FakeAsyncEnv(interface.AsyncAndroidEnv):
   """Fake environment for testing."""
 
   def __init__(self):
-    self._reset_called = True
-    self._controller = mock.create_autospec(
-        android_world_controller.AndroidWorldController, instance=True
+    super().__init__(
+        mock.create_autospec(
+            android_world_controller.AndroidWorldController, instance=True
+        )
     )
+    self._reset_called = True
 
   @property
   def controller(self) -> android_world_controller.AndroidWorldController:
@@ -226,15 +240,32 @@ class FakeAsyncEnv(interface.AsyncAndroidEnv):
         ui_elements=[],
     )
 
-  def get_state(self, wait_to_stabilize: bool = False) -> interface.State:
+  def get_state(
+      self, wait_to_stabilize: bool = False, include_pixels: bool = True
+  ) -> interface.State:
     return interface.State(
-        pixels=(np.random.rand(10, 10, 3) * 255).astype(np.uint8),
+        pixels=(np.random.rand(10, 10, 3) * 255).astype(np.uint8)
+        if include_pixels
+        else None,
         forest=mock.MagicMock(),
         ui_elements=[],
     )
 
-  def execute_action(self, action: json_action.JSONAction):
-    del action
+  def execute_action(
+      self,
+      action: json_action.JSONAction,
+      state: interface.State | None = None,
+  ):
+    del action, state
+
+  def wait_until(
+      self,
+      predicate: Any,
+      timeout: float = 5.0,
+      poll_schedule: Any = None,
+  ) -> bool:
+    del predicate, timeout, poll_schedule
+    return True
 
   def run_adb_command(self, command: str) -> adb_pb2.AdbResponse:
     del command
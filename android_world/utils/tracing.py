@@ -0,0 +1,219 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lightweight latency tracing for agent steps.
+
+Code marks the operations worth timing with spans:
+
+```
+with tracing.span(tracing.ADB):
+  response = env.execute_adb_call(request)
+```
+
+Spans are only recorded while a `Tracer` is active, so instrumentation costs a
+context variable lookup otherwise:
+
+```
+tracer = tracing.Tracer()
+with tracer.activate():
+  agent.step(goal)
+print(tracing.breakdown(tracer.spans))  # {'llm': 3.2, 'adb': 0.8, ...}
+tracer.write_chrome_trace('/tmp/trace.json')  # Open in chrome://tracing.
+```
+"""
+
+from collections.abc import Callable, Iterator, Sequence
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Optional, TypeVar
+
+# Span names used by the instrumentation in this package.
+STEP = 'step'
+GET_STATE = 'get_state'
+LLM = 'llm'
+EXECUTE_ACTION = 'execute_action'
+ADB = 'adb'
+SLEEP = 'sleep'
+
+_T = TypeVar('_T')
+
+
+@dataclasses.dataclass(frozen=True)
+class Span:
+  """A timed operation.
+
+  Attributes:
+    name: What was timed, e.g. "adb".
+    start: Start time in seconds, from `time.perf_counter`.
+    duration: Duration in seconds.
+    thread_id: Identifier of the thread the operation ran on.
+    args: Additional details, e.g. the type of adb request.
+  """
+
+  name: str
+  start: float
+  duration: float
+  thread_id: int
+  args: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+class Tracer:
+  """Collects the spans recorded while it is active."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._spans: list[Span] = []
+
+  @property
+  def spans(self) -> list[Span]:
+    """The recorded spans, in order of completion."""
+    with self._lock:
+      return list(self._spans)
+
+  def add(self, span_: Span) -> None:
+    with self._lock:
+      self._spans.append(span_)
+
+  @contextlib.contextmanager
+  def activate(self) -> Iterator['Tracer']:
+    """Records spans into this tracer within the context, on this thread."""
+    token = _active_tracer.set(self)
+    try:
+      yield self
+    finally:
+      _active_tracer.reset(token)
+
+  def write_chrome_trace(self, path: str) -> None:
+    """Writes the spans as Chrome trace JSON; see `to_chrome_trace`."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+      json.dump(to_chrome_trace(self.spans), f)
+
+
+_active_tracer: contextvars.ContextVar[Optional[Tracer]] = (
+    contextvars.ContextVar('active_tracer', default=None)
+)
+
+
+def is_active() -> bool:
+  """Returns whether a tracer records spans on this thread.
+
+  Callers can check this to skip computing span details when nothing records
+  them.
+  """
+  return _active_tracer.get() is not None
+
+
+@contextlib.contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+  """Times the body of the context as a span, if a tracer is active.
+
+  Args:
+    name: The span name.
+    **args: Additional details to record with the span.
+
+  Yields:
+    Nothing.
+  """
+  tracer = _active_tracer.get()
+  if tracer is None:
+    yield
+    return
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    tracer.add(
+        Span(
+            name=name,
+            start=start,
+            duration=time.perf_counter() - start,
+            thread_id=threading.get_ident(),
+            args=args,
+        )
+    )
+
+
+def traced(name: str) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
+  """Decorator that times each call to the function as a span."""
+
+  def decorator(fn: Callable[..., _T]) -> Callable[..., _T]:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> _T:
+      with span(name):
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+  return decorator
+
+
+def sleep(seconds: float) -> None:
+  """Sleeps, recording the time as a span."""
+  with span(SLEEP):
+    time.sleep(seconds)
+
+
+def breakdown(spans: Sequence[Span]) -> dict[str, float]:
+  """Returns the total seconds spent in spans of each name.
+
+  Spans nest, e.g. adb calls happen within `execute_action`, so a parent's total
+  includes its children's and the totals don't add up to the wall time.
+
+  Args:
+    spans: The spans to summarize.
+
+  Returns:
+    A mapping from span name to total duration in seconds.
+  """
+  totals = {}
+  for s in spans:
+    totals[s.name] = totals.get(s.name, 0.0) + s.duration
+  return totals
+
+
+def to_chrome_trace(spans: Sequence[Span]) -> dict[str, Any]:
+  """Converts spans to the Chrome trace event format.
+
+  The result can be loaded in chrome://tracing or https://ui.perfetto.dev.
+
+  Args:
+    spans: The spans to convert.
+
+  Returns:
+    The trace, as a JSON-serializable dict.
+  """
+  pid = os.getpid()
+  return {
+      'traceEvents': [
+          {
+              'name': s.name,
+              'cat': s.name,
+              'ph': 'X',
+              'ts': s.start * 1e6,
+              'dur': s.duration * 1e6,
+              'pid': pid,
+              'tid': s.thread_id,
+              'args': {k: str(v) for k, v in s.args.items()},
+          }
+          for s in sorted(spans, key=lambda s: s.start)
+      ],
+      'displayTimeUnit': 'ms',
+  }
@@ -0,0 +1,120 @@
+# Copyright 2024 The android_world Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from absl.testing import absltest
+from android_world.utils import tracing
+
+
+class TracingTest(absltest.TestCase):
+
+  def test_spans_are_not_recorded_without_tracer(self):
+    tracer = tracing.Tracer()
+    with tracing.span('unused'):
+      pass
+    self.assertEmpty(tracer.spans)
+
+  def test_records_nested_spans(self):
+    tracer = tracing.Tracer()
+    with tracer.activate():
+      with tracing.span(tracing.EXECUTE_ACTION, action_type='click'):
+        with tracing.span(tracing.ADB):
+          pass
+
+    self.assertEqual(
+        [s.name for s in tracer.spans], [tracing.ADB, tracing.EXECUTE_ACTION]
+    )
+    self.assertEqual(tracer.spans[1].args, {'action_type': 'click'})
+    self.assertGreaterEqual(tracer.spans[1].duration, tracer.spans[0].duration)
+
+  def test_is_active(self):
+    self.assertFalse(tracing.is_active())
+    with tracing.Tracer().activate():
+      self.assertTrue(tracing.is_active())
+    self.assertFalse(tracing.is_active())
+
+  def test_records_span_on_exception(self):
+    tracer = tracing.Tracer()
+    with tracer.activate(), self.assertRaises(ValueError):
+      with tracing.span(tracing.ADB):
+        raise ValueError()
+    self.assertLen(tracer.spans, 1)
+
+  def test_traced(self):
+    @tracing.traced(tracing.LLM)
+    def predict(prompt):
+      return prompt.upper()
+
+    tracer = tracing.Tracer()
+    with tracer.activate():
+      self.assertEqual(predict('hi'), 'HI')
+    self.assertEqual([s.name for s in tracer.spans], [tracing.LLM])
+
+  @mock.patch('time.sleep')
+  def test_sleep(self, mock_sleep):
+    tracer = tracing.Tracer()
+    with tracer.activate():
+      tracing.sleep(2.0)
+    mock_sleep.assert_called_once_with(2.0)
+    self.assertEqual([s.name for s in tracer.spans], [tracing.SLEEP])
+
+  def test_other_threads_are_not_recorded(self):
+    tracer = tracing.Tracer()
+
+    def work():
+      with tracing.span(tracing.ADB):
+        pass
+
+    with tracer.activate():
+      thread = threading.Thread(target=work)
+      thread.start()
+      thread.join()
+    self.assertEmpty(tracer.spans)
+
+  def test_breakdown(self):
+    spans = [
+        tracing.Span('llm', 0.0, 2.0, 1),
+        tracing.Span('adb', 2.0, 0.25, 1),
+        tracing.Span('adb', 2.5, 0.5, 1),
+    ]
+    self.assertEqual(tracing.breakdown(spans), {'llm': 2.0, 'adb': 0.75})
+
+  def test_write_chrome_trace(self):
+    directory = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, directory)
+    path = os.path.join(directory, 'traces', 'episode.json')
+    tracer = tracing.Tracer()
+    tracer.add(tracing.Span('adb', 2.0, 0.5, 7, {'command': 'tap'}))
+    tracer.add(tracing.Span('step', 1.0, 3.0, 7))
+
+    tracer.write_chrome_trace(path)
+
+    with open(path) as f:
+      events = json.load(f)['traceEvents']
+    self.assertEqual([e['name'] for e in events], ['step', 'adb'])
+    self.assertEqual(events[1]['ph'], 'X')
+    self.assertEqual(events[1]['ts'], 2e6)
+    self.assertEqual(events[1]['dur'], 5e5)
+    self.assertEqual(events[1]['tid'], 7)
+    self.assertEqual(events[1]['args'], {'command': 'tap'})
+
+
+if __name__ == '__main__':
+  absltest.main()
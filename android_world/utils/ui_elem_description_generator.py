@@ -171,6 +171,7 @@ class UI_Elem_Description_Generator:
             screen_width_height_px: tuple[int, int],
             model_name: str,
             goal: str = "",
+            llm: infer.LlmWrapper | None = None,
     ) -> str:
         log_to_file(ui_elements)
         """
@@ -184,7 +185,8 @@ class UI_Elem_Description_Generator:
 
 
         prompt=UI_Elem_Description_Generator(model_name).generate_general_ui_prompt(tree_info, goal)
-        llm = infer.GeminiGcpWrapper(model_name)
+        if llm is None:
+            llm = infer.GeminiGcpWrapper(model_name)
         summary, _, _ = llm.predict(prompt)
         print("Summary generated for UI Elements: " + summary)
 
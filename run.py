@@ -82,6 +82,26 @@ _DEVICE_CONSOLE_PORT = flags.DEFINE_integer(
     ' first connected device is port 5554, the second is 5556, and'
     ' so on.',
 )
+_CONSOLE_PORTS = flags.DEFINE_list(
+    'console_ports',
+    None,
+    'Console ports of several running Android devices, e.g. 5554,5556. If'
+    ' set, task instances are distributed across these devices in parallel'
+    ' and --console_port is ignored.',
+)
+_GRPC_PORTS = flags.DEFINE_list(
+    'grpc_ports',
+    None,
+    'gRPC ports of the devices in --console_ports, in the same order. Defaults'
+    ' to 8554, 8555, and so on.',
+)
+
+_ADB_SHELL_SESSION = flags.DEFINE_boolean(
+    'adb_shell_session',
+    False,
+    'Whether to run adb shell commands through a persistent shell session per'
+    ' device instead of a new adb process each, which is much faster.',
+)
 
 _SUITE_FAMILY = flags.DEFINE_enum(
     'suite_family',
@@ -121,12 +141,31 @@ _CHECKPOINT_DIR = flags.DEFINE_string(
     ' the latest checkpoint. If the directory is empty or does not exist, a new'
     ' directory will be created.',
 )
+_DEDUPLICATE_IMAGES = flags.DEFINE_boolean(
+    'deduplicate_checkpoint_images',
+    False,
+    'Whether to store screenshots in checkpoints as deduplicated, losslessly'
+    ' compressed images instead of inline arrays.',
+)
+_CHECKPOINT_CODEC = flags.DEFINE_string(
+    'checkpoint_codec',
+    '',
+    'How to encode checkpointed episodes, e.g. "gzip-1" for fast gzip or "raw"'
+    ' for uncompressed, memory-mapped pickles. If empty, episodes are written'
+    ' as gzipped pickles.',
+)
 _OUTPUT_PATH = flags.DEFINE_string(
     'output_path',
     os.path.expanduser('~/android_world/runs'),
     'The path to save results to if not resuming from a checkpoint is not'
     ' provided.',
 )
+_TRACE = flags.DEFINE_boolean(
+    'trace',
+    False,
+    'Whether to write a Chrome trace of each episode, showing where the time'
+    ' of each step goes, to a "traces" subdirectory of the run directory.',
+)
 
 # Agent specific.
 _AGENT_NAME = flags.DEFINE_string('agent_name', 'm3a_gpt4v', help='Agent name.')
@@ -195,13 +234,45 @@ def _get_agent(
   return agent
 
 
+def _get_envs() -> list[interface.AsyncEnv]:
+  """Loads the environments to run on."""
+  if not _CONSOLE_PORTS.value:
+    return [
+        env_launcher.load_and_setup_env(
+            console_port=_DEVICE_CONSOLE_PORT.value,
+            emulator_setup=_EMULATOR_SETUP.value,
+            adb_path=_ADB_PATH.value,
+            adb_shell_session=_ADB_SHELL_SESSION.value,
+        )
+    ]
+  console_ports = [int(port) for port in _CONSOLE_PORTS.value]
+  if _GRPC_PORTS.value:
+    grpc_ports = [int(port) for port in _GRPC_PORTS.value]
+  else:
+    grpc_ports = [8554 + i for i in range(len(console_ports))]
+  if len(grpc_ports) != len(console_ports):
+    raise ValueError('--grpc_ports must have one port per console port.')
+  return [
+      env_launcher.load_and_setup_env(
+          console_port=console_port,
+          emulator_setup=_EMULATOR_SETUP.value,
+          adb_path=_ADB_PATH.value,
+          grpc_port=grpc_port,
+          adb_shell_session=_ADB_SHELL_SESSION.value,
+      )
+      for console_port, grpc_port in zip(console_ports, grpc_ports)
+  ]
+
+
 def _main() -> None:
   """Runs eval suite and gets rewards back."""
-  env = env_launcher.load_and_setup_env(
-      console_port=_DEVICE_CONSOLE_PORT.value,
-      emulator_setup=_EMULATOR_SETUP.value,
-      adb_path=_ADB_PATH.value,
+  # Fails on unknown codecs before any emulator is set up.
+  codec = (
+      checkpointer_lib.get_codec(_CHECKPOINT_CODEC.value)
+      if _CHECKPOINT_CODEC.value
+      else None
   )
+  envs = _get_envs()
 
   n_task_combinations = _N_TASK_COMBINATIONS.value
   task_registry = registry.TaskRegistry()
@@ -214,13 +285,17 @@ def _main() -> None:
   )
   suite.suite_family = _SUITE_FAMILY.value
 
-  agent = _get_agent(env, _SUITE_FAMILY.value)
-
-  if _SUITE_FAMILY.value.startswith('miniwob'):
-    # MiniWoB pages change quickly, don't need to wait for screen to stabilize.
-    agent.transition_pause = _MINIWOB_TRANSITION_PAUSE
-  else:
-    agent.transition_pause = None
+  def agent_factory(
+      env: interface.AsyncEnv,
+  ) -> base_agent.EnvironmentInteractingAgent:
+    agent = _get_agent(env, _SUITE_FAMILY.value)
+    if _SUITE_FAMILY.value.startswith('miniwob'):
+      # MiniWoB pages change quickly, don't need to wait for screen to
+      # stabilize.
+      agent.transition_pause = _MINIWOB_TRANSITION_PAUSE
+    else:
+      agent.transition_pause = None
+    return agent
 
   if _CHECKPOINT_DIR.value:
     checkpoint_dir = _CHECKPOINT_DIR.value
@@ -231,17 +306,44 @@ def _main() -> None:
       f'Starting eval with agent {_AGENT_NAME.value} and writing to'
       f' {checkpoint_dir}'
   )
-  suite_utils.run(
-      suite,
-      agent,
-      checkpointer=checkpointer_lib.IncrementalCheckpointer(checkpoint_dir),
-      demo_mode=False,
+  checkpointer = checkpointer_lib.BackgroundCheckpointer(
+      checkpointer_lib.IncrementalCheckpointer(
+          checkpoint_dir,
+          deduplicate_images=_DEDUPLICATE_IMAGES.value,
+          codec=codec,
+      )
+  )
+  trace_dir = (
+      os.path.join(checkpoint_dir, 'traces') if _TRACE.value else None
   )
+  with checkpointer:
+    if len(envs) > 1:
+      suite_utils.run_parallel(
+          suite,
+          agent_factory,
+          envs,
+          checkpointer=checkpointer,
+          trace_dir=trace_dir,
+      )
+    else:
+      suite_utils.run(
+          suite,
+          agent_factory(envs[0]),
+          checkpointer=checkpointer,
+          demo_mode=False,
+          trace_dir=trace_dir,
+      )
   print(
       f'Finished running agent {_AGENT_NAME.value} on {_SUITE_FAMILY.value}'
       f' family. Wrote to {checkpoint_dir}.'
   )
-  env.close()
+  for env in envs:
+    if isinstance(env, interface.AsyncAndroidEnv):
+      print(
+          'UI stabilization latency by app:\n'
+          + env.stabilization_stats.format_summary()
+      )
+    env.close()
 
 
 def main(argv: Sequence[str]) -> None: